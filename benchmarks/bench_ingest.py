@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# benchmarks/bench_ingest.py
+# Vazão de escrita do caminho real de gravação (storage.log_sensor_reading, uma conexão e
+# um commit por linha) comparada com um executemany em transação única e com a carga em
+# massa (bulk_import.py) de um CSV.
+#
+# Uso: python3 benchmarks/bench_ingest.py [--rows 2000] [--bulk-rows 500000]
+
+import argparse
+import csv
+import os
+import sqlite3
+import tempfile
+import time
+
+from common import save_results, summarize
+from datasets import iter_rows
+
+import bulk_import
+import storage
+
+
+def run_bulk(rows=500_000):
+    """bulk_import de um CSV com `rows` leituras para um banco vazio (linhas/s de ponta a ponta)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "leituras.csv")
+        with open(source, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["timestamp", "sensor_name", "value"])
+            for ts, name, temp, pres, vel, *_ in iter_rows(rows, days=30):
+                writer.writerow([ts, name, temp if temp is not None else (pres if pres is not None else vel)])
+        stats, elapsed = bulk_import.run_import(os.path.join(tmp, "bulk.db"), [source], verbose=False)
+    return {"rows": stats.inserted, "rows_per_s": stats.read / elapsed, "elapsed_s": elapsed}
+
+
+def run(rows=2000, bulk_rows=500_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "ingest.db")
+        storage.init_database(path)
+        old_path, storage.DATABASE_PATH = storage.DATABASE_PATH, path
+        try:
+            latencies = []
+            data = list(iter_rows(rows, days=1))
+            t0 = time.perf_counter()
+            for ts, name, temp, pres, vel, stype, pins, mode in data:
+                value = temp if temp is not None else (pres if pres is not None else vel)
+                t = time.perf_counter()
+                storage.log_sensor_reading(name, value, stype, pins, mode, timestamp=ts)
+                latencies.append(time.perf_counter() - t)
+            elapsed = time.perf_counter() - t0
+        finally:
+            storage.DATABASE_PATH = old_path
+
+        # Referência: mesmo volume em uma transação só
+        conn = sqlite3.connect(path)
+        t0 = time.perf_counter()
+        conn.executemany("""INSERT INTO sensor_readings
+            (timestamp, sensor_name, temperature, pressure, velocity, sensor_type, pins, mode)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)""", data)
+        conn.commit()
+        batch_elapsed = time.perf_counter() - t0
+        conn.close()
+
+    return {
+        "rows": rows,
+        "log_sensor_reading": {"rows_per_s": rows / elapsed, "latency_s": summarize(latencies)},
+        "executemany_reference": {"rows_per_s": rows / batch_elapsed},
+        "bulk_import_csv": run_bulk(bulk_rows),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark de escrita (log_sensor_reading)")
+    ap.add_argument("--rows", type=int, default=2000, help="Linhas gravadas (padrão: 2000)")
+    ap.add_argument("--bulk-rows", type=int, default=500_000, help="Linhas da carga em massa (padrão: 500000)")
+    ap.add_argument("--output", help="Arquivo JSON de saída")
+    args = ap.parse_args()
+    res = run(args.rows, args.bulk_rows)
+    print(f"✍️  log_sensor_reading: {res['log_sensor_reading']['rows_per_s']:,.0f} linhas/s "
+          f"(executemany: {res['executemany_reference']['rows_per_s']:,.0f} linhas/s, "
+          f"bulk_import: {res['bulk_import_csv']['rows_per_s']:,.0f} linhas/s)")
+    save_results("ingest", res, args.output)
+
+
+if __name__ == "__main__":
+    main()
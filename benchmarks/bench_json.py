@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# benchmarks/bench_json.py
+# Custo de serialização das respostas de /api/chart e /api/data: JSON original (json.dumps e
+# jsonify) e os formatos compactos de wire.py (columnar e binary), com tamanho de cada um.
+#
+# Uso: python3 benchmarks/bench_json.py [--rows 1000000]
+
+import argparse
+import json
+import time
+
+from common import save_results, summarize
+from datasets import ensure_dataset
+
+import sensor_server
+import wire
+
+
+def _time(fn, repeat):
+    samples = []
+    out = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        samples.append(time.perf_counter() - t0)
+    return summarize(samples), out
+
+
+def run(rows=1_000_000, repeat=5, days=90):
+    sensor_server.DATABASE_PATH = ensure_dataset(rows, days)
+    payloads = {
+        "chart_24h": sensor_server.get_chart_data("Temp Forno", 24),
+        "chart_168h": sensor_server.get_chart_data("Temp Forno", 168),
+        "data_page_500": sensor_server.get_sensor_data(limit=500)[0],
+    }
+    results = {}
+    with sensor_server.app.app_context():
+        for name, payload in payloads.items():
+            dumps, text = _time(lambda: json.dumps(payload), repeat)
+            jsonify, _ = _time(lambda: sensor_server.jsonify(payload).get_data(), repeat)
+            n = max(1, len(payload))
+            encode = wire.data_columnar if name.startswith("data") else wire.chart_columnar
+            columnar, col_text = _time(lambda: json.dumps(encode(payload), separators=(",", ":")), repeat)
+            compact = {"columnar": {"bytes": len(col_text), "encode_s": columnar}}
+            if name.startswith("chart"):
+                binary, blob = _time(lambda: wire.chart_binary(payload), repeat)
+                compact["binary"] = {"bytes": len(blob), "encode_s": binary}
+            results[name] = {
+                "rows": len(payload),
+                "bytes": len(text.encode()),
+                "bytes_per_row": len(text.encode()) / n,
+                "json_dumps_s": dumps,
+                "jsonify_s": jsonify,
+                "jsonify_us_per_row": jsonify["median"] / n * 1e6,
+                **compact,
+            }
+            sizes = ", ".join(f"{k} {v['bytes'] / 1024:.0f} KiB" for k, v in compact.items())
+            print(f"🧾 {name}: {len(payload):,} linhas, {len(text) / 1024:.0f} KiB, "
+                  f"jsonify {jsonify['median'] * 1000:.1f} ms; {sizes}")
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark de serialização JSON das APIs")
+    ap.add_argument("--rows", type=int, default=1_000_000, help="Tamanho do banco (padrão: 1000000)")
+    ap.add_argument("--repeat", type=int, default=5, help="Repetições (padrão: 5)")
+    ap.add_argument("--output", help="Arquivo JSON de saída")
+    args = ap.parse_args()
+    save_results("json", run(args.rows, args.repeat), args.output)
+
+
+if __name__ == "__main__":
+    main()
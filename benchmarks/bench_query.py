@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# benchmarks/bench_query.py
+# Latência das funções de consulta do sensor_server.py em bancos sintéticos de 1M/10M linhas.
+#
+# Uso: python3 benchmarks/bench_query.py [--rows 1000000 10000000] [--repeat 5]
+
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from common import save_results, summarize
+from datasets import ensure_dataset
+
+import sensor_server
+from query_builder import ReadingFilter
+
+
+def queries():
+    now = datetime.now()
+    week_ago = (now - timedelta(days=7)).strftime("%Y-%m-%d %H:%M:%S")
+    now_s = now.strftime("%Y-%m-%d %H:%M:%S")
+    return {
+        "sensor_list": lambda: sensor_server.get_sensor_list(),
+        "data_page1": lambda: sensor_server.get_sensor_data(limit=50),
+        "data_sensor_page1": lambda: sensor_server.get_sensor_data("Temp Forno", limit=50),
+        "data_sensor_7d": lambda: sensor_server.get_sensor_data("Temp Forno", week_ago, now_s, limit=50),
+        "data_deep_page": lambda: sensor_server.get_sensor_data(limit=50, offset=100_000),
+        "data_towers_over_200_7d": lambda: sensor_server.get_sensor_data(limit=50, filters=ReadingFilter(
+            sensors=["Torre Nível 1", "Torre Nível 2", "Torre Nível 3"], start=week_ago, value_min=200)),
+        "chart_24h": lambda: sensor_server.get_chart_data("Temp Forno", 24),
+        "chart_168h": lambda: sensor_server.get_chart_data("Temp Forno", 168),
+        "statistics": lambda: sensor_server.get_statistics(),
+    }
+
+
+def run(sizes=(1_000_000,), repeat=5, days=90):
+    results = {}
+    for rows in sizes:
+        sensor_server.DATABASE_PATH = ensure_dataset(rows, days)
+        per_size = {}
+        for name, fn in queries().items():
+            fn()  # aquecimento (cache de páginas do SQLite/SO)
+            samples = []
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                fn()
+                samples.append(time.perf_counter() - t0)
+            per_size[name] = summarize(samples)
+            print(f"🔎 {rows:,} linhas | {name}: {per_size[name]['median'] * 1000:.1f} ms")
+        results[str(rows)] = per_size
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark das consultas do sensor_server.py")
+    ap.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 10_000_000],
+                    help="Tamanhos dos bancos (padrão: 1000000 10000000)")
+    ap.add_argument("--repeat", type=int, default=5, help="Repetições por consulta (padrão: 5)")
+    ap.add_argument("--days", type=int, default=90, help="Período coberto pelo banco (padrão: 90)")
+    ap.add_argument("--output", help="Arquivo JSON de saída")
+    args = ap.parse_args()
+    save_results("query", run(args.rows, args.repeat, args.days), args.output)
+
+
+if __name__ == "__main__":
+    main()
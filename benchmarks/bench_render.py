@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# benchmarks/bench_render.py
+# Tempo de render por frame do painel (overlay.render_frame) com a imagem real.
+#
+# Uso: python3 benchmarks/bench_render.py [--frames 300] [--scale 1.0]
+
+import argparse
+import os
+import random
+import time
+
+from common import ROOT, save_results, summarize
+
+import cv2
+import overlay
+from channels import default_registry
+from datasets import SENSORS
+
+# Mesmas posições do painel (channels.json)
+POSITIONS_NORM = {ch.name: ch.position for ch in default_registry() if ch.position}
+
+
+def run(frames=300, scales=(1.0,)):
+    rng = random.Random(0)
+    src = cv2.imread(os.path.join(ROOT, "assets", "base.jpeg"))
+    results = {}
+    for scale in scales:
+        bg = src if scale == 1.0 else cv2.resize(src, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        H, W = bg.shape[:2]
+        abs_pos = {k: (int(xn*W), int(yn*H)) for k, (xn, yn) in POSITIONS_NORM.items()}
+        font_scale = 0.8 * scale
+        thickness = max(1, int(round(2 * scale)))
+        samples = []
+        for _ in range(frames):
+            labels = {name: (str(round(base + rng.uniform(-5, 5), 1)), None) for name, _, _, base, _ in SENSORS}
+            t0 = time.perf_counter()
+            overlay.render_frame(bg, labels, abs_pos, font_scale, thickness, header="01/01/2025 12:00:00")
+            samples.append(time.perf_counter() - t0)
+        results[f"scale_{scale}"] = {"size": [W, H], "frame_s": summarize(samples)}
+        print(f"🖼️  escala {scale}: {W}x{H}, {summarize(samples)['median'] * 1000:.2f} ms/frame")
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark de render do painel")
+    ap.add_argument("--frames", type=int, default=300, help="Frames renderizados (padrão: 300)")
+    ap.add_argument("--scale", type=float, nargs="+", default=[1.0], help="Escalas (padrão: 1.0)")
+    ap.add_argument("--output", help="Arquivo JSON de saída")
+    args = ap.parse_args()
+    save_results("render", run(args.frames, args.scale), args.output)
+
+
+if __name__ == "__main__":
+    main()
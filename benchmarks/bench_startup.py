@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# benchmarks/bench_startup.py
+# Mede o tempo de partida do dashboard.py até o primeiro frame, em simulação e em modo RPi
+# com o backend GPIO falso (todos os termopares bons e com termopares abertos).
+#
+# Uso: python3 benchmarks/bench_startup.py [--runs 5]
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import ROOT, save_results, summarize
+
+SCENARIOS = {
+    "simulation": [],
+    "rpi_ok": ["--use-rpi", "--fake-gpio"],
+    "rpi_2_open": ["--use-rpi", "--fake-gpio", "--fake-open-sensors", "Temp Forno", "Torre Nível 2"],
+}
+
+
+def run_once(extra_args, workdir):
+    report = os.path.join(workdir, "startup.json")
+    cmd = [sys.executable, os.path.join(ROOT, "dashboard.py"),
+           "--img", os.path.join(ROOT, "assets", "base.jpeg"),
+           "--headless", "--exit-after-first-frame", "--startup-report", report] + extra_args
+    t0 = time.perf_counter()
+    subprocess.run(cmd, cwd=workdir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=120, check=True)
+    wall = time.perf_counter() - t0
+    with open(report) as f:
+        data = json.load(f)
+    data["process_wall_s"] = wall
+    return data
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark de partida do dashboard.py")
+    ap.add_argument("--runs", type=int, default=5, help="Execuções por cenário (padrão: 5)")
+    ap.add_argument("--output", help="Arquivo JSON de saída (padrão: benchmarks/results/)")
+    args = ap.parse_args()
+
+    results = {}
+    for name, extra in SCENARIOS.items():
+        first_frame, probe = [], []
+        for _ in range(args.runs):
+            # Banco temporário: o benchmark não toca no sensor_data.db do usuário
+            with tempfile.TemporaryDirectory() as workdir:
+                data = run_once(extra, workdir)
+            first_frame.append(data["first_frame_s"])
+            if "probe_s" in data:
+                probe.append(data["probe_s"])
+        results[name] = {"first_frame_s": summarize(first_frame)}
+        if probe:
+            results[name]["probe_s"] = summarize(probe)
+        line = f"⏱️  {name}: primeiro frame (mediana) {results[name]['first_frame_s']['median']:.3f}s"
+        if probe:
+            line += f", teste dos sensores {results[name]['probe_s']['median']:.2f}s"
+        print(line)
+
+    save_results("startup", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
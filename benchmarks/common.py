@@ -0,0 +1,65 @@
+# benchmarks/common.py
+# Utilidades compartilhadas pelos benchmarks: caminho do projeto e gravação dos resultados em JSON.
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+# Permite importar os módulos do projeto (dashboard, sensor_server, ...) a partir dos benchmarks
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def git_commit():
+    """Commit atual (curto) ou None fora de um repositório git"""
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def save_results(name, results, path=None):
+    """
+    Grava os resultados em benchmarks/results/<name>-<commit>.json (ou em `path`)
+    junto com metadados para comparar execuções entre commits.
+    """
+    commit = git_commit()
+    doc = {
+        "benchmark": name,
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{name}-{commit or 'local'}.json")
+    with open(path, "w") as f:
+        json.dump(doc, f, indent=2, ensure_ascii=False)
+    print(f"💾 Resultados gravados em {path}")
+    return path
+
+
+def summarize(samples):
+    """Mínimo, mediana, p95, p99 e máximo de uma lista de tempos (s)"""
+    ordered = sorted(samples)
+    n = len(ordered)
+    if n == 0:
+        return {}
+    return {
+        "n": n,
+        "min": ordered[0],
+        "median": ordered[n // 2],
+        "p95": ordered[min(n - 1, int(round(0.95 * (n - 1))))],
+        "p99": ordered[min(n - 1, int(round(0.99 * (n - 1))))],
+        "max": ordered[-1],
+    }
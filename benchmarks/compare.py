@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# benchmarks/compare.py
+# Compara dois resultados de benchmark (JSON) e aponta regressões.
+# Tempos: compara a mediana ("median"); vazões: compara "rows_per_s" (maior é melhor).
+#
+# Uso: python3 benchmarks/compare.py results/suite-abc123.json results/suite-def456.json [--threshold 0.1]
+
+import argparse
+import json
+import sys
+
+
+def flatten(node, prefix=""):
+    """Extrai {caminho: (valor, maior_é_melhor)} das métricas comparáveis"""
+    out = {}
+    if isinstance(node, dict):
+        for key, value in node.items():
+            path = f"{prefix}.{key}" if prefix else key
+            if key == "median" and isinstance(value, (int, float)):
+                out[prefix] = (value, False)
+            elif key == "rows_per_s" and isinstance(value, (int, float)):
+                out[path] = (value, True)
+            else:
+                out.update(flatten(value, path))
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Compara dois resultados de benchmark")
+    ap.add_argument("baseline", help="JSON de referência")
+    ap.add_argument("current", help="JSON a comparar")
+    ap.add_argument("--threshold", type=float, default=0.10, help="Variação tolerada (padrão: 0.10 = 10%%)")
+    args = ap.parse_args()
+
+    with open(args.baseline) as f:
+        base = json.load(f)
+    with open(args.current) as f:
+        cur = json.load(f)
+    a, b = flatten(base["results"]), flatten(cur["results"])
+
+    print(f"📊 {base.get('commit')} -> {cur.get('commit')} (limite {args.threshold * 100:.0f}%)")
+    regressions = 0
+    for path in sorted(set(a) & set(b)):
+        (old, higher_better), (new, _) = a[path], b[path]
+        if not old:
+            continue
+        change = (new - old) / old
+        worse = -change if higher_better else change
+        mark = "🔴" if worse > args.threshold else ("🟢" if worse < -args.threshold else "  ")
+        regressions += worse > args.threshold
+        print(f"{mark} {path:55s} {old:12.6g} -> {new:12.6g} ({change * 100:+.1f}%)")
+
+    if regressions:
+        print(f"\n❌ {regressions} regressão(ões) acima de {args.threshold * 100:.0f}%")
+        return 1
+    print("\n✅ Nenhuma regressão")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+# benchmarks/datasets.py
+# Geração de bancos sintéticos com o esquema real (storage.init_database), vários meses de
+# leituras dos 8 sensores, para medir consultas e serialização em volumes de produção.
+#
+# Uso: python3 benchmarks/datasets.py --rows 1000000 [--days 90]
+
+import argparse
+import os
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+
+from common import ROOT
+
+import storage
+
+DATA_DIR = os.path.join(ROOT, "benchmarks", "data")
+
+# (nome, tipo, pinos, valor base, passo do random walk)
+SENSORS = [
+    ("Temp Forno",       "temperature", "(11, 9, 10)",  350.0, 0.5),
+    ("Velocidade",       "velocity",    None,           600.0, 5.0),
+    ("Temp Tanque",      "temperature", "(4, 6, 5)",    120.0, 0.25),
+    ("Temp Saída Gases", "temperature", "(22, 27, 17)", 300.0, 0.5),
+    ("Pressão Gases",    "pressure",    "(2,)",           2.0, 0.02),
+    ("Torre Nível 1",    "temperature", "(25, 24, 18)", 110.0, 0.25),
+    ("Torre Nível 2",    "temperature", "(7, 8, 23)",   140.0, 0.25),
+    ("Torre Nível 3",    "temperature", "(21, 20, 16)", 180.0, 0.25),
+]
+COLUMN = {"temperature": 0, "pressure": 1, "velocity": 2}
+
+
+def iter_rows(rows, days, seed=42, end=None, mode="rpi"):
+    """Gera tuplas (timestamp, sensor_name, temperature, pressure, velocity, sensor_type, pins, mode)"""
+    rng = random.Random(seed)
+    end = end or datetime.now(timezone.utc).replace(tzinfo=None)
+    cycles = max(1, rows // len(SENSORS))
+    interval = days * 86400.0 / cycles
+    start = end - timedelta(seconds=interval * cycles)
+    levels = [s[3] for s in SENSORS]
+
+    produced = 0
+    for c in range(cycles + 1):
+        ts = (start + timedelta(seconds=interval * c)).strftime("%Y-%m-%d %H:%M:%S")
+        for i, (name, stype, pins, base, step) in enumerate(SENSORS):
+            if produced >= rows:
+                return
+            # random walk com retorno lento ao valor base
+            levels[i] += rng.gauss(0.0, step) + (base - levels[i]) * 0.001
+            values = [None, None, None]
+            values[COLUMN[stype]] = round(levels[i], 2)
+            yield (ts, name, values[0], values[1], values[2], stype, pins, mode)
+            produced += 1
+
+
+def generate_dataset(path, rows, days=90, seed=42, batch=200_000, verbose=True):
+    """Cria (sobrescreve) um banco sintético com `rows` leituras distribuídas em `days` dias"""
+    if os.path.exists(path):
+        os.remove(path)
+    storage.init_database(path)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("PRAGMA journal_mode=MEMORY")
+    t0 = time.perf_counter()
+    buf = []
+    done = 0
+    for row in iter_rows(rows, days, seed):
+        buf.append(row)
+        if len(buf) >= batch:
+            conn.executemany("""INSERT INTO sensor_readings
+                (timestamp, sensor_name, temperature, pressure, velocity, sensor_type, pins, mode)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)""", buf)
+            conn.commit()
+            done += len(buf)
+            buf = []
+            if verbose:
+                print(f"   {done:,}/{rows:,} linhas ({done / (time.perf_counter() - t0):,.0f}/s)")
+    if buf:
+        conn.executemany("""INSERT INTO sensor_readings
+            (timestamp, sensor_name, temperature, pressure, velocity, sensor_type, pins, mode)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)""", buf)
+        conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+    return path
+
+
+def ensure_dataset(rows, days=90, seed=42):
+    """Retorna o caminho de um banco sintético em benchmarks/data/, gerando-o se não existir"""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    path = os.path.join(DATA_DIR, f"synthetic-{rows}-{days}d-s{seed}.db")
+    if not os.path.exists(path):
+        print(f"🏗️  Gerando banco sintético com {rows:,} linhas ({days} dias)...")
+        generate_dataset(path + ".tmp", rows, days, seed)
+        os.replace(path + ".tmp", path)
+    return path
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Gera banco sintético com o esquema do TempPi")
+    ap.add_argument("--rows", type=int, default=1_000_000, help="Número de leituras (padrão: 1000000)")
+    ap.add_argument("--days", type=int, default=90, help="Período coberto em dias (padrão: 90)")
+    ap.add_argument("--seed", type=int, default=42, help="Semente (padrão: 42)")
+    ap.add_argument("--output", help="Caminho do banco (padrão: benchmarks/data/)")
+    args = ap.parse_args()
+    if args.output:
+        generate_dataset(args.output, args.rows, args.days, args.seed)
+        print(f"✅ Banco gerado: {args.output}")
+    else:
+        print(f"✅ Banco pronto: {ensure_dataset(args.rows, args.days, args.seed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+# benchmarks/load_test.py
+# Carga de vários navegadores contra o sensor_server.py: quantos tablets um Pi atende antes
+# de /api/chart ficar lento demais?
+#
+# Cada cliente simulado repete o tráfego real das páginas (mesmas rotas, formatos e intervalos):
+#   painel (index)  abertura: página, sensors, channels, data (colunar), stats, 4 séries de 24h (binário)
+#                   a cada 30 s: data + stats (main.js / dashboard.js); a cada 5 min: overview de novo
+#   detalhe         abertura: página, sensors, série de 24h com limit=500 (binário)
+#                   a cada 30 s: a série (auto-refresh do sensor_detail.js)
+# Como o navegador, cada cliente guarda o ETag de cada URL e revalida com If-None-Match.
+#
+# O servidor roda em outro processo, sobre um banco sintético recém-gerado (termina "agora",
+# para as janelas de 24h terem dados), enquanto uma thread grava leituras como a aquisição
+# (lotes a cada 0,5 s). Esperas por lock do SQLite são medidas dos dois lados:
+#   gravador  duração do COMMIT (espera os leitores soltarem o lock para gravar)
+#   leitores  sonda que abre uma leitura a cada 100 ms (espera o COMMIT do gravador)
+# além das respostas 5xx ("database is locked").
+#
+# Uso:
+#   python3 benchmarks/load_test.py --clients 1 5 10 20 --duration 60
+#   python3 benchmarks/load_test.py --clients 20 --speed 10     (intervalos 10x menores)
+#   python3 benchmarks/load_test.py --url http://raspberrypi:3333 --clients 5   (servidor já rodando)
+
+import argparse
+import http.client
+import os
+import random
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import quote, urlsplit
+
+from common import ROOT, save_results, summarize
+from datasets import SENSORS, generate_dataset
+
+import storage
+from sampling import format_timestamp
+
+COLUMNAR = "application/vnd.temppi.columnar+json"
+BINARY = "application/vnd.temppi.series"
+POLL_INTERVAL = 30.0       # main.js (data), dashboard.js (stats), sensor_detail.js (auto-refresh)
+OVERVIEW_INTERVAL = 300.0  # dashboard.js (gráfico de overview)
+OVERVIEW_SENSORS = 4
+WRITE_FLUSH = 0.5          # storage.AsyncWriter
+PROBE_INTERVAL = 0.1
+SLOW_LOCK = 0.010          # espera acima disso conta como bloqueio
+
+SERVER_CODE = ("import sys, sensor_server; sensor_server.DATABASE_PATH = sys.argv[1]; "
+               "from werkzeug.serving import run_simple; "
+               "run_simple('127.0.0.1', int(sys.argv[2]), sensor_server.app, threaded=True)")
+
+
+# ============= CLIENTE =============
+class Client:
+    """Um navegador com uma página aberta (conexão keep-alive e cache de ETags próprios)"""
+
+    def __init__(self, host, port, page, sensor, speed, results):
+        self.host, self.port = host, port
+        self.page = page
+        self.sensor = sensor
+        self.speed = speed
+        self.results = results  # lista compartilhada de (rota, status, latência, bytes)
+        self.etags = {}
+        self.conn = None
+
+    def get(self, route, path, accept="application/json"):
+        headers = {"Accept": accept}
+        etag = self.etags.get((path, accept))
+        if etag:
+            headers["If-None-Match"] = etag
+        t0 = time.perf_counter()
+        try:
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+            self.conn.request("GET", path, headers=headers)
+            response = self.conn.getresponse()
+            body = response.read()
+            status = response.status
+            if response.getheader("ETag"):
+                self.etags[(path, accept)] = response.getheader("ETag")
+        except (OSError, http.client.HTTPException):
+            self.conn = None  # conexão caiu: o navegador abriria outra
+            status, body = 0, b""
+        self.results.append((route, status, time.perf_counter() - t0, len(body)))
+        return status
+
+    # --- página do painel ---
+    def overview(self):
+        self.get("sensors", "/api/sensors")
+        for name, *_ in SENSORS[:OVERVIEW_SENSORS]:
+            self.get("chart_overview", f"/api/chart/{quote(name)}?hours=24", BINARY)
+
+    def poll_index(self):
+        self.get("data", "/api/data?page=1&per_page=50", COLUMNAR)
+        self.get("stats", "/api/stats")
+
+    def open_index(self):
+        self.get("page", "/", "text/html")
+        self.get("sensors", "/api/sensors")
+        self.get("channels", "/api/channels")
+        self.overview()
+        self.poll_index()
+
+    # --- página de detalhe ---
+    def poll_detail(self):
+        self.get("chart_detail", f"/api/chart/{quote(self.sensor)}?hours=24&limit=500", BINARY)
+
+    def open_detail(self):
+        self.get("page", f"/sensor/{quote(self.sensor)}", "text/html")
+        self.get("sensors", "/api/sensors")
+        self.poll_detail()
+
+    def run(self, start_at, stop_at):
+        if self.page == "index":
+            opener, tasks = self.open_index, [[POLL_INTERVAL, self.poll_index], [OVERVIEW_INTERVAL, self.overview]]
+        else:
+            opener, tasks = self.open_detail, [[POLL_INTERVAL, self.poll_detail]]
+        _sleep_until(start_at, stop_at)
+        if time.monotonic() >= stop_at:
+            return
+        opener()
+        opened = time.monotonic()
+        for task in tasks:
+            task.append(opened + task[0] / self.speed)  # próximo disparo
+        while True:
+            task = min(tasks, key=lambda t: t[2])
+            if not _sleep_until(task[2], stop_at):
+                break
+            task[1]()
+            task[2] += task[0] / self.speed
+        if self.conn is not None:
+            self.conn.close()
+
+
+def _sleep_until(when, stop_at):
+    """Dorme até `when`; False se o teste acabar antes"""
+    while True:
+        now = time.monotonic()
+        if now >= stop_at:
+            return False
+        if now >= when:
+            return True
+        time.sleep(min(when - now, stop_at - now, 0.5))
+
+
+# ============= GRAVADOR E SONDA DE LOCK =============
+class AcquisitionWriter(threading.Thread):
+    """Grava leituras novas como a aquisição (storage.AsyncWriter), medindo o COMMIT"""
+
+    def __init__(self, path, rate, stop):
+        super().__init__(daemon=True)
+        self.path, self.rate, self.stop = path, rate, stop
+        self.commits = []
+        self.errors = 0
+        self.rows = 0
+
+    def run(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        levels = [s[3] for s in SENSORS]
+        carry = 0.0
+        i = 0
+        while not self.stop.wait(WRITE_FLUSH):
+            carry += self.rate * WRITE_FLUSH
+            batch = []
+            now = time.time()
+            while carry >= 1.0:
+                name, stype, pins, base, step = SENSORS[i % len(SENSORS)]
+                k = i % len(SENSORS)
+                levels[k] += random.gauss(0.0, step) + (base - levels[k]) * 0.01
+                batch.append(storage.reading_row(name, round(levels[k], 2), stype, pins, "rpi",
+                                                 timestamp=format_timestamp(now)))
+                carry -= 1.0
+                i += 1
+            if not batch:
+                continue
+            try:
+                conn.executemany(storage.INSERT_SQL, batch)
+                t0 = time.perf_counter()
+                conn.commit()
+                self.commits.append(time.perf_counter() - t0)
+                self.rows += len(batch)
+            except sqlite3.OperationalError:
+                conn.rollback()
+                self.errors += 1
+        conn.close()
+
+
+class LockProbe(threading.Thread):
+    """Abre uma leitura a cada PROBE_INTERVAL e mede quanto esperou pelo lock compartilhado"""
+
+    def __init__(self, path, stop):
+        super().__init__(daemon=True)
+        self.path, self.stop = path, stop
+        self.waits = []
+
+    def run(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        while not self.stop.wait(PROBE_INTERVAL):
+            t0 = time.perf_counter()
+            conn.execute("SELECT MAX(id) FROM sensor_readings").fetchone()
+            self.waits.append(time.perf_counter() - t0)
+        conn.close()
+
+
+# ============= EXECUÇÃO =============
+def run_level(host, port, clients, duration, speed, detail_share, ramp, db, write_rate, seed):
+    rng = random.Random(seed + clients)
+    results = []
+    stop = threading.Event()
+    writer = AcquisitionWriter(db, write_rate, stop) if db and write_rate > 0 else None
+    probe = LockProbe(db, stop) if db else None
+    for thread in (writer, probe):
+        if thread:
+            thread.start()
+
+    t0 = time.monotonic()
+    stop_at = t0 + duration
+    threads = []
+    for n in range(clients):
+        page = "detail" if rng.random() < detail_share else "index"
+        client = Client(host, port, page, rng.choice(SENSORS)[0], speed, results)
+        # Aberturas espalhadas na rampa, como tablets ligados em horários diferentes
+        start_at = t0 + (ramp * n / clients if clients > 1 else 0.0)
+        thread = threading.Thread(target=client.run, args=(start_at, stop_at), daemon=True)
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - t0
+    stop.set()
+    for thread in (writer, probe):
+        if thread:
+            thread.join()
+
+    level = {"clients": clients, "duration_s": elapsed, "requests": len(results),
+             "requests_per_s": len(results) / elapsed, "routes": {}}
+    for route in sorted({r[0] for r in results}):
+        rows = [r for r in results if r[0] == route]
+        ok = [r for r in rows if r[1] in (200, 304)]
+        level["routes"][route] = {
+            "requests": len(rows),
+            "not_modified": sum(1 for r in rows if r[1] == 304),
+            "errors": len(rows) - len(ok),
+            "kb_per_request": sum(r[3] for r in rows) / len(rows) / 1024,
+            "latency_s": summarize([r[2] for r in ok]),
+        }
+    level["latency_s"] = summarize([r[2] for r in results if r[1] in (200, 304)])
+    level["errors"] = sum(1 for r in results if r[1] not in (200, 304))
+    level["server_errors_5xx"] = sum(1 for r in results if r[1] >= 500)
+    if writer:
+        level["writer"] = {"rows": writer.rows, "failed_commits": writer.errors,
+                           "commit_s": summarize(writer.commits)}
+    if probe:
+        level["reader_lock_wait_s"] = summarize(probe.waits)
+        level["reader_lock_wait_s"]["blocked_share"] = (
+            sum(1 for w in probe.waits if w > SLOW_LOCK) / len(probe.waits) if probe.waits else 0.0)
+    return level
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(db, port):
+    proc = subprocess.Popen([sys.executable, "-c", SERVER_CODE, db, str(port)], cwd=ROOT,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/api/channels")
+            if conn.getresponse().status == 200:
+                conn.close()
+                return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise SystemExit("❌ sensor_server.py não respondeu em 30s")
+
+
+def print_level(level):
+    lat = level["latency_s"]
+    print(f"👥 {level['clients']:3d} clientes: {level['requests_per_s']:7.1f} req/s, "
+          f"p50 {lat.get('median', 0) * 1000:6.1f} ms, p95 {lat.get('p95', 0) * 1000:6.1f} ms, "
+          f"p99 {lat.get('p99', 0) * 1000:6.1f} ms, erros {level['errors']}")
+    for route, r in level["routes"].items():
+        rl = r["latency_s"]
+        print(f"     {route:15s} {r['requests']:6d} req  304: {r['not_modified']:5d}  "
+              f"p50 {rl.get('median', 0) * 1000:7.1f} ms  p95 {rl.get('p95', 0) * 1000:7.1f} ms  "
+              f"p99 {rl.get('p99', 0) * 1000:7.1f} ms  {r['kb_per_request']:7.1f} KB")
+    if "writer" in level:
+        c = level["writer"]["commit_s"]
+        print(f"     🔒 gravador: {level['writer']['rows']} linhas, COMMIT p95 {c.get('p95', 0) * 1000:.1f} ms "
+              f"(máx {c.get('max', 0) * 1000:.1f} ms), {level['writer']['failed_commits']} falhas")
+    if "reader_lock_wait_s" in level:
+        w = level["reader_lock_wait_s"]
+        print(f"     🔒 leitura: espera p95 {w.get('p95', 0) * 1000:.1f} ms (máx {w.get('max', 0) * 1000:.1f} ms), "
+              f"{w['blocked_share'] * 100:.1f}% das sondas bloqueadas > {SLOW_LOCK * 1000:.0f} ms")
+
+
+def run(levels=(1, 5, 10, 20), duration=60.0, speed=1.0, detail_share=0.3, ramp=None, rows=500_000, days=30,
+        write_rate=8.0, url=None, db=None, seed=1):
+    tmp = None
+    proc = None
+    if url:
+        parts = urlsplit(url)
+        host, port = parts.hostname, parts.port or 80
+    else:
+        tmp = tempfile.TemporaryDirectory()
+        db = os.path.join(tmp.name, "load.db")
+        print(f"🏗️  Banco sintético: {rows:,} linhas ({days} dias até agora)")
+        generate_dataset(db, rows, days, verbose=False)
+        host, port = "127.0.0.1", free_port()
+        proc = start_server(db, port)
+    try:
+        results = {"rows": rows if not url else None, "speed": speed, "detail_share": detail_share,
+                   "write_rate": write_rate if db else 0, "levels": []}
+        for clients in levels:
+            level = run_level(host, port, clients, duration, speed, detail_share,
+                              ramp if ramp is not None else min(10.0, duration / 4), db, write_rate, seed)
+            print_level(level)
+            results["levels"].append(level)
+        return results
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait()
+        if tmp:
+            tmp.cleanup()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Teste de carga do sensor_server.py com o tráfego das páginas web")
+    ap.add_argument("--clients", type=int, nargs="+", default=[1, 5, 10, 20],
+                    help="Números de clientes simultâneos, um patamar por valor (padrão: 1 5 10 20)")
+    ap.add_argument("--duration", type=float, default=60.0, help="Segundos por patamar (padrão: 60)")
+    ap.add_argument("--speed", type=float, default=1.0,
+                    help="Divide os intervalos de atualização (10 = cada cliente pede 10x mais; padrão: 1)")
+    ap.add_argument("--detail-share", type=float, default=0.3,
+                    help="Fração dos clientes na página de detalhe (padrão: 0.3)")
+    ap.add_argument("--ramp", type=float, help="Segundos para abrir todas as páginas (padrão: 1/4 do patamar, até 10)")
+    ap.add_argument("--rows", type=int, default=500_000, help="Linhas do banco sintético (padrão: 500000)")
+    ap.add_argument("--days", type=int, default=30, help="Dias cobertos pelo banco sintético (padrão: 30)")
+    ap.add_argument("--write-rate", type=float, default=8.0,
+                    help="Leituras/s gravadas durante o teste, como a aquisição (0 desliga; padrão: 8)")
+    ap.add_argument("--url", help="Servidor já rodando (sem banco sintético)")
+    ap.add_argument("--db", help="Com --url: banco do servidor, para gravar e medir as esperas por lock")
+    ap.add_argument("--output", help="Arquivo JSON de saída")
+    args = ap.parse_args()
+    if args.db and not args.url:
+        ap.error("--db só faz sentido com --url")
+    if args.speed <= 0 or not 0.0 <= args.detail_share <= 1.0:
+        ap.error("--speed deve ser > 0 e --detail-share entre 0 e 1")
+    res = run(args.clients, args.duration, args.speed, args.detail_share, args.ramp, args.rows, args.days,
+              args.write_rate, args.url, args.db)
+    save_results("load", res, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+# benchmarks/run_all.py
+# Roda a suíte completa (escrita, consultas, JSON, render) e grava um único JSON
+# em benchmarks/results/suite-<commit>.json para comparação com benchmarks/compare.py.
+#
+# Uso: python3 benchmarks/run_all.py [--quick]
+
+import argparse
+
+from common import save_results
+
+import bench_ingest
+import bench_json
+import bench_query
+import bench_render
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Suíte de benchmarks do TempPi")
+    ap.add_argument("--quick", action="store_true", help="Bancos pequenos (100 mil linhas) para uma checagem rápida")
+    ap.add_argument("--rows", type=int, nargs="+", help="Tamanhos dos bancos das consultas (padrão: 1M e 10M)")
+    ap.add_argument("--repeat", type=int, default=5, help="Repetições por medida (padrão: 5)")
+    ap.add_argument("--output", help="Arquivo JSON de saída")
+    args = ap.parse_args()
+
+    sizes = args.rows or ([100_000] if args.quick else [1_000_000, 10_000_000])
+    results = {
+        "ingest": bench_ingest.run(500 if args.quick else 2000, 50_000 if args.quick else 500_000),
+        "query": bench_query.run(sizes, args.repeat),
+        "json": bench_json.run(sizes[0], args.repeat),
+        "render": bench_render.run(100 if args.quick else 300),
+    }
+    save_results("suite-quick" if args.quick else "suite", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+# bulk_import.py
+# Carga em massa de leituras no sensor_data.db: CSV (logs de laboratório) ou outro
+# sensor_data.db (SD de um Pi trocado). O caminho normal de gravação (log_sensor_reading,
+# uma conexão e um commit por linha) faz algumas centenas de linhas/s; aqui são centenas de milhares.
+#
+#   1. as linhas são lidas em fluxo, validadas e enfileiradas numa tabela temporária cuja chave
+#      é (planta, sensor, timestamp): repetidas dentro da carga somem já aqui (executemany em
+#      lotes grandes; outro .db vai direto por ATTACH + INSERT ... SELECT, sem passar pelo Python)
+#   2. o que o banco já tem sai da carga (uma busca no idx_sensor_ts por linha)
+#   3. o que sobra entra em sensor_readings num único INSERT ... SELECT ordenado pelo tempo;
+#      se a carga for grande perto do banco, os índices são removidos antes e reconstruídos
+#      depois (uma ordenação por índice em vez de uma inserção em árvore por linha)
+#
+# O banco só é alterado na etapa 3, numa transação: uma carga interrompida não deixa nada pela metade.
+# A carga roda com PRAGMA synchronous=OFF: uma queda de energia durante a carga pode corromper o arquivo;
+# importe com o dashboard parado e, se o banco for valioso, numa cópia.
+#
+# CSV: cabeçalho com timestamp e sensor_name (ou sensor) e o valor em `value` ou nas colunas
+# temperature/pressure/velocity. Opcionais: sensor_type (padrão: tipo do channels.json),
+# mode, pins, quality, rig_id. Timestamps em UTC (ISO 8601 ou epoch em segundos).
+#
+# Uso:
+#   python3 bulk_import.py sensor_data.db leituras_lab.csv
+#   python3 bulk_import.py sensor_data.db /media/sd_antigo/sensor_data.db --rig forno-02
+
+import argparse
+import csv
+import os
+import re
+import sqlite3
+import sys
+import time
+from datetime import datetime, timezone
+
+import storage
+from channels import TYPES, default_registry
+from ingest import RIG_ID_RE, RIG_UPSERT_SQL
+from sampling import format_timestamp
+
+BATCH_ROWS = 50_000
+PROGRESS_EVERY = 500_000
+DEFER_RATIO = 0.2        # carga maior que 20% do banco: índices reconstruídos no fim
+REPORT_REJECTED = 5      # primeiras linhas rejeitadas mostradas no terminal
+
+COLUMNS = ("timestamp", "sensor_name", "temperature", "pressure", "velocity", "sensor_type", "pins", "mode",
+           "quality", "rig_id")
+QUALITIES = ("good", "stale", "fault")
+
+# Chave primária = chave de deduplicação: INSERT OR IGNORE descarta as repetidas da própria carga
+# já na entrada. rig_key é '' para leituras locais (NULL não se repete numa chave única)
+STAGE_SQL = '''
+    CREATE TEMP TABLE import_stage (
+        timestamp TEXT NOT NULL, sensor_name TEXT NOT NULL, temperature REAL, pressure REAL, velocity REAL,
+        sensor_type TEXT, pins TEXT, mode TEXT, quality TEXT, rig_key TEXT NOT NULL,
+        PRIMARY KEY (sensor_name, timestamp, rig_key)
+    ) WITHOUT ROWID
+'''
+STAGE_INSERT_SQL = f"INSERT OR IGNORE INTO import_stage VALUES ({', '.join('?' * (len(COLUMNS) - 1))}, COALESCE(?, ''))"
+
+TIMESTAMP_RE = re.compile(r"^\d{4}-\d\d-\d\d \d\d:\d\d:\d\d(\.\d{1,6})?$")
+TIMESTAMP_GLOB = "[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9] [0-9][0-9]:[0-9][0-9]:[0-9][0-9]*"
+
+
+class Rejected(ValueError):
+    """Linha da origem que não pode ser importada"""
+
+
+def normalize_timestamp(text):
+    """
+    Texto da origem -> formato do banco (UTC, 'AAAA-MM-DD HH:MM:SS[.fff]').
+    O caminho comum (já no formato) é só uma regex; ISO com 'T'/fuso e epoch são convertidos.
+    """
+    text = text.strip()
+    candidate = text.replace("T", " ", 1)
+    if candidate.endswith("Z"):
+        candidate = candidate[:-1]
+    if TIMESTAMP_RE.match(candidate):
+        return candidate
+    try:
+        return format_timestamp(float(text))
+    except ValueError:
+        pass
+    try:
+        dt = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        raise Rejected(f"timestamp inválido '{text}'")
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3] if dt.microsecond else dt.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _number(text):
+    if text == "":
+        return None
+    try:
+        return float(text)
+    except ValueError:
+        raise Rejected(f"valor não numérico '{text}'")
+
+
+class ImportStats:
+    def __init__(self):
+        self.read = 0        # linhas lidas das origens
+        self.rejected = 0    # inválidas (puladas)
+        self.staged = 0      # válidas enviadas para a carga
+        self.duplicates = 0  # válidas que já existiam (no banco ou na própria carga)
+        self.inserted = 0
+        self.examples = []
+
+    def reject(self, where, error, count=1):
+        self.rejected += count
+        if len(self.examples) < REPORT_REJECTED:
+            self.examples.append(f"{where}: {error}")
+
+
+# ============= CSV =============
+def csv_rows(path, stats, mode="rpi", rig=None, registry=None):
+    """Gera linhas na ordem de COLUMNS a partir de um CSV (linhas inválidas são contadas e puladas)"""
+    registry = registry or default_registry()
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = [h.strip().lower() for h in next(reader, [])]
+        col = {name: i for i, name in enumerate(header)}
+        col.setdefault("sensor_name", col.get("sensor"))
+        col.setdefault("sensor_type", col.get("type"))
+        if col.get("timestamp") is None or col["sensor_name"] is None:
+            raise SystemExit(f"❌ {path}: cabeçalho precisa de 'timestamp' e 'sensor_name'")
+        value_cols = [(TYPES.index(t), col[t]) for t in TYPES if t in col]
+        if "value" not in col and not value_cols:
+            raise SystemExit(f"❌ {path}: cabeçalho precisa de 'value' ou de temperature/pressure/velocity")
+        i_ts, i_name, i_type = col["timestamp"], col["sensor_name"], col["sensor_type"]
+        i_value, i_mode, i_pins = col.get("value"), col.get("mode"), col.get("pins")
+        i_quality, i_rig = col.get("quality"), col.get("rig_id")
+        width = len(header)
+        types = {}  # tipo de cada sensor pelo registro (uma busca por nome, não por linha)
+        match = TIMESTAMP_RE.match
+
+        for line, row in enumerate(reader, start=2):
+            stats.read += 1
+            try:
+                if len(row) < width:
+                    raise Rejected(f"{len(row)} colunas, esperado {width}")
+                name = row[i_name]
+                stype = row[i_type] if i_type is not None else None
+                if not stype:
+                    stype = types.get(name)
+                    if stype is None:
+                        stype = types[name] = registry.type_of(name.strip())
+                if stype not in TYPES:
+                    raise Rejected(f"tipo '{stype}' desconhecido para '{name}'")
+                ts = row[i_ts]
+                if not match(ts):
+                    ts = normalize_timestamp(ts)
+                values = [None, None, None]
+                if i_value is not None and row[i_value] != "":
+                    values[TYPES.index(stype)] = _number(row[i_value])
+                else:
+                    for index, i in value_cols:
+                        values[index] = _number(row[i])
+                quality = row[i_quality] if i_quality is not None and row[i_quality] else "good"
+                if quality not in QUALITIES:
+                    raise Rejected(f"qualidade '{quality}' inválida")
+                yield (ts, name, *values, stype,
+                       (row[i_pins] or None) if i_pins is not None else None,
+                       (row[i_mode] or mode) if i_mode is not None else mode,
+                       quality, rig or ((row[i_rig] or None) if i_rig is not None else None))
+            except Rejected as e:
+                stats.reject(f"{os.path.basename(path)}:{line}", e)
+
+
+def is_sqlite(path):
+    with open(path, "rb") as f:
+        return f.read(16) == b"SQLite format 3\x00"
+
+
+# ============= CARGA =============
+class BulkImporter:
+    """
+    Carga em uma transação:
+        importer = BulkImporter("sensor_data.db")
+        importer.stage(csv_rows(...))       # ou importer.stage_db("antigo.db"); quantas origens quiser
+        importer.finish()                   # dedup contra o banco, inserção e índices; commit
+    defer_indexes: "auto" (pela proporção carga/banco), "always" ou "never"
+    """
+
+    def __init__(self, path, defer_indexes="auto", verbose=True):
+        if not os.path.exists(path):
+            storage.init_database(path)
+        self.path = path
+        self.defer_indexes = defer_indexes
+        self.verbose = verbose
+        self.stats = ImportStats()
+        self.t0 = time.perf_counter()
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        storage.migrate_schema(self.conn)  # idx_sensor_ts é usado na deduplicação
+        self._synchronous = self.conn.execute("PRAGMA synchronous").fetchone()[0]
+        self.conn.execute("PRAGMA synchronous=OFF")
+        self.conn.execute("PRAGMA cache_size=-65536")       # 64 MB para as ordenações
+        self.conn.execute("PRAGMA temp.cache_size=-65536")  # e para a tabela de carga
+        self.conn.execute("PRAGMA threads=4")               # ordenação dos índices em paralelo, se disponível
+        self.conn.execute(STAGE_SQL)
+        # channel_id pelo registro atual, resolvido por junção na inserção final
+        self.conn.execute("CREATE TEMP TABLE import_channels (name TEXT PRIMARY KEY, id INTEGER)")
+        registry = default_registry()
+        self.conn.executemany("INSERT INTO import_channels VALUES (?, ?)",
+                              ((ch.name, ch.id) for ch in registry.channels + registry.derived))
+
+    def _log(self, message):
+        if self.verbose:
+            print(message, flush=True)
+
+    def _progress(self):
+        elapsed = time.perf_counter() - self.t0
+        self._log(f"📥 {self.stats.read:,} linhas lidas ({self.stats.read / elapsed:,.0f}/s)")
+
+    def stage(self, rows):
+        """Enfileira linhas (na ordem de COLUMNS) na tabela temporária, em lotes"""
+        stats = self.stats
+        next_report = (stats.read // PROGRESS_EVERY + 1) * PROGRESS_EVERY
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= BATCH_ROWS:
+                self._stage_batch(batch)
+                batch.clear()
+                if stats.read >= next_report:
+                    self._progress()
+                    next_report += PROGRESS_EVERY
+        if batch:
+            self._stage_batch(batch)
+
+    def _stage_batch(self, batch):
+        with self.conn:  # uma transação por lote (só a tabela temporária é escrita)
+            self.conn.execute("BEGIN")
+            self.conn.executemany(STAGE_INSERT_SQL, batch)
+        self.stats.staged += len(batch)
+
+    def stage_db(self, path, rig=None):
+        """
+        Enfileira as leituras de outro sensor_data.db (qualquer versão do esquema) direto no
+        SQLite (ATTACH + INSERT ... SELECT), sem passar cada linha pelo Python
+        """
+        conn, stats = self.conn, self.stats
+        conn.execute("ATTACH DATABASE ? AS src", (path,))
+        try:
+            present = {row[1] for row in conn.execute("PRAGMA src.table_info(sensor_readings)")}
+            if not present:
+                raise SystemExit(f"❌ {path}: tabela sensor_readings não encontrada")
+            # Bancos antigos não têm quality/rig_id
+            quality = "COALESCE(quality, 'good')" if "quality" in present else "'good'"
+            rig_sql = "?" if rig else ("rig_id" if "rig_id" in present else "NULL")
+            valid = (f"sensor_name IS NOT NULL AND sensor_type IN ({', '.join('?' * len(TYPES))}) "
+                     f"AND replace(timestamp, 'T', ' ') GLOB '{TIMESTAMP_GLOB}'")
+            total, ok = conn.execute(f"SELECT COUNT(*), TOTAL({valid}) FROM src.sensor_readings", TYPES).fetchone()
+            with conn:
+                conn.execute("BEGIN")
+                conn.execute(f"""
+                    INSERT OR IGNORE INTO import_stage
+                    SELECT replace(timestamp, 'T', ' '), sensor_name, temperature, pressure, velocity, sensor_type,
+                           pins, COALESCE(mode, 'simulation'), {quality}, COALESCE({rig_sql}, '')
+                    FROM src.sensor_readings WHERE {valid}""", ((rig,) if rig else ()) + TYPES)
+            ok = int(ok)
+            stats.read += total
+            stats.staged += ok
+            if total > ok:
+                stats.reject(os.path.basename(path), f"{total - ok} linha(s) sem sensor, tipo ou timestamp válido",
+                             total - ok)
+            self._progress()
+        finally:
+            conn.execute("DETACH DATABASE src")
+
+    def _indexes(self):
+        return self.conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'index' "
+                                 "AND tbl_name = 'sensor_readings' AND sql IS NOT NULL").fetchall()
+
+    def finish(self):
+        """Insere o que ainda não está no banco e reconstrói os índices adiados; retorna ImportStats"""
+        conn, stats = self.conn, self.stats
+        try:
+            conn.execute("BEGIN")
+            last_id = conn.execute("SELECT MAX(id) FROM sensor_readings").fetchone()[0] or 0
+            if last_id:
+                # Contra o banco: uma busca no idx_sensor_ts por linha (antes de mexer nos índices)
+                self._log("🔎 Separando o que o banco já tem (planta, sensor, timestamp)...")
+                conn.execute("""DELETE FROM import_stage WHERE EXISTS (
+                                    SELECT 1 FROM main.sensor_readings r
+                                    WHERE r.sensor_name = import_stage.sensor_name
+                                      AND r.timestamp = import_stage.timestamp
+                                      AND COALESCE(r.rig_id, '') = import_stage.rig_key)""")
+            new_rows = conn.execute("SELECT COUNT(*) FROM import_stage").fetchone()[0]
+            stats.duplicates = stats.staged - new_rows
+
+            defer = self.defer_indexes == "always" or (
+                self.defer_indexes == "auto" and new_rows > DEFER_RATIO * last_id)
+            indexes = self._indexes() if defer and new_rows else []
+            for name, _ in indexes:
+                conn.execute(f"DROP INDEX {name}")
+
+            self._log(f"✍️  Inserindo {new_rows:,} linhas{' (índices adiados)' if indexes else ''}...")
+            conn.execute(f"""
+                INSERT INTO main.sensor_readings ({', '.join(COLUMNS)}, channel_id)
+                SELECT s.timestamp, s.sensor_name, s.temperature, s.pressure, s.velocity, s.sensor_type,
+                       s.pins, s.mode, s.quality, NULLIF(s.rig_key, ''), c.id
+                FROM import_stage s LEFT JOIN import_channels c ON c.name = s.sensor_name
+                ORDER BY s.timestamp""")
+            stats.inserted = new_rows
+
+            if indexes:
+                self._log(f"🗂️  Reconstruindo {len(indexes)} índices...")
+                for _, sql in indexes:
+                    conn.execute(sql)
+
+            # Resumo das plantas (servidor central), como no POST /api/ingest
+            now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+            for rig_id, last_reading, count in conn.execute(
+                    "SELECT rig_key, MAX(timestamp), COUNT(*) FROM import_stage "
+                    "WHERE rig_key != '' GROUP BY rig_key").fetchall():
+                conn.execute(RIG_UPSERT_SQL, (rig_id, now, now, last_reading, count))
+            conn.execute("COMMIT")
+        except BaseException:
+            self.abort()
+            raise
+        self._close()
+        return stats
+
+    def abort(self):
+        """Descarta a carga inteira (nada do que foi enfileirado chega ao banco)"""
+        if self.conn.in_transaction:
+            self.conn.execute("ROLLBACK")
+        self._close()
+
+    def _close(self):
+        self.conn.execute("DROP TABLE IF EXISTS temp.import_stage")
+        self.conn.execute("DROP TABLE IF EXISTS temp.import_channels")
+        self.conn.execute(f"PRAGMA synchronous={self._synchronous}")
+        self.conn.close()
+
+
+def run_import(db, sources, mode="rpi", rig=None, defer_indexes="auto", verbose=True):
+    """Importa os arquivos de `sources` (CSV ou SQLite) para `db` numa transação; retorna (ImportStats, segundos)"""
+    importer = BulkImporter(db, defer_indexes, verbose)
+    try:
+        for path in sources:
+            if verbose:
+                print(f"📂 {path}")
+            if is_sqlite(path):
+                importer.stage_db(path, rig)
+            else:
+                importer.stage(csv_rows(path, importer.stats, mode, rig))
+    except BaseException:
+        importer.abort()
+        raise
+    stats = importer.finish()
+    return stats, time.perf_counter() - importer.t0
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Importa leituras de CSV ou de outro sensor_data.db em alta velocidade")
+    ap.add_argument("db", help="Banco de destino (criado se não existir)")
+    ap.add_argument("sources", nargs="+", help="Arquivos CSV ou bancos SQLite de origem")
+    ap.add_argument("--rig", help="rig_id das linhas importadas (servidor central; padrão: o da origem)")
+    ap.add_argument("--mode", default="rpi", choices=("rpi", "simulation"),
+                    help="Modo das linhas de CSV sem coluna mode (padrão: rpi)")
+    ap.add_argument("--defer-indexes", default="auto", choices=("auto", "always", "never"),
+                    help=f"Reconstruir os índices no fim (auto: carga > {DEFER_RATIO:.0%} do banco)")
+    args = ap.parse_args()
+    if args.rig and not RIG_ID_RE.match(args.rig):
+        ap.error("--rig: letras, números, '.', '_' ou '-', até 64")
+    for path in args.sources:
+        if not os.path.exists(path):
+            ap.error(f"arquivo não encontrado: {path}")
+
+    try:
+        stats, elapsed = run_import(args.db, args.sources, args.mode, args.rig, args.defer_indexes)
+    except KeyboardInterrupt:
+        print("\n⏹️  Importação cancelada; nada foi gravado")
+        sys.exit(1)
+    print(f"✅ {stats.inserted:,} linhas importadas, {stats.duplicates:,} duplicadas, {stats.rejected:,} rejeitadas "
+          f"em {elapsed:.1f}s ({stats.read / elapsed:,.0f} linhas/s)")
+    for example in stats.examples:
+        print(f"   ⚠️  {example}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+# channels.py
+# Registro declarativo dos canais (channels.json): id inteiro, nome, tipo, unidade, faixa,
+# hardware/pinos, amostragem, posição no painel e valor base da simulação.
+# Carregado uma vez na partida e compartilhado pela aquisição (dashboard.py), gravação
+# (storage.py, coluna channel_id), servidor (rota /api/channels) e páginas web.
+# Novo canal = nova entrada no JSON; nada de classificar o tipo pelo nome.
+# A seção "derived" declara canais calculados a partir de outros (ver derived.py): têm id,
+# nome, tipo e unidade como os físicos e são gravados e servidos do mesmo jeito.
+
+import json
+import os
+
+from derived import FUNCTIONS
+
+CHANNELS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "channels.json")
+
+TYPES = ("temperature", "pressure", "velocity")
+HARDWARE = ("max6675", "simulated")  # simulated: sem sensor físico, valor vem do simulador
+
+
+class Channel:
+    __slots__ = ("id", "name", "type", "unit", "range", "hardware", "pins", "pin_arg",
+                 "period", "tolerance", "position", "base")
+
+    def __init__(self, id, name, type, unit, range, hardware="simulated", pins=None, pin_arg=None,
+                 period=1.0, tolerance=0.0, position=None, base=0.0):
+        self.id = id
+        self.name = name
+        self.type = type
+        self.unit = unit
+        self.range = tuple(range)
+        self.hardware = hardware
+        self.pins = tuple(pins) if pins else None
+        self.pin_arg = pin_arg
+        self.period = float(period)
+        self.tolerance = float(tolerance)
+        self.position = tuple(position) if position else None
+        self.base = float(base)
+
+    @property
+    def physical(self):
+        return self.hardware != "simulated"
+
+    def to_dict(self):
+        """Campos públicos (rota /api/channels)"""
+        return {"id": self.id, "name": self.name, "type": self.type, "unit": self.unit,
+                "range": list(self.range), "hardware": self.hardware, "period": self.period}
+
+    def __repr__(self):
+        return f"Channel({self.id}, {self.name!r}, {self.type})"
+
+
+class DerivedChannel(Channel):
+    """Canal calculado em fluxo (derived.py) a partir de `inputs`"""
+    __slots__ = ("function", "inputs", "window", "scale")
+
+    def __init__(self, id, name, type, unit, range, function, inputs, window=None, scale=1.0,
+                 tolerance=0.0, position=None):
+        super().__init__(id, name, type, unit, range, hardware="derived", tolerance=tolerance, position=position)
+        self.function = function
+        self.inputs = tuple(inputs)
+        self.window = float(window) if window is not None else None
+        self.scale = float(scale)
+
+    @property
+    def physical(self):
+        return False
+
+    def to_dict(self):
+        d = super().to_dict()
+        d.update(function=self.function, inputs=list(self.inputs), window=self.window)
+        return d
+
+
+class ChannelRegistry:
+    """
+    Canais na ordem do arquivo, com busca por nome e por id.
+    Iteração, len() e `names` cobrem os canais lidos; os derivados ficam em `derived`
+    (a busca por nome/id e a rota /api/channels valem para todos).
+    """
+
+    def __init__(self, channels, derived=()):
+        self.channels = list(channels)
+        self.derived = list(derived)
+        self.by_name = {}
+        self.by_id = {}
+        for ch in self.channels:
+            if ch.type not in TYPES:
+                raise ValueError(f"canal '{ch.name}': tipo inválido '{ch.type}' ({', '.join(TYPES)})")
+            if ch.hardware not in HARDWARE:
+                raise ValueError(f"canal '{ch.name}': hardware inválido '{ch.hardware}' ({', '.join(HARDWARE)})")
+            if ch.hardware == "max6675" and (not ch.pins or len(ch.pins) != 3):
+                raise ValueError(f"canal '{ch.name}': MAX6675 precisa de 3 pinos [SCK, CS, SO]")
+            self._add(ch)
+        for ch in self.derived:
+            self._check_derived(ch)
+            self._add(ch)
+        self.names = [ch.name for ch in self.channels]
+
+    def _add(self, ch):
+        if not isinstance(ch.id, int) or ch.id <= 0 or ch.id in self.by_id:
+            raise ValueError(f"canal '{ch.name}': id deve ser inteiro positivo e único")
+        if ch.name in self.by_name:
+            raise ValueError(f"canal duplicado: '{ch.name}'")
+        self.by_name[ch.name] = ch
+        self.by_id[ch.id] = ch
+
+    def _check_derived(self, ch):
+        if ch.type not in TYPES:
+            raise ValueError(f"derivado '{ch.name}': tipo inválido '{ch.type}' ({', '.join(TYPES)})")
+        if ch.function not in FUNCTIONS:
+            raise ValueError(f"derivado '{ch.name}': função inválida '{ch.function}' ({', '.join(FUNCTIONS)})")
+        expected = 2 if ch.function == "difference" else 1
+        if len(ch.inputs) != expected:
+            raise ValueError(f"derivado '{ch.name}': '{ch.function}' usa {expected} entrada(s)")
+        for name in ch.inputs:
+            # Entradas já declaradas acima: canais lidos ou derivados anteriores (sem ciclos)
+            if name not in self.by_name:
+                raise ValueError(f"derivado '{ch.name}': entrada desconhecida '{name}'")
+        if ch.function != "difference" and not (ch.window and ch.window > 0):
+            raise ValueError(f"derivado '{ch.name}': '{ch.function}' precisa de window > 0 (s)")
+
+    def __iter__(self):
+        return iter(self.channels)
+
+    def __len__(self):
+        return len(self.channels)
+
+    def __contains__(self, name):
+        return name in self.by_name
+
+    def __getitem__(self, name):
+        return self.by_name[name]
+
+    def id_of(self, name):
+        ch = self.by_name.get(name)
+        return ch.id if ch else None
+
+    def type_of(self, name):
+        """Tipo do canal ('unknown' para nomes fora do registro, ex.: leituras de outra planta)"""
+        ch = self.by_name.get(name)
+        return ch.type if ch else "unknown"
+
+    def of_hardware(self, hardware):
+        return [ch for ch in self.channels if ch.hardware == hardware]
+
+    def to_list(self):
+        return [ch.to_dict() for ch in self.channels + self.derived]
+
+
+def load_channels(path=None):
+    """Lê channels.json (path=None usa CHANNELS_PATH). Levanta ValueError se a configuração for inválida."""
+    path = path or CHANNELS_PATH
+    with open(path, encoding="utf-8") as f:
+        try:
+            config = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{path}: JSON inválido: {e}")
+    entries = config.get("channels") if isinstance(config, dict) else None
+    if not isinstance(entries, list) or not entries:
+        raise ValueError(f"{path}: esperado {{\"channels\": [...]}} com pelo menos um canal")
+    derived = config.get("derived", [])
+    if not isinstance(derived, list):
+        raise ValueError(f"{path}: \"derived\" deve ser uma lista")
+    try:
+        return ChannelRegistry((Channel(**entry) for entry in entries),
+                               (DerivedChannel(**entry) for entry in derived))
+    except TypeError as e:
+        raise ValueError(f"{path}: campo inválido em um canal: {e}")
+
+
+_default = None
+
+
+def default_registry():
+    """Registro padrão (channels.json ao lado do código), lido uma vez por processo"""
+    global _default
+    if _default is None:
+        _default = load_channels()
+    return _default
@@ -0,0 +1,188 @@
+# chart_cache.py
+# Cache das séries de /api/chart em blocos de tempo por sensor. Uma janela deslizante
+# ("últimas 24 h" pedida a cada poll) reaproveita os blocos fechados e consulta só a cauda.
+#
+#   - bloco: CHUNK_SECONDS alinhados em UTC, com as linhas (timestamp, temperature, pressure, velocity)
+#   - fechado: termina antes do bloco atual; a cauda (bloco atual em diante) é sempre consultada
+#   - invalidação exata: a cada uso, as linhas com id > último id visto dizem quais blocos
+#     receberam dados novos (ingestão/backfill com timestamp antigo) e só esses blocos caem
+#   - LRU com limite de memória estimado; contadores de acerto/falta em /metrics
+
+import bisect
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from metrics import REGISTRY
+
+CHUNK_SECONDS = 900
+# Tamanho estimado de uma linha em memória (tupla + texto do timestamp + floats)
+ROW_BYTES = 200
+CHUNK_OVERHEAD = 500
+# Acima de tantas linhas novas desde a última sincronização (ex.: importação em massa)
+# é mais barato descartar tudo do que descobrir quais blocos mudaram
+RESYNC_LIMIT = 100_000
+
+CACHE_HITS = REGISTRY.counter("temppi_chart_cache_hits_total", "Blocos de série servidos do cache")
+CACHE_MISSES = REGISTRY.counter("temppi_chart_cache_misses_total", "Blocos de série consultados no banco")
+CACHE_EVICTIONS = REGISTRY.counter("temppi_chart_cache_evictions_total", "Blocos descartados pelo limite de memória")
+
+CHART_SQL = """
+    SELECT timestamp, temperature, pressure, velocity
+    FROM sensor_readings
+    WHERE sensor_name = ? AND timestamp >= ? AND timestamp < ?
+    ORDER BY timestamp ASC
+"""
+CHART_RIG_SQL = """
+    SELECT timestamp, temperature, pressure, velocity
+    FROM sensor_readings
+    WHERE rig_id = ? AND sensor_name = ? AND timestamp >= ? AND timestamp < ?
+    ORDER BY timestamp ASC
+"""
+# A cauda não tem limite superior (leituras com relógio adiantado continuam aparecendo).
+# Precisa ser uma data completa: '9999' viraria número pela afinidade NUMERIC da coluna
+TAIL_END = "9999-12-31 23:59:59"
+
+
+def chunk_bound(epoch):
+    """Epoch (s) -> texto no formato do banco, comparável como string"""
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _epoch(text):
+    return datetime.fromisoformat(text[:19]).replace(tzinfo=timezone.utc).timestamp()
+
+
+class ChartCache:
+    """
+    series(conn, sensor_name, start, rig) -> linhas (timestamp, temperature, pressure, velocity)
+    com timestamp >= start, em ordem; iter_series(...) entrega as mesmas linhas em lotes.
+    Uma instância por servidor; thread-safe (um lock por consulta, que é curta quando os
+    blocos estão no cache).
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, chunk_seconds=CHUNK_SECONDS):
+        self.max_bytes = max_bytes
+        self.chunk_seconds = chunk_seconds
+        self.bytes = 0
+        self._chunks = OrderedDict()  # (path, rig, sensor, início) -> (timestamps, linhas, bytes)
+        self._synced = {}             # path -> maior id já refletido no cache
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._chunks)
+
+    def clear(self):
+        with self._lock:
+            self._chunks.clear()
+            self._synced.clear()
+            self.bytes = 0
+
+    def series(self, conn, sensor_name, start, rig=None, path=""):
+        with self._lock:
+            cursor = conn.cursor()
+            # Snapshot único: sincronização, blocos e cauda enxergam o mesmo estado do banco
+            cursor.execute("BEGIN")
+            try:
+                self._sync(cursor, path)
+                rows = []
+                for block in self._blocks(cursor, path, rig, sensor_name, start):
+                    rows.extend(block)
+            finally:
+                cursor.execute("COMMIT")
+        return rows
+
+    def iter_series(self, conn, sensor_name, start, rig=None, path=""):
+        """
+        As linhas de series() em lotes (um por bloco), para respostas em fluxo. O lock e a
+        transação de leitura valem um bloco por vez: enquanto o lote vai para o cliente, o
+        banco fica livre para a aquisição gravar (uma escrita no meio do envio aparece no
+        próximo poll, que já terá outro ETag).
+        """
+        cursor = conn.cursor()
+        blocks = self._blocks(cursor, path, rig, sensor_name, start)
+        synced = False
+        while True:
+            with self._lock:
+                cursor.execute("BEGIN")
+                try:
+                    if not synced:
+                        self._sync(cursor, path)
+                        synced = True
+                    block = next(blocks, None)
+                finally:
+                    cursor.execute("COMMIT")
+            if block is None:
+                return
+            if block:
+                yield block
+
+    # ---- internos (chamados com o lock) ----
+    def _blocks(self, cursor, path, rig, sensor_name, start):
+        """Linhas de cada bloco da janela, do primeiro (cortado em `start`) até a cauda"""
+        chunk = self.chunk_seconds
+        now = datetime.now(timezone.utc).timestamp()
+        tail = now - now % chunk
+        first = _epoch(start)
+        first -= first % chunk
+        t = first
+        while t < tail:
+            keys, chunk_rows, _ = self._chunk(cursor, path, rig, sensor_name, t)
+            # O primeiro bloco começa antes da janela pedida
+            yield chunk_rows[bisect.bisect_left(keys, start):] if t == first else chunk_rows
+            t += chunk
+        yield self._query(cursor, rig, sensor_name, max(chunk_bound(t), start), TAIL_END)
+
+    def _query(self, cursor, rig, sensor_name, lo, hi):
+        if rig:
+            cursor.execute(CHART_RIG_SQL, (rig, sensor_name, lo, hi))
+        else:
+            cursor.execute(CHART_SQL, (sensor_name, lo, hi))
+        return [tuple(r) for r in cursor.fetchall()]
+
+    def _chunk(self, cursor, path, rig, sensor_name, t):
+        key = (path, rig, sensor_name, t)
+        entry = self._chunks.get(key)
+        if entry is not None:
+            self._chunks.move_to_end(key)
+            CACHE_HITS.inc()
+            return entry
+        CACHE_MISSES.inc()
+        rows = self._query(cursor, rig, sensor_name, chunk_bound(t), chunk_bound(t + self.chunk_seconds))
+        entry = ([r[0] for r in rows], rows, CHUNK_OVERHEAD + ROW_BYTES * len(rows))
+        self._chunks[key] = entry
+        self.bytes += entry[2]
+        while self.bytes > self.max_bytes and len(self._chunks) > 1:
+            _, (_, _, old) = self._chunks.popitem(last=False)
+            self.bytes -= old
+            CACHE_EVICTIONS.inc()
+        return entry
+
+    def _sync(self, cursor, path):
+        """Descarta os blocos que receberam linhas desde a última consulta"""
+        cursor.execute("SELECT MAX(id) FROM sensor_readings")
+        top = cursor.fetchone()[0] or 0
+        synced = self._synced.get(path)
+        if synced is None or top < synced or top - synced > RESYNC_LIMIT:
+            # Primeiro uso, banco substituído (ids voltaram) ou lote grande demais
+            self._drop(lambda key: key[0] == path)
+        elif top > synced:
+            # Blocos que receberam linhas novas (só as linhas novas são lidas, pelo rowid)
+            cursor.execute("""
+                SELECT DISTINCT rig_id, sensor_name, CAST(strftime('%s', timestamp) AS INTEGER) / ?
+                FROM sensor_readings WHERE id > ?
+            """, (self.chunk_seconds, synced))
+            changed, whole = set(), set()
+            for rig_id, sensor_name, index in cursor.fetchall():
+                # A entrada sem rig (consultas locais) também enxerga as linhas das plantas
+                for rig in {rig_id, None}:
+                    if index is None:
+                        whole.add((rig, sensor_name))  # timestamp fora do formato: todos os blocos
+                    else:
+                        changed.add((rig, sensor_name, index * self.chunk_seconds))
+            self._drop(lambda key: key[0] == path and (key[1:] in changed or key[1:3] in whole))
+        self._synced[path] = top
+
+    def _drop(self, predicate):
+        for key in [k for k in self._chunks if predicate(k)]:
+            self.bytes -= self._chunks.pop(key)[2]
@@ -0,0 +1,316 @@
+# control.py
+# Subsistema de controle em malha fechada para as saídas (resistência, tambor, ventilador,
+# motor rosca). Roda em uma thread própria com escalonador baseado em relógio monotônico,
+# independente do loop da interface (cv2.waitKey / sleep).
+
+import threading
+import time
+from collections import deque
+
+
+# ============= 1) ESTATÍSTICAS DE JITTER =============
+class JitterStats:
+    """Acumula atrasos (tempo real de execução - prazo) de uma tarefa periódica"""
+
+    def __init__(self, window=1000):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.overruns = 0
+        self.samples = deque(maxlen=window)
+
+    def add(self, lateness):
+        self.count += 1
+        self.total += lateness
+        if lateness > self.max:
+            self.max = lateness
+        self.samples.append(lateness)
+
+    def percentile(self, pct):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return ordered[idx]
+
+    def as_dict(self):
+        """Resumo em milissegundos"""
+        return {
+            "runs": self.count,
+            "overruns": self.overruns,
+            "jitter_mean_ms": (self.total / self.count * 1000.0) if self.count else 0.0,
+            "jitter_p99_ms": self.percentile(99) * 1000.0,
+            "jitter_max_ms": self.max * 1000.0,
+        }
+
+
+# ============= 2) ESCALONADOR DETERMINÍSTICO =============
+class _Task:
+    def __init__(self, name, period, fn, deadline):
+        self.name = name
+        self.period = period
+        self.fn = fn
+        self.deadline = deadline
+        self.stats = JitterStats()
+
+
+class ControlScheduler:
+    """
+    Escalonador periódico em thread dedicada.
+    Os prazos são absolutos (início + k*período), então o atraso de um ciclo não
+    se acumula nos seguintes. Ciclos perdidos são pulados e contados como overrun.
+    clock/sleep podem ser substituídos (ex.: relógio falso nos testes).
+    """
+
+    def __init__(self, clock=time.monotonic, sleep=None, spin_s=0.0002):
+        self.clock = clock
+        # Espera ativa só faz sentido com o relógio real
+        self.spin_s = spin_s if sleep is None else 0.0
+        self.tasks = []
+        self._stop = threading.Event()
+        self._sleep = sleep if sleep is not None else self._stop.wait
+        self._thread = None
+
+    def add_task(self, name, period_s, fn):
+        """fn(now) é chamada a cada period_s segundos"""
+        if period_s <= 0:
+            raise ValueError("O período da tarefa deve ser positivo")
+        self.tasks.append(_Task(name, period_s, fn, self.clock()))
+
+    def run_pending(self):
+        """Espera o próximo prazo e executa a tarefa correspondente"""
+        task = min(self.tasks, key=lambda t: t.deadline)
+        remaining = task.deadline - self.clock()
+        if remaining > self.spin_s:
+            self._sleep(remaining - self.spin_s)
+        # Espera ativa curta para reduzir o jitter do sleep do sistema
+        if self.spin_s > 0:
+            while self.clock() < task.deadline and not self._stop.is_set():
+                pass
+
+        now = self.clock()
+        task.stats.add(max(0.0, now - task.deadline))
+        task.fn(now)
+
+        task.deadline += task.period
+        if task.deadline <= now:
+            skipped = int((now - task.deadline) // task.period) + 1
+            task.stats.overruns += skipped
+            task.deadline += skipped * task.period
+
+    def run(self):
+        while not self._stop.is_set():
+            self.run_pending()
+
+    def start(self):
+        if not self.tasks or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        now = self.clock()
+        for task in self.tasks:
+            task.deadline = now
+        self._thread = threading.Thread(target=self.run, name="control-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def stats(self):
+        return {t.name: t.stats.as_dict() for t in self.tasks}
+
+
+# ============= 3) BLOCOS DE CONTROLE =============
+class PID:
+    """PID com derivada sobre a medição e anti-windup por integração condicional"""
+
+    def __init__(self, kp, ki, kd, setpoint, out_min=0.0, out_max=1.0):
+        self.kp, self.ki, self.kd = kp, ki, kd
+        self.setpoint = setpoint
+        self.out_min, self.out_max = out_min, out_max
+        self.reset()
+
+    def reset(self):
+        self.integral = 0.0
+        self.last_measurement = None
+        self.output = self.out_min
+
+    def update(self, measurement, dt):
+        # Sem medição (sensor em falha): saída segura, integral congelada
+        if measurement is None:
+            self.last_measurement = None
+            self.output = self.out_min
+            return self.output
+
+        error = self.setpoint - measurement
+        derivative = 0.0
+        if self.last_measurement is not None and dt > 0:
+            derivative = -(measurement - self.last_measurement) / dt
+        self.last_measurement = measurement
+
+        integral = self.integral + self.ki * error * dt
+        out = self.kp * error + integral + self.kd * derivative
+        clamped = min(self.out_max, max(self.out_min, out))
+
+        # Só integra se não estiver saturando no mesmo sentido do erro
+        if clamped == out or (out > self.out_max and error < 0) or (out < self.out_min and error > 0):
+            self.integral = integral
+        self.output = clamped
+        return clamped
+
+
+class TimeProportionalOutput:
+    """PWM lento por proporção de tempo para relés (janela de alguns segundos)"""
+
+    def __init__(self, gpio, pin, window_s=2.0, min_switch_s=0.05):
+        self.gpio = gpio
+        self.pin = pin
+        self.window_s = window_s
+        self.min_switch_s = min_switch_s
+        self.duty = 0.0
+        self._window_start = None
+        self._on_time = 0.0
+        self._state = None
+
+    def set_duty(self, duty):
+        self.duty = min(1.0, max(0.0, duty))
+
+    def _write(self, state):
+        if state != self._state:
+            self.gpio.output(self.pin, self.gpio.HIGH if state else self.gpio.LOW)
+            self._state = state
+
+    def tick(self, now):
+        # O duty só é aplicado no início de cada janela, evitando chaveamento extra do relé
+        if self._window_start is None or now - self._window_start >= self.window_s:
+            if self._window_start is None:
+                self._window_start = now
+            else:
+                self._window_start += self.window_s * int((now - self._window_start) // self.window_s)
+            on_time = self.duty * self.window_s
+            if on_time < self.min_switch_s:
+                on_time = 0.0
+            elif self.window_s - on_time < self.min_switch_s:
+                on_time = self.window_s
+            self._on_time = on_time
+        self._write(now - self._window_start < self._on_time)
+
+    def off(self):
+        self.duty = 0.0
+        self._write(False)
+
+
+class StepPulseGenerator:
+    """
+    Gerador de pulsos STEP/DIR para o driver do tambor.
+    Usa acumulador de fase: a cada tick emite os pulsos devidos pelo tempo decorrido,
+    mantendo a velocidade média exata mesmo com período de tick maior que o de passo.
+    Acima de max_burst pulsos num tick, o excedente fica na fase e sai nos próximos ticks.
+    """
+
+    def __init__(self, gpio, pul_pin, dir_pin, steps_per_rev=400, max_burst=50):
+        self.gpio = gpio
+        self.pul_pin = pul_pin
+        self.dir_pin = dir_pin
+        self.steps_per_rev = steps_per_rev
+        self.max_burst = max_burst
+        self.rpm = 0.0
+        self.pulses = 0
+        self._phase = 0.0
+        self._last = None
+        self._direction = None
+
+    def set_rpm(self, rpm):
+        self.rpm = rpm
+
+    def tick(self, now):
+        if self._last is None:
+            self._last = now
+            return
+        dt = now - self._last
+        self._last = now
+
+        direction = self.rpm >= 0
+        if direction != self._direction:
+            self.gpio.output(self.dir_pin, self.gpio.HIGH if direction else self.gpio.LOW)
+            if self._direction is not None:
+                self._phase %= 1.0  # passos atrasados do sentido anterior não são dados no novo
+            self._direction = direction
+
+        self._phase += abs(self.rpm) * self.steps_per_rev / 60.0 * dt
+        steps = min(int(self._phase), self.max_burst)
+        if steps <= 0:
+            return
+        self._phase -= steps
+        for _ in range(steps):
+            self.gpio.output(self.pul_pin, self.gpio.HIGH)
+            self.gpio.output(self.pul_pin, self.gpio.LOW)
+        self.pulses += steps
+
+    def off(self):
+        self.rpm = 0.0
+        self._phase = 0.0
+        self.gpio.output(self.pul_pin, self.gpio.LOW)
+
+
+# ============= 4) CONTROLE DO PROCESSO =============
+class ProcessControl:
+    """
+    Liga os blocos às saídas do processo:
+      - PID da resistência contra a Temp Forno, acionando o relé por proporção de tempo
+      - gerador de pulsos do tambor
+      - ventilador e motor rosca como saídas liga/desliga
+    read_forno: função sem argumentos que retorna a última Temp Forno (ou None)
+    """
+
+    def __init__(self, gpio, pins, read_forno, setpoint, gains=(0.05, 0.001, 0.0),
+                 pid_period=1.0, relay_window=2.0, relay_tick=0.02,
+                 tambor_rpm=0.0, steps_per_rev=400, pulse_tick=0.001,
+                 clock=time.monotonic, sleep=None):
+        self.gpio = gpio
+        self.pins = pins
+        self.read_forno = read_forno
+        kp, ki, kd = gains
+        self.pid = PID(kp, ki, kd, setpoint)
+        self.heater = TimeProportionalOutput(gpio, pins["resistencia"], relay_window)
+        self.tambor = StepPulseGenerator(gpio, pins["tambor_pul"], pins["tambor_dir"], steps_per_rev)
+        self.tambor.set_rpm(tambor_rpm)
+        self._last_pid = None
+
+        self.scheduler = ControlScheduler(clock=clock, sleep=sleep)
+        self.scheduler.add_task("pid_resistencia", pid_period, self._pid_step)
+        self.scheduler.add_task("rele_resistencia", relay_tick, self.heater.tick)
+        if tambor_rpm:
+            self.scheduler.add_task("pulsos_tambor", pulse_tick, self.tambor.tick)
+
+    def _pid_step(self, now):
+        dt = 0.0 if self._last_pid is None else now - self._last_pid
+        self._last_pid = now
+        self.heater.set_duty(self.pid.update(self.read_forno(), dt))
+
+    def set_output(self, name, on):
+        """Liga/desliga 'ventilador' ou 'motor_rosca'"""
+        self.gpio.output(self.pins[name], self.gpio.HIGH if on else self.gpio.LOW)
+
+    def start(self):
+        self.scheduler.start()
+
+    def stop(self):
+        self.scheduler.stop()
+        # Estado seguro: todas as saídas desligadas
+        self.heater.off()
+        self.tambor.off()
+        for name in ("ventilador", "motor_rosca"):
+            if name in self.pins:
+                self.set_output(name, False)
+
+    def report(self):
+        lines = [f"🎛️  Controle: duty resistência {self.heater.duty*100:.0f}%, "
+                 f"pulsos tambor {self.tambor.pulses}"]
+        for name, s in self.scheduler.stats().items():
+            lines.append(f"   • {name}: {s['runs']} ciclos, jitter médio {s['jitter_mean_ms']:.3f} ms, "
+                         f"p99 {s['jitter_p99_ms']:.3f} ms, máx {s['jitter_max_ms']:.3f} ms, "
+                         f"overruns {s['overruns']}")
+        return "\n".join(lines)
@@ -2,31 +2,43 @@
 # Painel com overlay sobre imagem, controle por teclado (sem depender de sliders),
 # min/max com efeito visual, saída limpa (ESC/Ctrl+C) e gráficos OpenCV (sem Matplotlib).
 
-import cv2, numpy as np, random, argparse, time, math, warnings, signal, sqlite3, os
+import time
+_T_START = time.perf_counter()  # referência para medir o tempo até o primeiro frame
+
+import argparse, math, warnings, signal, sqlite3, os, threading, json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from sampling import SamplingPolicy, SwingingDoorCompressor, format_timestamp
+from sensor_health import SensorHealth, GOOD, FAULT
+from channels import load_channels
+from derived import DerivedPipeline
+from shm_ring import LIVE, ARCHIVE, LatestValues, RingWriter, SharedRing, open_ring
 
 # ============= 1) ARGUMENTOS DE LINHA DE COMANDO =============
 ap = argparse.ArgumentParser(description="Dashboard de controle para sistema de destilação")
-ap.add_argument("--img", required=True, help="Caminho da imagem de fundo.")
+ap.add_argument("--img", help="Caminho da imagem de fundo (obrigatório, exceto com --no-ui).")
 ap.add_argument("--scale", type=float, default=1.0, help="Escala da janela (ex.: 1.0).")
 ap.add_argument("--use-rpi", action="store_true", help="Ativar modo Raspberry Pi (GPIO/MAX6675).")
 
-# Argumentos para sensores de temperatura (3 pinos cada: SCK, CS, SO)
-ap.add_argument("--thermo-torre1", nargs=3, type=int, default=[25, 24, 18], 
+# Canais (sensores): tipo, unidade, faixa, pinos, amostragem e posição no painel
+ap.add_argument("--channels", metavar="ARQUIVO", help="Registro de canais (padrão: channels.json)")
+
+# Argumentos para sensores de temperatura (3 pinos cada: SCK, CS, SO); sobrepõem os pinos do channels.json
+ap.add_argument("--thermo-torre1", nargs=3, type=int, 
                 metavar=('SCK', 'CS', 'SO'), help="Pinos GPIO para sensor temperatura Torre Nível 1 (padrão: 25 24 18)")
-ap.add_argument("--thermo-torre2", nargs=3, type=int, default=[7, 8, 23], 
+ap.add_argument("--thermo-torre2", nargs=3, type=int, 
                 metavar=('SCK', 'CS', 'SO'), help="Pinos GPIO para sensor temperatura Torre Nível 2 (padrão: 7 8 23)")
-ap.add_argument("--thermo-torre3", nargs=3, type=int, default=[21, 20, 16], 
+ap.add_argument("--thermo-torre3", nargs=3, type=int, 
                 metavar=('SCK', 'CS', 'SO'), help="Pinos GPIO para sensor temperatura Torre Nível 3 (padrão: 21 20 16)")
-ap.add_argument("--thermo-tanque", nargs=3, type=int, default=[4, 6, 5],
-                metavar=('SCK', 'CS', 'SO'), help="Pinos GPIO para sensor temperatura Tanque (padrão: 4 3 2)")
-ap.add_argument("--thermo-gases", nargs=3, type=int, default=[22, 27, 17], 
+ap.add_argument("--thermo-tanque", nargs=3, type=int,
+                metavar=('SCK', 'CS', 'SO'), help="Pinos GPIO para sensor temperatura Tanque (padrão: 4 6 5)")
+ap.add_argument("--thermo-gases", nargs=3, type=int, 
                 metavar=('SCK', 'CS', 'SO'), help="Pinos GPIO para sensor temperatura Saída Gases (padrão: 22 27 17)")
-ap.add_argument("--thermo-forno", nargs=3, type=int, default=[11, 9, 10], 
+ap.add_argument("--thermo-forno", nargs=3, type=int, 
                 metavar=('SCK', 'CS', 'SO'), help="Pinos GPIO para sensor temperatura Forno (padrão: 11 9 10)")
 
 # Argumentos para sensores de pressão
-ap.add_argument("--pressao1-pin", type=int, default=2, help="Pino GPIO para Sensor Transdutor de Pressão 1 (padrão: 2)")
+ap.add_argument("--pressao1-pin", type=int, help="Pino GPIO para Sensor Transdutor de Pressão 1 (padrão: 2)")
 ap.add_argument("--pressao2-pin", type=int, default=3, help="Pino GPIO para Sensor Transdutor de Pressão 2 (padrão: 3)")
 
 # Argumentos para controles/atuadores
@@ -36,19 +48,74 @@ ap.add_argument("--motor-rosca-pin", type=int, default=12, help="Pino GPIO para
 ap.add_argument("--tambor-dir-pin", type=int, default=13, help="Pino GPIO para DIR+ Driver Motor Tambor (padrão: 13)")
 ap.add_argument("--tambor-pul-pin", type=int, default=19, help="Pino GPIO para PUL+ Driver Motor Tambor (padrão: 19)")
 
+# Argumentos do controle em malha fechada
+ap.add_argument("--control", action="store_true", help="Ativar controle das saídas (PID da resistência, pulsos do tambor).")
+ap.add_argument("--forno-setpoint", type=float, default=350.0, help="Setpoint da Temp Forno em °C (padrão: 350)")
+ap.add_argument("--pid-gains", nargs=3, type=float, default=[0.05, 0.001, 0.0],
+                metavar=('KP', 'KI', 'KD'), help="Ganhos do PID da resistência (padrão: 0.05 0.001 0.0)")
+ap.add_argument("--relay-window", type=float, default=2.0, help="Janela do PWM por tempo do relé em segundos (padrão: 2.0)")
+ap.add_argument("--tambor-rpm", type=float, default=0.0, help="Velocidade do tambor em rpm; negativo inverte (padrão: 0)")
+ap.add_argument("--tambor-steps-rev", type=int, default=400, help="Passos por volta do driver do tambor (padrão: 400)")
+ap.add_argument("--fake-gpio", action="store_true", help="Usar backend GPIO falso (testes sem hardware).")
+ap.add_argument("--fake-open-sensors", nargs="*", default=[], metavar="SENSOR",
+                help="Com --fake-gpio, simula termopar aberto nos sensores indicados (ex.: \"Temp Forno\").")
+
+# Argumentos de partida
+ap.add_argument("--reprobe-interval", type=float, default=5.0, help="Espera inicial até testar de novo um sensor em falha, em segundos; dobra a cada falha (padrão: 5)")
+ap.add_argument("--reprobe-max", type=float, default=300.0, help="Espera máxima entre novos testes de um sensor em falha, em segundos (padrão: 300)")
+ap.add_argument("--stale-max", type=float, default=10.0, help="Por quanto tempo uma falha passageira repete o último valor bom (qualidade 'stale'), em segundos (padrão: 10)")
+ap.add_argument("--headless", action="store_true", help="Não abrir janela (o frame é renderizado, mas não exibido).")
+ap.add_argument("--exit-after-first-frame", action="store_true", help="Sair após o primeiro frame (benchmark de partida).")
+ap.add_argument("--metrics-port", type=int, default=0, help="Expor métricas Prometheus em http://127.0.0.1:PORTA/metrics (padrão: desativado)")
+ap.add_argument("--startup-report", metavar="ARQUIVO", help="Grava em JSON os tempos de partida (primeiro frame, teste dos sensores).")
+
+# Argumentos de amostragem/logging
+ap.add_argument("--no-compression", action="store_true", help="Gravar todas as amostras (desativa a compressão swinging door).")
+ap.add_argument("--heartbeat", type=float, default=60.0, help="Intervalo máximo sem gravar um sensor, em segundos (padrão: 60)")
+
+# Argumentos da simulação
+ap.add_argument("--sim-seed", type=int, default=None, help="Semente do simulador (mesma semente = mesma série; padrão: aleatória)")
+
+# Argumentos de reprodução histórica
+ap.add_argument("--replay", nargs=2, metavar=("INICIO", "FIM"),
+                help="Reproduzir do banco o intervalo INICIO..FIM (UTC, ex.: '2024-05-01 14:00' '2024-05-01 18:00')")
+ap.add_argument("--speed", type=float, default=1.0, help="Velocidade da reprodução, 1 a 1000x (padrão: 1)")
+ap.add_argument("--replay-db", default="sensor_data.db", help="Banco usado na reprodução (padrão: sensor_data.db)")
+
+# Argumentos do modo multiprocesso (ver supervisor.py e shm_ring.py)
+ap.add_argument("--publish-ring", metavar="NOME",
+                help="Publicar as leituras no anel de memória compartilhada NOME em vez de gravar no banco (o storage_drain.py grava)")
+ap.add_argument("--no-ui", action="store_true", help="Só aquisição: sem OpenCV e sem painel (use com --publish-ring).")
+ap.add_argument("--ring-view", metavar="NOME",
+                help="Painel leitor: mostra os valores publicados no anel NOME por outro processo (sem hardware e sem banco)")
+
+# Argumentos de envio ao servidor central (várias plantas)
+ap.add_argument("--upload-to", metavar="URL", help="Enviar as leituras ao servidor central (ex.: http://central:8080)")
+ap.add_argument("--rig-id", default=os.uname().nodename if hasattr(os, "uname") else "temppi",
+                help="Identificador desta planta no servidor central (padrão: hostname)")
+ap.add_argument("--upload-token", default=os.environ.get("TEMPPI_INGEST_TOKEN"),
+                help="Token do servidor central (padrão: variável TEMPPI_INGEST_TOKEN)")
+
 args = ap.parse_args()
+if not args.img and not args.no_ui:
+    ap.error("--img é obrigatório (exceto com --no-ui)")
+if args.ring_view and (args.use_rpi or args.publish_ring or args.replay):
+    ap.error("--ring-view só exibe: não combina com --use-rpi, --publish-ring ou --replay")
 
 USE_RPI = args.use_rpi
 
-# ============= 2) PINAGENS (BCM) - Configuráveis via argumentos =============
-THERMO_TORRE_1 = tuple(args.thermo_torre1)
-THERMO_TORRE_2 = tuple(args.thermo_torre2)
-THERMO_TORRE_3 = tuple(args.thermo_torre3)
-THERMO_TANQUE  = tuple(args.thermo_tanque)   # atenção: alguns pinos podem ser SDA/SCL (I2C)
-THERMO_GASES   = tuple(args.thermo_gases)
-THERMO_FORNO   = tuple(args.thermo_forno)
+# ============= 2) CANAIS E PINAGENS (BCM) =============
+# Identidade dos sensores vem do channels.json (ver channels.py), lido uma vez aqui.
+# Pinos passados na linha de comando têm prioridade (atenção: alguns pinos podem ser SDA/SCL do I2C).
+try:
+    CHANNELS = load_channels(args.channels)
+except (OSError, ValueError) as e:
+    raise SystemExit(f"❌ Registro de canais inválido: {e}")
+for _ch in CHANNELS:
+    _override = getattr(args, _ch.pin_arg, None) if _ch.pin_arg else None
+    if _override is not None:
+        _ch.pins = tuple(_override) if isinstance(_override, list) else (_override,)
 
-PRESSAO_1_PIN = args.pressao1_pin
 PRESSAO_2_PIN = args.pressao2_pin
 
 PIN_VENTILADOR = args.ventilador_pin
@@ -58,96 +125,32 @@ PIN_TAMBOR_DIR  = args.tambor_dir_pin
 PIN_TAMBOR_PUL  = args.tambor_pul_pin
 
 # ============= 3) UI / CAMPOS =============
-FIELD_NAMES = [
-    "Temp Forno", "Velocidade", "Temp Tanque", "Temp Saída Gases",
-    "Pressão Gases", "Torre Nível 1", "Torre Nível 2", "Torre Nível 3",
-]
-
-# posições normalizadas (0..1) — ajuste conforme sua arte
-POSITIONS_NORM = {
-    "Temp Forno":        (0.44, 0.42),
-    "Velocidade":        (0.44, 0.57),
-    "Temp Tanque":       (0.44, 0.77),
-    "Temp Saída Gases":  (0.217, 0.53),
-    "Pressão Gases":     (0.217, 0.59),
-    "Torre Nível 1":     (0.75, 0.77),
-    "Torre Nível 2":     (0.75, 0.56),
-    "Torre Nível 3":     (0.75, 0.38),
-}
+FIELD_NAMES = CHANNELS.names
+
+# posições normalizadas (0..1) — ajuste no channels.json conforme sua arte
+# (canais derivados só aparecem no painel se tiverem "position")
+POSITIONS_NORM = {ch.name: ch.position for ch in CHANNELS.channels + CHANNELS.derived if ch.position}
+FIELD_NAMES = FIELD_NAMES + [ch.name for ch in CHANNELS.derived if ch.position]
 
 SHOW_MOUSE_POS = True
 mouse_pos_norm = (0.0, 0.0)
 
-FONT = cv2.FONT_HERSHEY_SIMPLEX
+# Fonte, cores e contorno do texto ficam em overlay.py
+cv2 = None      # importado sob demanda em main(), em paralelo com o teste dos sensores
+overlay = None  # idem (depende do cv2)
 BASE_FONT_SCALE = 0.8
 BASE_THICKNESS = 2
-TEXT_COLOR = (0, 0, 0)
-OUTLINE = True
-OUTLINE_THICKNESS = 3
-SHADOW = False
 
 # ============= 4) BANCO DE DADOS SQLite =============
-DATABASE_PATH = "sensor_data.db"
+# init_database() e log_sensor_reading() ficam em storage.py
+import storage
+from storage import init_database, log_sensor_reading
 
-def init_database():
-    """Inicializa banco de dados SQLite para logging dos sensores"""
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    
-    # Criar tabela de leituras dos sensores
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS sensor_readings (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-            sensor_name TEXT NOT NULL,
-            temperature REAL,
-            pressure REAL,
-            velocity REAL,
-            sensor_type TEXT NOT NULL,
-            pins TEXT,
-            mode TEXT DEFAULT 'simulation'
-        )
-    ''')
-    
-    # Índices para melhor performance
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_timestamp ON sensor_readings(timestamp)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_sensor_name ON sensor_readings(sensor_name)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_sensor_type ON sensor_readings(sensor_type)')
-    
-    conn.commit()
-    conn.close()
-    print(f"📊 Banco de dados inicializado: {DATABASE_PATH}")
-
-def log_sensor_reading(sensor_name, value, sensor_type, pins=None, mode="simulation"):
-    """Salva leitura do sensor no banco de dados"""
-    try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-        
-        # Determinar tipo de valor
-        temperature = None
-        pressure = None
-        velocity = None
-        
-        if sensor_type == "temperature":
-            temperature = value
-        elif sensor_type == "pressure":
-            pressure = value
-        elif sensor_type == "velocity":
-            velocity = value
-        
-        pins_str = str(pins) if pins else None
-        
-        cursor.execute('''
-            INSERT INTO sensor_readings 
-            (sensor_name, temperature, pressure, velocity, sensor_type, pins, mode)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (sensor_name, temperature, pressure, velocity, sensor_type, pins_str, mode))
-        
-        conn.commit()
-        conn.close()
-    except Exception as e:
-        print(f"❌ Erro ao salvar no banco: {e}")
+# Métricas de aquisição/UI (as de gravação no banco ficam em storage.py)
+from metrics import REGISTRY, serve_metrics
+ACQ_CYCLE = REGISTRY.histogram("temppi_acquisition_cycle_seconds", "Duração de cada ciclo de aquisição (compute_values)")
+SENSOR_READ = REGISTRY.histogram("temppi_sensor_read_seconds", "Duração da leitura de cada sensor", ("sensor",))
+UI_LOOP = REGISTRY.histogram("temppi_ui_loop_seconds", "Duração de cada iteração do loop da UI")
 
 # ============= 5) FLAGS e SAÍDA LIMPA =============
 STOP  = False  # sair sem traceback
@@ -156,15 +159,106 @@ def _sigint_handler(sig, frame):
     global STOP
     STOP = True
 signal.signal(signal.SIGINT, _sigint_handler)
+signal.signal(signal.SIGTERM, _sigint_handler)  # supervisor.py/systemd: mesma saída limpa
 
 # ============= 5) RPi opcional (fallback) =============
+# A validação do hardware não roda mais em tempo de importação: main() chama init_gpio()
+# e dispara start_hardware_probe(), que testa os termopares em paralelo numa thread de
+# fundo. A UI e o logger sobem imediatamente; sensores que falharem ficam "degradados"
+# (disjuntor aberto em sensor_health.py, sem leitura no loop) e são testados de novo
+# nessa mesma thread, com espera exponencial.
 _rpi_ready = False
 thermo_sensors = {}
-_hardware_init_success = True # Nova flag para validação estrita
+_hardware_init_success = True
+GPIO = None
+
+thermo_configs = {ch.name: ch.pins for ch in CHANNELS.of_hardware("max6675")}
 
-if USE_RPI:
+# Estado de cada termopar: "testando", "ok" ou "degradado"
+sensor_status = {name: "testando" for name in thermo_configs} if USE_RPI else {}
+HEALTH = SensorHealth(thermo_configs, base_backoff=args.reprobe_interval, max_backoff=args.reprobe_max,
+                      max_stale=args.stale_max)
+_status_lock = threading.Lock()
+_probe_done = threading.Event()
+STARTUP_TIMES = {}
+
+class NativeMAX6675:
+    """Implementação nativa do protocolo MAX6675 usando apenas RPi.GPIO"""
+    
+    def __init__(self, sck_pin, cs_pin, so_pin):
+        """
+        Inicializa sensor MAX6675
+        sck_pin: Serial Clock (SCK)
+        cs_pin: Chip Select (CS) 
+        so_pin: Serial Output (SO/MISO)
+        """
+        self.sck_pin = sck_pin
+        self.cs_pin = cs_pin
+        self.so_pin = so_pin
+        
+        # Configurar pinos
+        GPIO.setup(self.sck_pin, GPIO.OUT)
+        GPIO.setup(self.cs_pin, GPIO.OUT)
+        GPIO.setup(self.so_pin, GPIO.IN)
+        
+        # Estado inicial: CS alto (inativo), SCK baixo
+        GPIO.output(self.cs_pin, GPIO.HIGH)
+        GPIO.output(self.sck_pin, GPIO.LOW)
+        
+    def readTempC(self):
+        """Lê temperatura em Celsius"""
+        try:
+            # Iniciar comunicação SPI
+            GPIO.output(self.cs_pin, GPIO.LOW)  # Ativar sensor
+            time.sleep(0.001)  # Aguardar estabilização (1ms)
+            
+            # Ler 16 bits de dados
+            data = 0
+            for i in range(16):
+                # Clock alto
+                GPIO.output(self.sck_pin, GPIO.HIGH)
+                time.sleep(0.0001)  # 100us
+                
+                # Ler bit
+                bit = GPIO.input(self.so_pin)
+                data = (data << 1) | bit
+                
+                # Clock baixo
+                GPIO.output(self.sck_pin, GPIO.LOW)
+                time.sleep(0.0001)  # 100us
+            
+            # Finalizar comunicação
+            GPIO.output(self.cs_pin, GPIO.HIGH)  # Desativar sensor
+            
+            # Verificar se há erro no termopar (bit 2)
+            if data & 0x4:
+                raise ValueError("Erro no termopar - termopar desconectado ou com problema")
+            
+            # Extrair dados de temperatura (bits 15-3, ignorar bits 2-0)
+            temp_data = (data >> 3) & 0x1FFF  # 13 bits de temperatura
+            
+            # Converter para temperatura (resolução 0.25°C por bit)
+            temperature = temp_data * 0.25
+            
+            return temperature
+            
+        except Exception as e:
+            raise Exception(f"Erro na leitura SPI: {e}")
+    
+    def read(self):
+        """Método alternativo para compatibilidade"""
+        return self.readTempC()
+        
+    def readTemperature(self):
+        """Método alternativo para compatibilidade"""
+        return self.readTempC()
+
+MAX6675_lib = NativeMAX6675
+
+def init_gpio():
+    """Importa o RPi.GPIO (ou o backend falso) e configura as saídas. Rápido: sem testes de sensor."""
+    global GPIO, _rpi_ready, _hardware_init_success
     print("Modo Raspberry Pi ativado. Validando hardware...")
-    failed_sensors = []
     
     # Verificar se estamos realmente em um Raspberry Pi
     try:
@@ -176,7 +270,15 @@ if USE_RPI:
         print("⚠️  AVISO: Não foi possível verificar se este é um Raspberry Pi.")
     
     try:
-        import RPi.GPIO as GPIO
+        if args.fake_gpio:
+            from gpio_backend import FakeGPIO
+            GPIO = FakeGPIO(record_history=False)
+            # Termopar aberto: SO sempre em nível alto -> bit de erro (bit 2) ligado
+            for name in args.fake_open_sensors:
+                GPIO.input_values[thermo_configs[name][2]] = GPIO.HIGH
+        else:
+            import RPi.GPIO as _GPIO
+            GPIO = _GPIO
         GPIO.setmode(GPIO.BCM)
         output_pins = [PIN_VENTILADOR, PIN_RESISTENCIA, PIN_MOTOR_ROSCA, PIN_TAMBOR_DIR, PIN_TAMBOR_PUL]
         for pin in output_pins:
@@ -205,182 +307,132 @@ if USE_RPI:
         print("   • Conflito com outro programa usando GPIO")
         print("   • Sistema operacional não suportado")
         _hardware_init_success = False
-
-    if _hardware_init_success:
-        # Implementação nativa do MAX6675 usando apenas RPi.GPIO
-        print("🔍 Iniciando implementação nativa MAX6675 (sem bibliotecas externas)...")
-        
-        class NativeMAX6675:
-            """Implementação nativa do protocolo MAX6675 usando apenas RPi.GPIO"""
+    return _hardware_init_success
+
+def test_sensor_with_retries(name, pins, max_attempts=3, settle=0.5, backoff=1.0):
+    """
+    Testa um sensor específico com múltiplas tentativas.
+    Retorna (sensor, temperatura, log) — o log é impresso de uma vez pelo chamador,
+    já que vários sensores são testados em paralelo.
+    """
+    log = [f"📡 Testando sensor '{name}' (Pinos SCK:{pins[0]}, CS:{pins[1]}, SO:{pins[2]})..."]
+    
+    for attempt in range(1, max_attempts + 1):
+        try:
+            # Criar instância do sensor usando implementação nativa
+            sensor = MAX6675_lib(*pins)
             
-            def __init__(self, sck_pin, cs_pin, so_pin):
-                """
-                Inicializa sensor MAX6675
-                sck_pin: Serial Clock (SCK)
-                cs_pin: Chip Select (CS) 
-                so_pin: Serial Output (SO/MISO)
-                """
-                self.sck_pin = sck_pin
-                self.cs_pin = cs_pin
-                self.so_pin = so_pin
-                
-                # Configurar pinos
-                GPIO.setup(self.sck_pin, GPIO.OUT)
-                GPIO.setup(self.cs_pin, GPIO.OUT)
-                GPIO.setup(self.so_pin, GPIO.IN)
-                
-                # Estado inicial: CS alto (inativo), SCK baixo
-                GPIO.output(self.cs_pin, GPIO.HIGH)
-                GPIO.output(self.sck_pin, GPIO.LOW)
-                
-            def readTempC(self):
-                """Lê temperatura em Celsius"""
-                try:
-                    # Iniciar comunicação SPI
-                    GPIO.output(self.cs_pin, GPIO.LOW)  # Ativar sensor
-                    time.sleep(0.001)  # Aguardar estabilização (1ms)
-                    
-                    # Ler 16 bits de dados
-                    data = 0
-                    for i in range(16):
-                        # Clock alto
-                        GPIO.output(self.sck_pin, GPIO.HIGH)
-                        time.sleep(0.0001)  # 100us
-                        
-                        # Ler bit
-                        bit = GPIO.input(self.so_pin)
-                        data = (data << 1) | bit
-                        
-                        # Clock baixo
-                        GPIO.output(self.sck_pin, GPIO.LOW)
-                        time.sleep(0.0001)  # 100us
-                    
-                    # Finalizar comunicação
-                    GPIO.output(self.cs_pin, GPIO.HIGH)  # Desativar sensor
-                    
-                    # Verificar se há erro no termopar (bit 2)
-                    if data & 0x4:
-                        raise ValueError("Erro no termopar - termopar desconectado ou com problema")
-                    
-                    # Extrair dados de temperatura (bits 15-3, ignorar bits 2-0)
-                    temp_data = (data >> 3) & 0x1FFF  # 13 bits de temperatura
-                    
-                    # Converter para temperatura (resolução 0.25°C por bit)
-                    temperature = temp_data * 0.25
-                    
-                    return temperature
-                    
-                except Exception as e:
-                    raise Exception(f"Erro na leitura SPI: {e}")
+            # Pequena pausa para estabilização
+            time.sleep(settle)
             
-            def read(self):
-                """Método alternativo para compatibilidade"""
-                return self.readTempC()
-                
-            def readTemperature(self):
-                """Método alternativo para compatibilidade"""
-                return self.readTempC()
-        
-        # Usar implementação nativa
-        MAX6675_lib = NativeMAX6675
-        library_used = "Implementação Nativa (RPi.GPIO)"
-        print(f"✅ Usando implementação nativa MAX6675 com RPi.GPIO!")
-        print("📡 Protocolo SPI implementado diretamente - não precisa de bibliotecas externas!")
-        
-        thermo_configs = {
-            "Torre Nível 1": THERMO_TORRE_1,
-            "Torre Nível 2": THERMO_TORRE_2,
-            "Torre Nível 3": THERMO_TORRE_3,
-            "Temp Tanque":   THERMO_TANQUE,
-            "Temp Saída Gases": THERMO_GASES,
-            "Temp Forno":    THERMO_FORNO,
-        }
-
-        print("\n🔍 Iniciando teste detalhado dos sensores de temperatura...")
-        print("⏱️  Cada sensor será testado 3 vezes para garantir funcionamento correto.\n")
-        
-        def test_sensor_with_retries(name, pins, max_attempts=3):
-            """Testa um sensor específico com múltiplas tentativas"""
-            print(f"📡 Testando sensor '{name}' (Pinos SCK:{pins[0]}, CS:{pins[1]}, SO:{pins[2]})...")
+            # Ler temperatura usando implementação nativa
+            temp = sensor.readTempC()
             
-            for attempt in range(1, max_attempts + 1):
-                try:
-                    # Criar instância do sensor usando implementação nativa
-                    sensor = MAX6675_lib(*pins)
-                    
-                    # Pequena pausa para estabilização
-                    time.sleep(0.5)
-                    
-                    # Ler temperatura usando implementação nativa
-                    temp = sensor.readTempC()
-                    
-                    # Validar se a leitura é válida
-                    if temp is None or math.isnan(temp) or temp < -50 or temp > 1000:
-                        raise ValueError(f"Leitura inválida: {temp}°C")
-                    
-                    # Teste bem-sucedido
-                    print(f"  ✅ Tentativa {attempt}/3: SUCESSO - Temperatura: {temp:.1f}°C")
-                    return sensor, temp
-                        
-                except Exception as e:
-                    print(f"  ❌ Tentativa {attempt}/3: FALHA - {str(e)}")
-                    if attempt < max_attempts:
-                        print(f"     🔄 Aguardando 1s antes da próxima tentativa...")
-                        time.sleep(1)
-                    else:
-                        print(f"     💥 Sensor '{name}' falhou em todas as tentativas!")
+            # Validar se a leitura é válida
+            if temp is None or math.isnan(temp) or temp < -50 or temp > 1000:
+                raise ValueError(f"Leitura inválida: {temp}°C")
             
-            return None, None
+            # Teste bem-sucedido
+            log.append(f"  ✅ Tentativa {attempt}/{max_attempts}: SUCESSO - Temperatura: {temp:.1f}°C")
+            return sensor, temp, log
+                
+        except Exception as e:
+            log.append(f"  ❌ Tentativa {attempt}/{max_attempts}: FALHA - {str(e)}")
+            if attempt < max_attempts:
+                time.sleep(backoff)
+            else:
+                log.append(f"     💥 Sensor '{name}' falhou em todas as tentativas!")
+    
+    return None, None, log
 
-        # Testar cada sensor individualmente
-        sensor_results = {}
-        total_sensors = len(thermo_configs)
-        working_sensors = 0
-        
-        for i, (name, pins) in enumerate(thermo_configs.items(), 1):
-            print(f"\n[{i}/{total_sensors}] " + "="*50)
-            sensor, temp = test_sensor_with_retries(name, pins)
-            
-            if sensor is not None:
-                thermo_sensors[name] = sensor
-                sensor_results[name] = {"status": "OK", "temp": temp, "pins": pins}
-                working_sensors += 1
-                print(f"✨ Sensor '{name}' APROVADO!")
+def _set_sensor_status(name, sensor, status):
+    with _status_lock:
+        if sensor is not None:
+            thermo_sensors[name] = sensor
+        else:
+            thermo_sensors.pop(name, None)
+        sensor_status[name] = status
+
+def probe_sensors(names, max_attempts=3, verbose=True, initial=True):
+    """
+    Testa os termopares indicados em paralelo (um thread por sensor). O disjuntor é
+    atualizado antes de o sensor voltar para thermo_sensors (o loop de leitura vê os dois já coerentes).
+    """
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, len(names)), thread_name_prefix="probe") as pool:
+        futures = {pool.submit(test_sensor_with_retries, name, thermo_configs[name], max_attempts): name
+                   for name in names}
+        for future in as_completed(futures):
+            name = futures[future]
+            sensor, temp, log = future.result()
+            if initial:
+                if sensor is None:
+                    HEALTH.trip(name)
             else:
-                sensor_results[name] = {"status": "FALHA", "temp": None, "pins": pins}
-                failed_sensors.append(f"{name} (Pinos: {pins})")
-                print(f"💀 Sensor '{name}' REPROVADO!")
-        
-        # Relatório final
-        print("\n" + "="*70)
-        print("📊 RELATÓRIO FINAL DE VALIDAÇÃO DOS SENSORES")
-        print("="*70)
-        print(f"✅ Sensores funcionando: {working_sensors}/{total_sensors}")
-        print(f"❌ Sensores com falha: {len(failed_sensors)}/{total_sensors}")
-        
-        if working_sensors > 0:
-            print(f"\n🎉 SENSORES APROVADOS:")
-            for name, result in sensor_results.items():
-                if result["status"] == "OK":
-                    print(f"  ✅ {name}: {result['temp']:.1f}°C (Pinos: {result['pins']})")
+                HEALTH.probe_result(name, sensor is not None)
+            _set_sensor_status(name, sensor, "ok" if sensor is not None else "degradado")
+            results[name] = {"status": "OK" if sensor is not None else "FALHA",
+                             "temp": temp, "pins": thermo_configs[name]}
+            if verbose:
+                print("\n".join(log))
+    return results
+
+def print_probe_report(sensor_results):
+    """Relatório final da validação dos sensores"""
+    total_sensors = len(sensor_results)
+    working_sensors = sum(1 for r in sensor_results.values() if r["status"] == "OK")
+    failed = total_sensors - working_sensors
+    
+    print("\n" + "="*70)
+    print("📊 RELATÓRIO FINAL DE VALIDAÇÃO DOS SENSORES")
+    print("="*70)
+    print(f"✅ Sensores funcionando: {working_sensors}/{total_sensors}")
+    print(f"❌ Sensores com falha: {failed}/{total_sensors}")
+    
+    if working_sensors > 0:
+        print(f"\n🎉 SENSORES APROVADOS:")
+        for name, result in sensor_results.items():
+            if result["status"] == "OK":
+                print(f"  ✅ {name}: {result['temp']:.1f}°C (Pinos: {result['pins']})")
+    
+    if failed:
+        print(f"\n💥 SENSORES REPROVADOS (modo degradado, novo teste em {args.reprobe_interval:.0f}s, "
+              f"dobrando até {args.reprobe_max:.0f}s):")
+        for name, result in sensor_results.items():
+            if result["status"] == "FALHA":
+                print(f"  ❌ {name}: Sem resposta (Pinos: {result['pins']})")
         
-        if failed_sensors:
-            print(f"\n💥 SENSORES REPROVADOS:")
-            for name, result in sensor_results.items():
-                if result["status"] == "FALHA":
-                    print(f"  ❌ {name}: Sem resposta (Pinos: {result['pins']})")
-            
-            print(f"\n⚠️  ATENÇÃO: {len(failed_sensors)} sensor(es) não está(ão) funcionando!")
-            print("🔧 Verifique:")
-            print("   • Conexões físicas dos pinos")
-            print("   • Alimentação dos sensores (3.3V ou 5V)")
-            print("   • Soldas dos conectores")
-            print("   • Termopares conectados corretamente")
-            
-            _hardware_init_success = False
-        else:
-            print(f"\n🚀 TODOS OS SENSORES ESTÃO FUNCIONANDO PERFEITAMENTE!")
-            print("✨ Sistema pronto para operação!")
+        print(f"\n⚠️  ATENÇÃO: {failed} sensor(es) não está(ão) funcionando!")
+        print("🔧 Verifique:")
+        print("   • Conexões físicas dos pinos")
+        print("   • Alimentação dos sensores (3.3V ou 5V)")
+        print("   • Soldas dos conectores")
+        print("   • Termopares conectados corretamente")
+    else:
+        print(f"\n🚀 TODOS OS SENSORES ESTÃO FUNCIONANDO PERFEITAMENTE!")
+        print("✨ Sistema pronto para operação!")
+
+def _probe_worker():
+    """Thread de fundo: teste inicial em paralelo e novo teste dos degradados quando o backoff vence"""
+    t0 = time.perf_counter()
+    print("\n🔍 Testando os sensores de temperatura em paralelo (em segundo plano)...")
+    print_probe_report(probe_sensors(list(thermo_configs)))
+    STARTUP_TIMES["probe_s"] = time.perf_counter() - t0
+    _probe_done.set()
+    
+    while not STOP:
+        # Acorda pelo menos a cada 1 s: disjuntores também abrem durante a aquisição
+        time.sleep(min(HEALTH.next_due_in(), 1.0))
+        due = HEALTH.due()
+        if not due or STOP:
+            continue
+        for name, result in probe_sensors(due, max_attempts=1, verbose=False, initial=False).items():
+            if result["status"] == "OK":
+                print(f"✨ Sensor '{name}' voltou a responder: {result['temp']:.1f}°C")
+
+def start_hardware_probe():
+    """Dispara o teste dos termopares sem bloquear a subida da UI"""
+    threading.Thread(target=_probe_worker, name="hardware-probe", daemon=True).start()
 
 # Fallback para simulação se a flag RPi não estiver ativa
 if not USE_RPI:
@@ -389,132 +441,203 @@ if not USE_RPI:
 
 
 # ============= 6) SIMULAÇÃO / ESTADOS =============
-# Valores base (você vai alterar por teclado)
-base_values = {
-    "Temp Forno":       350.0,
-    "Temp Tanque":      120.0,
-    "Temp Saída Gases": 300.0,
-    "Torre Nível 1":    110.0,
-    "Torre Nível 2":    140.0,
-    "Torre Nível 3":    180.0,
-    "Pressão Gases":    2.00,   # bar
-    "Velocidade":       600.0,  # rpm
-}
-# Ruído global
+# Valores base (você vai alterar por teclado); iniciais no channels.json
+base_values = {ch.name: ch.base for ch in CHANNELS}
+# Ruído global (50 = ruído nominal do simulador)
 noise_amp = 50.0
 
+# Simulador vetorizado (simulator.py): criado no main() para não atrasar o primeiro frame
+SIM = None
 
 
-# ranges dos gráficos
-RANGES = {
-    "Temp Forno":       (0.0, 600.0, "C"),
-    "Temp Tanque":      (0.0, 400.0, "C"),
-    "Temp Saída Gases": (0.0, 600.0, "C"),
-    "Torre Nível 1":    (0.0, 400.0, "C"),
-    "Torre Nível 2":    (0.0, 400.0, "C"),
-    "Torre Nível 3":    (0.0, 400.0, "C"),
-    "Pressão Gases":    (0.0, 10.0,  "bar"),
-    "Velocidade":       (0.0, 2000.0,"rpm"),
-}
 
-# ============= 7) LEITURAS (real/sim) =============
-def noise(val, amp):
-    # amplitude proporcional simples
-    return random.uniform(-amp, amp)
+# ============= 6b) AMOSTRAGEM POR SENSOR =============
+# Período de leitura (s) e tolerância da compressão na unidade do sensor (channels.json).
+# 0.25 °C é a resolução do MAX6675; abaixo disso a variação é ruído de quantização.
+SAMPLING = {ch.name: SamplingPolicy(period=ch.period, tolerance=ch.tolerance) for ch in CHANNELS}
+for _policy in SAMPLING.values():
+    _policy.heartbeat = args.heartbeat
+    if args.no_compression:
+        _policy.tolerance = 0.0
 
-def read_temp(label, base_c, amp):
-    # Tenta a leitura do sensor real se ele foi inicializado com sucesso
-    if USE_RPI and label in thermo_sensors:
-        try:
-            sensor = thermo_sensors[label]
-            
-            # Tentar diferentes métodos de leitura dependendo da biblioteca
-            if hasattr(sensor, 'readTempC'):
-                c = float(sensor.readTempC())
-            elif hasattr(sensor, 'read'):
-                c = float(sensor.read())
-            elif hasattr(sensor, 'readTemperature'):
-                c = float(sensor.readTemperature())
-            else:
-                # Fallback para método padrão
-                c = float(sensor.readTempC())
-            
-            # Adiciona uma verificação para leituras inválidas comuns (ex: 0.0 ou NaN)
-            if c > 0 and not math.isnan(c):
-                return round(c, 1)
-            else:
-                # Se a leitura for inválida, recorre à simulação para este ciclo
-                pass
-        except Exception:
-            # Em caso de erro de leitura, também recorre à simulação
-            pass
-    
-    # Fallback para simulação
-    return round(base_c + noise(base_c, amp/10.0), 1)
+_compressors = {name: SwingingDoorCompressor(p.tolerance, p.heartbeat) for name, p in SAMPLING.items()}
 
-def read_pressao_bar(base_bar, amp):
-    val = base_bar + noise(base_bar, amp/100.0)
-    return round(max(0.0, val), 2)
+# Canais derivados (derived.py): calculados a cada amostra boa das entradas e comprimidos como os demais
+DERIVED = DerivedPipeline(CHANNELS)
+for _ch in CHANNELS.derived:
+    _compressors[_ch.name] = SwingingDoorCompressor(0.0 if args.no_compression else _ch.tolerance, args.heartbeat)
+_next_sample = {}   # sensor -> instante (time.monotonic) da próxima leitura
+_last_values = {}   # última leitura de cada sensor (para o painel)
+_last_quality = {}  # qualidade da última leitura (good/stale/fault, ver sensor_health.py)
+RING = None         # RingWriter com --publish-ring: leituras vão para o anel, não para o banco
 
-def read_velocidade_rpm(base_rpm, amp):
-    val = base_rpm + noise(base_rpm, amp*5.0)
-    return max(0, int(round(val)))
+# ============= 7) LEITURAS (real/sim) =============
+def _read_thermocouple(sensor):
+    """Lê o MAX6675; leituras inválidas comuns (0.0 ou NaN) contam como falha"""
+    c = float(sensor.readTempC())
+    if not c > 0:
+        raise ValueError(f"Leitura inválida: {c}")
+    return round(c, 1)
+
+def read_temp(label):
+    """
+    Leitura de um termopar -> (valor, qualidade). Em modo RPi nunca recorre ao simulador:
+    falha passageira repete o último valor bom ('stale'), depois vira 'fault'.
+    Qualidade None = sensor ainda no teste de partida (nada a gravar).
+    """
+    if not USE_RPI:
+        return read_simulated(label)
+    sensor = thermo_sensors.get(label)
+    if sensor is None:
+        # Ainda em teste ou degradado (disjuntor aberto): o hardware nem é tocado
+        return None, (FAULT if HEALTH.is_open(label) else None)
+    value, quality = HEALTH.read(label, lambda: _read_thermocouple(sensor))
+    if HEALTH.is_open(label):
+        _set_sensor_status(label, None, "degradado")
+        print(f"⚠️  Sensor '{label}' em falha: leituras suspensas, novo teste em {args.reprobe_interval:.0f}s")
+    return value, quality
+
+def read_simulated(name):
+    """Leitura do simulador -> (valor, qualidade); queda do sensor simulado (None) vira 'fault'"""
+    value = SIM.read(name)
+    return value, (GOOD if value is not None else FAULT)
+
+def read_sensor(ch):
+    """Faz uma leitura (real ou simulada) de um canal -> (valor, qualidade)"""
+    # Canais sem sensor físico (hoje pressão e velocidade) vêm sempre do simulador
+    if ch.hardware == "max6675":
+        return read_temp(ch.name)
+    return read_simulated(ch.name)
+
+def sensor_mode(ch):
+    """Origem da leitura: só canais com hardware são lidos do hardware em modo RPi"""
+    if ch.hardware == "derived":
+        # Derivado é 'rpi' só se todas as entradas vierem do hardware
+        return "rpi" if all(sensor_mode(CHANNELS[name]) == "rpi" for name in ch.inputs) else "simulation"
+    return "rpi" if USE_RPI and ch.physical else "simulation"
+
+def log_channel(ch, value, t, quality=GOOD):
+    """Grava uma leitura do canal (tipo, pinos e id vêm do registro)"""
+    if RING is not None:
+        RING.publish(ARCHIVE, t, value, ch.id, quality, sensor_mode(ch), ch.pins)
+        return
+    log_sensor_reading(ch.name, value, ch.type, ch.pins, sensor_mode(ch), timestamp=format_timestamp(t),
+                       quality=quality, channel_id=ch.id)
+
+_quality_logged = {}  # sensor -> (qualidade, instante) do último registro não-good
+
+def log_quality(ch, value, quality, wall):
+    """
+    Grava leituras stale/fault na mudança de qualidade e depois a cada heartbeat
+    (um sensor parado não gera uma linha por ciclo). Fecha o trecho comprimido antes,
+    para o gráfico não ligar os pontos por cima da falha.
+    """
+    last = _quality_logged.get(ch.name)
+    if last is not None and last[0] == quality and wall - last[1] < args.heartbeat:
+        return
+    _quality_logged[ch.name] = (quality, wall)
+    for t, v in _compressors[ch.name].interrupt():
+        log_channel(ch, v, t)
+    log_channel(ch, value, wall, quality)
 
 def compute_values():
-    """Computa valores dos sensores e salva no banco de dados"""
-    mode = "rpi" if USE_RPI else "simulation"
+    """
+    Lê os sensores cujo período de amostragem venceu, atualiza os canais derivados
+    e grava no banco apenas os pontos que a compressão swinging door decidiu arquivar.
+    Retorna a última leitura de todos os sensores.
+    """
+    now = time.monotonic()
+    wall = time.time()
+    SIM.advance(now)
+    derived = {}  # derivado -> último valor deste ciclo (entradas lidas juntas geram um valor só)
     
-    # Definir mapeamento de sensores para pinos
-    sensor_pins = {
-        "Torre Nível 1": THERMO_TORRE_1,
-        "Torre Nível 2": THERMO_TORRE_2, 
-        "Torre Nível 3": THERMO_TORRE_3,
-        "Temp Tanque": THERMO_TANQUE,
-        "Temp Saída Gases": THERMO_GASES,
-        "Temp Forno": THERMO_FORNO,
-        "Pressão Gases": (PRESSAO_1_PIN,),
-        "Velocidade": None,
-    }
-    
-    # Ler valores dos sensores
-    values = {
-        "Temp Forno":        read_temp("Temp Forno", base_values["Temp Forno"], noise_amp),
-        "Velocidade":        read_velocidade_rpm(base_values["Velocidade"], noise_amp),
-        "Temp Tanque":       read_temp("Temp Tanque", base_values["Temp Tanque"], noise_amp),
-        "Temp Saída Gases":  read_temp("Temp Saída Gases", base_values["Temp Saída Gases"], noise_amp),
-        "Pressão Gases":     read_pressao_bar(base_values["Pressão Gases"], noise_amp),
-        "Torre Nível 1":     read_temp("Torre Nível 1", base_values["Torre Nível 1"], noise_amp),
-        "Torre Nível 2":     read_temp("Torre Nível 2", base_values["Torre Nível 2"], noise_amp),
-        "Torre Nível 3":     read_temp("Torre Nível 3", base_values["Torre Nível 3"], noise_amp),
-    }
-    
-    # Salvar no banco de dados
-    for sensor_name, value in values.items():
-        # Determinar tipo do sensor
-        if "Temp" in sensor_name or "Torre" in sensor_name:
-            sensor_type = "temperature"
-        elif "Pressão" in sensor_name:
-            sensor_type = "pressure"
-        elif "Velocidade" in sensor_name:
-            sensor_type = "velocity"
-        else:
-            sensor_type = "unknown"
+    for ch in CHANNELS:
+        sensor_name = ch.name
+        if now < _next_sample.get(sensor_name, 0.0):
+            continue
+        _next_sample[sensor_name] = now + SAMPLING[sensor_name].period
+        
+        with SENSOR_READ.labels(sensor_name).time():
+            value, quality = read_sensor(ch)
+        _last_values[sensor_name] = value
+        _last_quality[sensor_name] = quality
+        if quality is None:
+            continue
+        if RING is not None:
+            RING.publish(LIVE, wall, value, ch.id, quality, sensor_mode(ch), ch.pins)
+        if quality != GOOD:
+            DERIVED.invalidate(sensor_name)
+            log_quality(ch, value, quality, wall)
+            continue
+        _quality_logged.pop(sensor_name, None)
         
-        pins = sensor_pins.get(sensor_name)
-        log_sensor_reading(sensor_name, value, sensor_type, pins, mode)
+        for t, v in _compressors[sensor_name].add(wall, value):
+            log_channel(ch, v, t)
+        for dch, v in DERIVED.add(sensor_name, wall, value):
+            derived[dch] = v
+
+    for ch, value in derived.items():
+        _last_values[ch.name] = value
+        _last_quality[ch.name] = GOOD
+        if RING is not None:
+            RING.publish(LIVE, wall, value, ch.id, GOOD, sensor_mode(ch))
+        for t, v in _compressors[ch.name].add(wall, value):
+            log_channel(ch, v, t)
     
-    return values
+    return dict(_last_values)
+
+def flush_sampling():
+    """Grava os pontos pendentes da compressão e mostra a redução de linhas"""
+    received = archived = 0
+    for sensor_name, comp in _compressors.items():
+        for t, v in comp.flush():
+            log_channel(CHANNELS[sensor_name], v, t)
+        received += comp.received
+        archived += comp.archived
+    if archived:
+        print(f"🗜️  Compressão: {received} amostras -> {archived} linhas gravadas ({received/archived:.1f}x)")
+
+def next_sample_in():
+    """Segundos até o próximo sensor vencer o período (loop de aquisição sem UI)"""
+    if not _next_sample:
+        return 0.0
+    return max(0.0, min(_next_sample.values()) - time.monotonic())
+
+class RingView:
+    """
+    Fonte do painel leitor (--ring-view): últimos valores publicados no anel pelo processo
+    de aquisição. Conecta-se quando o anel aparecer (a aquisição pode subir depois do painel).
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.latest = None
+
+    def advance(self):
+        if self.latest is None:
+            try:
+                self.latest = LatestValues(SharedRing(self.name))
+            except FileNotFoundError:
+                return {}
+        values = {}
+        for channel_id, record in self.latest.update().items():
+            ch = CHANNELS.by_id.get(channel_id)
+            if ch is not None:
+                values[ch.name] = record.value
+                _last_quality[ch.name] = record.quality
+        return values
 
 # ============= 8) DESENHO TEXTO, HELP e MOUSE =============
-def draw_centered_text(img, text, center_xy, font_scale, thickness, color=TEXT_COLOR):
-    (tw, th), _ = cv2.getTextSize(text, FONT, font_scale, thickness)
-    x = int(center_xy[0] - tw/2)
-    y = int(center_xy[1] + th/2)
-    if OUTLINE:
-        cv2.putText(img, text, (x, y), FONT, font_scale, (255,255,255), OUTLINE_THICKNESS, cv2.LINE_AA)
-    if SHADOW:
-        cv2.putText(img, text, (x+2, y+2), FONT, font_scale, (255,255,255), thickness, cv2.LINE_AA)
-    cv2.putText(img, text, (x, y), FONT, font_scale, color, thickness, cv2.LINE_AA)
+def value_text(name, values):
+    """Texto exibido no painel para um sensor (com marcação de degradado)"""
+    value = values.get(name)
+    if value is not None:
+        if _last_quality.get(name) == "stale":
+            return f"{value}?", (0, 200, 255)  # repetindo o último valor bom
+        return str(value), None
+    if sensor_status.get(name) == "testando":
+        return "testando...", (0, 140, 255)
+    return "FALHA", (0, 0, 255)
 
 
 
@@ -526,24 +649,111 @@ def mouse_callback(event, x, y, flags, param):
 
 def draw_mouse_pos(frame):
     if SHOW_MOUSE_POS:
-        txt = f"{mouse_pos_norm[0]:.3f}, {mouse_pos_norm[1]:.3f}"
-        cv2.putText(frame, txt, (10, 25), FONT, 0.7, (0,0,255), 2, cv2.LINE_AA)
+        overlay.draw_mouse_pos(frame, mouse_pos_norm)
 
 
 
 
 
 # ============= 10) MAIN LOOP =============
+def write_startup_report():
+    """Mostra/grava os tempos de partida medidos"""
+    print(f"⏱️  Primeiro frame em {STARTUP_TIMES['first_frame_s']:.2f}s")
+    if args.startup_report:
+        report = dict(STARTUP_TIMES, mode="rpi" if USE_RPI else "simulation",
+                      degraded=sorted(n for n, st in sensor_status.items() if st == "degradado"))
+        with open(args.startup_report, "w") as f:
+            json.dump(report, f, indent=2)
+
 def main():
-    # Inicializar banco de dados
-    init_database()
-    
-    # Validação estrita de hardware antes de iniciar a UI
-    if USE_RPI and not _hardware_init_success:
-        print("\nO programa não pode iniciar em modo Raspberry Pi devido a erros de hardware.")
-        print("Por favor, verifique as conexões dos sensores, a configuração de pinos e as bibliotecas.")
-        print("Para rodar em modo de simulação, execute o script sem a flag '--use-rpi'.")
-        raise SystemExit()
+    global STOP, cv2, overlay, SIM, RING
+
+    # Reprodução: valores vêm do banco; sem hardware, sem gravação e sem controle
+    replayer = None
+    if args.replay:
+        from replay import ReplayFeed, Replayer
+        if not 1.0 <= args.speed <= 1000.0:
+            raise SystemExit("--speed deve estar entre 1 e 1000")
+        replayer = Replayer(ReplayFeed(args.replay_db, *args.replay), speed=args.speed)
+        print(f"⏪ Reproduzindo {args.replay[0]} .. {args.replay[1]} de {args.replay_db} a {args.speed:g}x")
+    # Painel leitor: valores vêm do anel de outro processo (mesmas restrições da reprodução)
+    elif args.ring_view:
+        replayer = RingView(args.ring_view)
+        print(f"👀 Painel leitor do anel '{args.ring_view}'")
+    viewer = isinstance(replayer, RingView)
+
+    # Sem a biblioteca GPIO não há como operar em modo RPi; sensores com falha não bloqueiam mais
+    if USE_RPI and not replayer:
+        if not init_gpio():
+            print("\nO programa não pode iniciar em modo Raspberry Pi devido a erros de hardware.")
+            print("Por favor, verifique a biblioteca RPi.GPIO e as permissões de acesso aos GPIOs.")
+            print("Para rodar em modo de simulação, execute o script sem a flag '--use-rpi'.")
+            raise SystemExit()
+        start_hardware_probe()
+
+    # Inicializar banco de dados; as gravações saem do loop para uma thread com lotes.
+    # Com --publish-ring quem grava é o processo storage_drain.py
+    if args.publish_ring and not replayer:
+        try:
+            RING = RingWriter(open_ring(args.publish_ring))
+        except RuntimeError as e:
+            raise SystemExit(f"❌ {e}")
+        print(f"📡 Publicando as leituras no anel '{args.publish_ring}'")
+    elif not replayer:
+        init_database()
+        storage.start_writer()
+
+    # Envio store-and-forward ao servidor central (o banco local é o buffer durante quedas do link)
+    uploader = None
+    if args.upload_to and not replayer:
+        from uploader import Uploader
+        uploader = Uploader(storage.DATABASE_PATH, args.upload_to, args.rig_id, args.upload_token).start()
+        print(f"📤 Enviando leituras para {args.upload_to} como '{args.rig_id}'")
+
+    if args.metrics_port:
+        serve_metrics(args.metrics_port)
+        print(f"📈 Métricas em http://127.0.0.1:{args.metrics_port}/metrics")
+
+    if not replayer:
+        from simulator import LiveSimulator
+        SIM = LiveSimulator(base_values, seed=args.sim_seed, noise_scale=noise_amp / 50.0,
+                            types={ch.name: ch.type for ch in CHANNELS})
+
+    latest = {}  # últimos valores lidos, compartilhados com a thread de controle
+
+    # Controle em malha fechada (thread própria, independente do loop da UI)
+    control = None
+    if args.control and not replayer:
+        from control import ProcessControl
+        if USE_RPI and _rpi_ready:
+            gpio = GPIO
+        else:
+            from gpio_backend import FakeGPIO
+            gpio = FakeGPIO(record_history=False)
+            gpio.setmode(gpio.BCM)
+            for pin in (PIN_VENTILADOR, PIN_RESISTENCIA, PIN_MOTOR_ROSCA, PIN_TAMBOR_DIR, PIN_TAMBOR_PUL):
+                gpio.setup(pin, gpio.OUT, initial=gpio.LOW)
+        control = ProcessControl(
+            gpio,
+            {"ventilador": PIN_VENTILADOR, "resistencia": PIN_RESISTENCIA, "motor_rosca": PIN_MOTOR_ROSCA,
+             "tambor_dir": PIN_TAMBOR_DIR, "tambor_pul": PIN_TAMBOR_PUL},
+            read_forno=lambda: latest.get("Temp Forno"),
+            setpoint=args.forno_setpoint,
+            gains=tuple(args.pid_gains),
+            relay_window=args.relay_window,
+            tambor_rpm=args.tambor_rpm,
+            steps_per_rev=args.tambor_steps_rev,
+        )
+        control.start()
+        print(f"🎛️  Controle ativo: setpoint Forno {args.forno_setpoint:.1f}°C")
+
+    if args.no_ui:
+        return run_acquisition(uploader, control, latest)
+
+    # OpenCV só é importado agora, enquanto os sensores são testados em segundo plano
+    import cv2
+    import overlay
+    STARTUP_TIMES["ui_import_s"] = time.perf_counter() - _T_START
 
     bg = cv2.imread(args.img)
     if bg is None:
@@ -559,56 +769,103 @@ def main():
     thickness  = max(1, int(round(BASE_THICKNESS * args.scale)))
 
     # Janela principal
-    cv2.namedWindow("Painel", cv2.WINDOW_NORMAL)
-    cv2.resizeWindow("Painel", W, H)
-    cv2.setMouseCallback("Painel", mouse_callback, bg)
+    if not args.headless:
+        cv2.namedWindow("Painel", cv2.WINDOW_NORMAL)
+        cv2.resizeWindow("Painel", W, H)
+        cv2.setMouseCallback("Painel", mouse_callback, bg)
 
     values = {}
-    last_update_time = 0
-    update_interval = 2  # segundos
-    global STOP
-
     while True:
-        now = time.time()
-        # Lógica de atualização de valores
-        # Em modo RPi, lê continuamente. Em simulação, atualiza a cada 2 segundos.
-        if USE_RPI or (now - last_update_time > update_interval):
-            values = compute_values()
-            if not USE_RPI:
-                last_update_time = now
+        loop_t0 = time.perf_counter()
+        # Cada sensor é lido no seu próprio período (ver SAMPLING)
+        with ACQ_CYCLE.time():
+            values = replayer.advance() if replayer else compute_values()
+        latest.update(values)
+
+        if replayer and not viewer and replayer.done:
+            print(f"⏹️  Fim da reprodução ({replayer.feed.rows_read} linhas)")
+            break
 
         # Evita erro no primeiro loop de simulação antes que os valores sejam gerados
         if not values:
+            if STOP:
+                break
             time.sleep(0.1)
             continue
 
         # Painel
-        frame = bg.copy()
-        ts = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-        draw_centered_text(frame, ts, (int(0.5*W), int(0.05*H)), font_scale*0.8, max(1, thickness-1))
-        for name in FIELD_NAMES:
-            if name in values:
-                draw_centered_text(frame, str(values[name]), abs_pos[name], font_scale, thickness)
+        if replayer and not viewer:
+            ts = f"REPLAY {datetime.fromtimestamp(replayer.data_time).strftime('%d/%m/%Y %H:%M:%S')} ({args.speed:g}x)"
+        else:
+            ts = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+        labels = {name: value_text(name, values) for name in FIELD_NAMES if name in values}
+        frame = overlay.render_frame(bg, labels, abs_pos, font_scale, thickness, header=ts)
         draw_mouse_pos(frame)
 
-        cv2.imshow("Painel", frame)
+        if args.headless:
+            key = -1
+            time.sleep(0.1)
+        else:
+            cv2.imshow("Painel", frame)
+            # Teclado
+            key = cv2.waitKey(100) # Aumentado para reduzir uso de CPU
+
+        if "first_frame_s" not in STARTUP_TIMES:
+            STARTUP_TIMES["first_frame_s"] = time.perf_counter() - _T_START
+            if args.exit_after_first_frame and USE_RPI:
+                _probe_done.wait(60)  # o benchmark também registra a duração do teste dos sensores
+            write_startup_report()
+            if args.exit_after_first_frame:
+                break
 
-        # Teclado
-        key = cv2.waitKey(100) # Aumentado para reduzir uso de CPU
         if key == 27 or STOP:  # ESC ou Ctrl+C
             break
 
+        UI_LOOP.observe(time.perf_counter() - loop_t0)
+
         
 
         time.sleep(0.01)
 
+    if replayer and not viewer:
+        replayer.close()
+    elif not replayer:
+        shutdown_acquisition(uploader, control)
+
+    if not args.headless:
+        cv2.destroyAllWindows()
+
+def run_acquisition(uploader, control, latest):
+    """Loop só de aquisição (--no-ui): dorme até o próximo sensor vencer, sem desenhar nada"""
+    print("📡 Aquisição sem painel (Ctrl+C para sair)")
+    while not STOP:
+        with ACQ_CYCLE.time():
+            latest.update(compute_values())
+        time.sleep(min(next_sample_in(), 0.5))
+    shutdown_acquisition(uploader, control)
+
+def shutdown_acquisition(uploader, control):
+    """Grava o que a compressão ainda guarda, para o controle e libera banco/anel e GPIO"""
+    global STOP
+    flush_sampling()
+    if RING is not None:
+        RING.close()
+    else:
+        storage.stop_writer()
+    if uploader:
+        uploader.stop()
+
+    if control:
+        control.stop()
+        print(control.report())
+
+    STOP = True  # encerra a thread de novo teste dos sensores
+
     if USE_RPI and _rpi_ready:
         try:
-            import RPi.GPIO as GPIO
             GPIO.cleanup()
         except Exception:
             pass
-    cv2.destroyAllWindows()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,143 @@
+# derived.py
+# Canais derivados calculados em fluxo, logo após a leitura dos sensores (compute_values):
+# taxa de aquecimento do Forno, diferença entre níveis da Torre, Velocidade suavizada...
+#
+# Cada derivado é declarado na seção "derived" do channels.json e recebe as amostras boas
+# dos seus canais de entrada. O custo por amostra é O(1) (amortizado nas janelas), sem
+# reler séries do banco:
+#   ewma        média móvel exponencial com constante de tempo `window` (s); amostragem irregular ok
+#   mean/min/max janela deslizante de `window` segundos (soma corrente e deques monotônicos)
+#   derivative  inclinação entre a amostra mais antiga e a mais nova da janela (por segundo)
+#   difference  inputs[0] - inputs[1], com o último valor bom de cada um (`window` = idade máxima)
+# `scale` multiplica o resultado (ex.: 60 converte °C/s em °C/min).
+#
+# Os valores derivados seguem o mesmo caminho das leituras físicas: compressão, banco/anel,
+# /api/data, /api/chart e /api/live.
+
+import math
+from collections import deque
+
+FUNCTIONS = ("ewma", "mean", "min", "max", "derivative", "difference")
+
+
+class Ewma:
+    def __init__(self, tau):
+        self.tau = tau
+        self.value = None
+        self.t = None
+
+    def add(self, t, v):
+        if self.value is None:
+            self.value = v
+        elif t > self.t:
+            # alpha pelo intervalo real: um buraco longo na série quase zera o histórico
+            alpha = 1.0 - math.exp(-(t - self.t) / self.tau)
+            self.value += alpha * (v - self.value)
+        self.t = t
+        return self.value
+
+
+class RollingWindow:
+    """Amostras dos últimos `window` segundos com média, mínimo e máximo em O(1) amortizado"""
+
+    def __init__(self, window):
+        self.window = window
+        self.samples = deque()  # (n, t, v); n numera as amostras (tempos podem repetir)
+        self.total = 0.0
+        self.count = 0
+        self._min = deque()  # (n, v) com v crescente: o primeiro é o mínimo da janela
+        self._max = deque()  # (n, v) com v decrescente: o primeiro é o máximo
+
+    def add(self, t, v):
+        n = self.count
+        self.count += 1
+        self.samples.append((n, t, v))
+        self.total += v
+        while self._min and self._min[-1][1] >= v:
+            self._min.pop()
+        self._min.append((n, v))
+        while self._max and self._max[-1][1] <= v:
+            self._max.pop()
+        self._max.append((n, v))
+        limit = t - self.window
+        while self.samples[0][1] < limit:
+            old_n, _, old_v = self.samples.popleft()
+            self.total -= old_v
+            if self._min[0][0] == old_n:
+                self._min.popleft()
+            if self._max[0][0] == old_n:
+                self._max.popleft()
+
+    def mean(self):
+        return self.total / len(self.samples)
+
+    def min(self):
+        return self._min[0][1]
+
+    def max(self):
+        return self._max[0][1]
+
+    def slope(self):
+        # Só com pelo menos meia janela de histórico: logo na partida (ou após um buraco)
+        # duas amostras a 1 s de distância dariam uma taxa dominada pelo ruído
+        (_, t0, v0), (_, t1, v1) = self.samples[0], self.samples[-1]
+        return (v1 - v0) / (t1 - t0) if t1 - t0 >= self.window / 2 else None
+
+
+class Rolling:
+    def __init__(self, function, window):
+        self.stat = getattr(RollingWindow, "slope" if function == "derivative" else function)
+        self.window = RollingWindow(window)
+
+    def add(self, t, v):
+        self.window.add(t, v)
+        return self.stat(self.window)
+
+
+class DerivedPipeline:
+    """
+    Estado de todos os derivados de um registro de canais.
+        outputs = pipeline.add("Temp Forno", t, 350.5)   # -> [(canal derivado, valor), ...]
+    Derivados de derivados são permitidos (na ordem do arquivo), então uma amostra
+    pode gerar vários valores em cascata.
+    """
+
+    def __init__(self, registry):
+        self.latest = {}     # canal -> (t, valor) da última amostra boa
+        self.consumers = {}  # canal de entrada -> derivados que dependem dele
+        self.state = {}
+        for ch in registry.derived:
+            if ch.function == "difference":
+                self.state[ch.name] = None
+            elif ch.function == "ewma":
+                self.state[ch.name] = Ewma(ch.window)
+            else:
+                self.state[ch.name] = Rolling(ch.function, ch.window)
+            for name in dict.fromkeys(ch.inputs):
+                self.consumers.setdefault(name, []).append(ch)
+
+    def add(self, name, t, value):
+        """Amostra boa de um canal -> valores derivados atualizados"""
+        self.latest[name] = (t, value)
+        outputs = []
+        for ch in self.consumers.get(name, ()):
+            state = self.state[ch.name]
+            result = self._difference(ch, t) if state is None else state.add(t, value)
+            if result is None:
+                continue
+            result = round(result * ch.scale, 3)
+            outputs.append((ch, result))
+            outputs.extend(self.add(ch.name, t, result))
+        return outputs
+
+    def invalidate(self, name):
+        """Entrada em falha: diferenças que dependem dela param até a próxima leitura boa"""
+        self.latest.pop(name, None)
+
+    def _difference(self, ch, t):
+        a, b = self.latest.get(ch.inputs[0]), self.latest.get(ch.inputs[1])
+        if a is None or b is None:
+            return None
+        if ch.window and t - min(a[0], b[0]) > ch.window:
+            return None  # uma das entradas parou de chegar
+        return a[1] - b[1]
@@ -0,0 +1,97 @@
+# gpio_backend.py
+# Backend GPIO falso (mesma API básica do RPi.GPIO) para rodar o modo Raspberry Pi,
+# o controle e os testes em qualquer máquina, sem hardware.
+
+import threading
+import time
+
+
+class FakeGPIO:
+    """Imitação do módulo RPi.GPIO que apenas registra o estado dos pinos"""
+
+    BCM = 11
+    BOARD = 10
+    OUT = 0
+    IN = 1
+    LOW = 0
+    HIGH = 1
+    PUD_OFF = 20
+    PUD_DOWN = 21
+    PUD_UP = 22
+
+    def __init__(self, clock=time.monotonic, record_history=True):
+        """
+        clock: função de tempo usada para carimbar as transições
+        record_history: guarda (tempo, pino, valor) de cada transição de saída
+        """
+        self.clock = clock
+        self.record_history = record_history
+        self.mode = None
+        self.directions = {}
+        self.levels = {}
+        self.input_values = {}  # pino -> valor fixo ou função sem argumentos
+        self.history = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _as_list(pins):
+        return list(pins) if isinstance(pins, (list, tuple)) else [pins]
+
+    def setmode(self, mode):
+        self.mode = mode
+
+    def setwarnings(self, flag):
+        pass
+
+    def setup(self, pins, direction, initial=None, pull_up_down=None):
+        for pin in self._as_list(pins):
+            self.directions[pin] = direction
+            if direction == self.OUT:
+                self.levels[pin] = self.LOW if initial is None else initial
+
+    def output(self, pins, value):
+        with self._lock:
+            for pin in self._as_list(pins):
+                if self.directions.get(pin) != self.OUT:
+                    raise RuntimeError(f"O pino {pin} não foi configurado como saída")
+                value = self.HIGH if value else self.LOW
+                if self.levels.get(pin) != value and self.record_history:
+                    self.history.append((self.clock(), pin, value))
+                self.levels[pin] = value
+
+    def input(self, pin):
+        if pin not in self.directions:
+            raise RuntimeError(f"O pino {pin} não foi configurado")
+        if self.directions[pin] == self.OUT:
+            return self.levels.get(pin, self.LOW)
+        source = self.input_values.get(pin, self.LOW)
+        return source() if callable(source) else source
+
+    def cleanup(self, pins=None):
+        targets = self._as_list(pins) if pins is not None else list(self.directions)
+        for pin in targets:
+            self.directions.pop(pin, None)
+            self.levels.pop(pin, None)
+
+    # ----- utilitários para testes -----
+    def level(self, pin):
+        return self.levels.get(pin, self.LOW)
+
+    def rising_edges(self, pin):
+        """Conta as transições LOW -> HIGH registradas para o pino"""
+        return sum(1 for _, p, v in self.history if p == pin and v == self.HIGH)
+
+    def high_time(self, pin, until=None):
+        """Tempo total em nível alto registrado para o pino (segundos)"""
+        total, since = 0.0, None
+        for t, p, v in self.history:
+            if p != pin:
+                continue
+            if v == self.HIGH and since is None:
+                since = t
+            elif v == self.LOW and since is not None:
+                total += t - since
+                since = None
+        if since is not None:
+            total += (until if until is not None else self.clock()) - since
+        return total
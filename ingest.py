@@ -0,0 +1,102 @@
+# ingest.py
+# Formato de envio das leituras entre as plantas (Pi) e o servidor central, e a gravação
+# deduplicada no banco central. Usado pelo uploader.py (lado Pi) e pelo sensor_server.py
+# (rota POST /api/ingest).
+#
+# Lote: JSON comprimido com gzip
+#   {"rig_id": "forno-01", "columns": [...UPLOAD_COLUMNS], "rows": [[...], ...]}
+
+import gzip
+import json
+import re
+import zlib
+from datetime import datetime, timezone
+
+from channels import default_registry
+
+UPLOAD_COLUMNS = ("timestamp", "sensor_name", "temperature", "pressure", "velocity",
+                  "sensor_type", "pins", "mode", "quality")
+# Plantas com versão anterior enviam sem quality (as linhas entram como 'good')
+LEGACY_COLUMNS = UPLOAD_COLUMNS[:-1]
+
+# Limite do lote descomprimido (protege o servidor contra "bombas" gzip)
+MAX_BATCH_BYTES = 64 * 1024 * 1024
+
+RIG_ID_RE = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
+
+INGEST_SQL = '''
+    INSERT OR IGNORE INTO sensor_readings
+    (rig_id, timestamp, sensor_name, temperature, pressure, velocity, sensor_type, pins, mode, quality, channel_id)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+RIG_UPSERT_SQL = '''
+    INSERT INTO rigs (rig_id, first_seen, last_seen, last_reading, total_rows)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(rig_id) DO UPDATE SET
+        last_seen = excluded.last_seen,
+        last_reading = MAX(COALESCE(rigs.last_reading, ''), COALESCE(excluded.last_reading, '')),
+        total_rows = rigs.total_rows + excluded.total_rows
+'''
+
+
+def encode_batch(rig_id, rows):
+    """Lote de linhas (na ordem de UPLOAD_COLUMNS) -> corpo gzip para o POST"""
+    payload = {"rig_id": rig_id, "columns": list(UPLOAD_COLUMNS), "rows": [list(r) for r in rows]}
+    return gzip.compress(json.dumps(payload, separators=(",", ":")).encode(), compresslevel=6)
+
+
+def decode_batch(body, content_encoding=None):
+    """
+    Corpo do POST -> (rig_id, linhas). Aceita gzip (Content-Encoding ou detectado pelo
+    cabeçalho mágico) ou JSON puro. Levanta ValueError se o lote for inválido.
+    """
+    if content_encoding == "gzip" or body[:2] == b"\x1f\x8b":
+        d = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        try:
+            body = d.decompress(body, MAX_BATCH_BYTES)
+        except zlib.error as e:
+            raise ValueError(f"gzip inválido: {e}")
+        if d.unconsumed_tail:
+            raise ValueError("lote maior que o limite permitido")
+    try:
+        payload = json.loads(body)
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"JSON inválido: {e}")
+
+    if not isinstance(payload, dict):
+        raise ValueError("lote deve ser um objeto JSON")
+    rig_id = payload.get("rig_id")
+    if not isinstance(rig_id, str) or not RIG_ID_RE.match(rig_id):
+        raise ValueError("rig_id ausente ou inválido (letras, números, '.', '_' ou '-', até 64)")
+    columns = payload.get("columns", list(UPLOAD_COLUMNS))
+    if list(columns) not in (list(UPLOAD_COLUMNS), list(LEGACY_COLUMNS)):
+        raise ValueError(f"colunas esperadas: {', '.join(UPLOAD_COLUMNS)}")
+    rows = payload.get("rows")
+    if not isinstance(rows, list):
+        raise ValueError("'rows' deve ser uma lista")
+    for row in rows:
+        if not isinstance(row, list) or len(row) != len(columns):
+            raise ValueError("linha com número de colunas inválido")
+        if not isinstance(row[0], str) or not isinstance(row[1], str) or not isinstance(row[5], str):
+            raise ValueError("timestamp, sensor_name e sensor_type devem ser texto")
+    if len(columns) == len(LEGACY_COLUMNS):
+        rows = [row + ["good"] for row in rows]
+    return rig_id, rows
+
+
+def ingest_batch(conn, rig_id, rows):
+    """
+    Grava o lote numa transação, ignorando linhas já recebidas (mesmo rig, sensor e timestamp).
+    Retorna (aceitas, duplicadas).
+    """
+    before = conn.total_changes
+    with conn:
+        # channel_id pelo registro do servidor central (nome fora do registro fica NULL)
+        id_of = default_registry().id_of
+        conn.executemany(INGEST_SQL, ((rig_id, *row, id_of(row[1])) for row in rows))
+        accepted = conn.total_changes - before
+        now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        last_reading = max((row[0] for row in rows), default=None)
+        conn.execute(RIG_UPSERT_SQL, (rig_id, now, now, last_reading, accepted))
+    return accepted, len(rows) - accepted
@@ -0,0 +1,303 @@
+# metrics.py
+# Instrumentação leve (contadores, gauges e histogramas) com exposição no formato texto
+# do Prometheus. Usado pelo sensor_server.py (rota /metrics) e pelo dashboard.py
+# (endpoint local opcional, --metrics-port). Sem dependências externas.
+
+import bisect
+import re
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Limites padrão dos histogramas (segundos): de 100 µs a 10 s
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_str(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _fmt(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values, **kw):
+        """Série para uma combinação de rótulos (criada na primeira chamada)"""
+        if kw:
+            values = tuple(kw[n] for n in self.label_names)
+        # Caminho rápido: a tupla de valores é a própria chave (conversão para texto só na coleta)
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _default(self):
+        return self.labels()
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        children = sorted((tuple(str(v) for v in key), child) for key, child in list(self._children.items()))
+        for key, child in children:
+            lines.extend(self._render_child(key, child))
+        return lines
+
+
+class _Value:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1.0):
+        with self._lock:
+            self.value += amount
+
+    def set(self, value):
+        self.value = value
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount=1.0):
+        self._default().inc(amount)
+
+    def _render_child(self, key, child):
+        return [f"{self.name}{_label_str(self.label_names, key)} {_fmt(child.value)}"]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name, help_text, labels=(), function=None):
+        super().__init__(name, help_text, labels)
+        self.function = function  # gauge calculado na hora da coleta (ex.: tamanho de fila)
+
+    def _new_child(self):
+        return _Value()
+
+    def set(self, value):
+        self._default().set(value)
+
+    def render(self):
+        if self.function is not None:
+            self._default().set(self.function())
+        return super().render()
+
+    def _render_child(self, key, child):
+        return [f"{self.name}{_label_str(self.label_names, key)} {_fmt(child.value)}"]
+
+
+class _HistogramChild:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    def time(self):
+        return _Timer(self)
+
+
+class _Timer:
+    def __init__(self, target):
+        self.target = target
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.t0
+        self.target.observe(self.elapsed)
+        return False
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self._default().observe(value)
+
+    def time(self):
+        """with hist.time(): ... — observa a duração do bloco"""
+        return _Timer(self._default())
+
+    def _render_child(self, key, child):
+        lines = []
+        cumulative = 0
+        for bound, n in zip(self.buckets + (float("inf"),), child.counts):
+            cumulative += n
+            le = 'le="%s"' % _fmt(bound)
+            lines.append(f"{self.name}_bucket{_label_str(self.label_names, key, le)} {cumulative}")
+        labels = _label_str(self.label_names, key)
+        lines.append(f"{self.name}_sum{labels} {_fmt(child.sum)}")
+        lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        self._metrics.setdefault(metric.name, metric)
+        return self._metrics[metric.name]
+
+    def counter(self, name, help_text, labels=()):
+        return self.register(Counter(name, help_text, labels))
+
+    def gauge(self, name, help_text, labels=(), function=None):
+        return self.register(Gauge(name, help_text, labels, function))
+
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, help_text, labels, buckets))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+# ============= INSTRUMENTAÇÃO DO SQLITE =============
+_WS = re.compile(r"\s+")
+
+SQL_DURATION = REGISTRY.histogram("temppi_sql_duration_seconds",
+                                  "Duração das instruções SQL (execução + leitura das linhas)", ("statement",))
+SQL_ROWS = REGISTRY.counter("temppi_sql_rows_total", "Linhas retornadas pelas instruções SQL", ("statement",))
+
+
+def normalize_sql(sql, limit=120):
+    """Rótulo estável para uma instrução: espaços colapsados e truncado"""
+    return _WS.sub(" ", sql).strip()[:limit]
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor que mede cada instrução (com o fetch, onde o SQLite faz a maior parte do trabalho)"""
+
+    def execute(self, sql, parameters=()):
+        self._statement = normalize_sql(sql)
+        self._batched = 0
+        t0 = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._elapsed = time.perf_counter() - t0
+            if not self._statement.upper().startswith(("SELECT", "WITH", "PRAGMA", "EXPLAIN")):
+                SQL_DURATION.labels(self._statement).observe(self._elapsed)
+
+    def _fetched(self, t0, rows):
+        statement = getattr(self, "_statement", None)
+        if statement is None:
+            return
+        self._elapsed += time.perf_counter() - t0
+        SQL_DURATION.labels(statement).observe(self._elapsed)
+        SQL_ROWS.labels(statement).inc(rows)
+        self._statement = None
+
+    def fetchall(self):
+        t0 = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(t0, len(rows))
+        return rows
+
+    def fetchone(self):
+        t0 = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(t0, 0 if row is None else 1)
+        return row
+
+    def fetchmany(self, size=None):
+        # Leitura em lotes (respostas em fluxo): tempo e linhas somam até o lote incompleto, o último
+        size = self.arraysize if size is None else size
+        t0 = time.perf_counter()
+        rows = super().fetchmany(size)
+        if len(rows) < size:
+            self._fetched(t0, getattr(self, "_batched", 0) + len(rows))
+        elif getattr(self, "_statement", None) is not None:
+            self._elapsed += time.perf_counter() - t0
+            self._batched += len(rows)
+        return rows
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Use com sqlite3.connect(path, factory=InstrumentedConnection)"""
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        # O atalho do sqlite3 cria um cursor padrão (sem medida); passa pelo cursor instrumentado
+        return self.cursor().execute(sql, parameters)
+
+
+# ============= ENDPOINT HTTP LOCAL =============
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.registry.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve_metrics(port, host="127.0.0.1", registry=REGISTRY):
+    """Sobe http://host:port/metrics numa thread de fundo e retorna o servidor"""
+    handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
@@ -0,0 +1,42 @@
+# overlay.py
+# Desenho do painel: valores sobrepostos na imagem de fundo (OpenCV).
+# Separado do dashboard.py para que o render possa ser medido pelos benchmarks.
+
+import cv2
+
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+TEXT_COLOR = (0, 0, 0)
+OUTLINE = True
+OUTLINE_THICKNESS = 3
+SHADOW = False
+
+
+def draw_centered_text(img, text, center_xy, font_scale, thickness, color=TEXT_COLOR):
+    (tw, th), _ = cv2.getTextSize(text, FONT, font_scale, thickness)
+    x = int(center_xy[0] - tw/2)
+    y = int(center_xy[1] + th/2)
+    if OUTLINE:
+        cv2.putText(img, text, (x, y), FONT, font_scale, (255,255,255), OUTLINE_THICKNESS, cv2.LINE_AA)
+    if SHADOW:
+        cv2.putText(img, text, (x+2, y+2), FONT, font_scale, (255,255,255), thickness, cv2.LINE_AA)
+    cv2.putText(img, text, (x, y), FONT, font_scale, color, thickness, cv2.LINE_AA)
+
+
+def render_frame(bg, labels, abs_pos, font_scale, thickness, header=None):
+    """
+    Gera um frame do painel.
+    labels: {campo: (texto, cor ou None)}; abs_pos: {campo: (x, y)} em pixels
+    header: texto do topo (ex.: data/hora)
+    """
+    frame = bg.copy()
+    H, W = frame.shape[:2]
+    if header:
+        draw_centered_text(frame, header, (int(0.5*W), int(0.05*H)), font_scale*0.8, max(1, thickness-1))
+    for name, (text, color) in labels.items():
+        draw_centered_text(frame, text, abs_pos[name], font_scale, thickness, color or TEXT_COLOR)
+    return frame
+
+
+def draw_mouse_pos(frame, pos_norm):
+    txt = f"{pos_norm[0]:.3f}, {pos_norm[1]:.3f}"
+    cv2.putText(frame, txt, (10, 25), FONT, 0.7, (0,0,255), 2, cv2.LINE_AA)
@@ -0,0 +1,185 @@
+# query_builder.py
+# Filtros de /api/data -> SQL parametrizado que os índices conseguem atender.
+#
+# Regras (o que mantém a consulta barata num Pi com milhões de linhas):
+#   - sensores: sensor_name IN (?, ...) — coluna líder do idx_sensor_ts (sensor_name, timestamp)
+#   - período: comparação direta com a coluna timestamp (sem funções), no formato gravado
+#   - planta: rig_id = ? — coluna líder do idx_rig_sensor_ts
+#   - tipo, modo e faixa de valor são filtros residuais, aplicados nas linhas que o índice já separou;
+#     a faixa usa a coluna do tipo (temperature/pressure/velocity), nunca uma expressão por linha
+#     quando o tipo é conhecido
+#   - todo valor vai como parâmetro; nomes de coluna só saem de listas fixas
+#
+# Cada consulta roda com orçamento de tempo (progress_handler do SQLite): um filtro amplo demais
+# é interrompido e a API responde 422 pedindo para restringir, em vez de travar o Pi.
+
+import sqlite3
+import time
+from datetime import datetime
+
+from channels import TYPES
+from metrics import REGISTRY
+
+MAX_SENSORS = 32
+MODES = ("simulation", "rpi")
+VALUE_COLUMNS = {"temperature": "temperature", "pressure": "pressure", "velocity": "velocity"}
+ANY_VALUE = "COALESCE(temperature, pressure, velocity)"  # tipos mistos: só uma das três é preenchida
+
+QUERY_TIME_LIMIT = 2.0    # s por consulta
+PROGRESS_STEPS = 10_000   # instruções da VM do SQLite entre verificações do relógio
+
+QUERY_INTERRUPTED = REGISTRY.counter("temppi_query_interrupted_total",
+                                     "Consultas interrompidas pelo limite de custo")
+
+
+class QueryTooExpensive(Exception):
+    """Consulta interrompida por exceder o orçamento de tempo"""
+
+
+def _split(values):
+    """Lista de parâmetros repetidos e/ou separados por vírgula, sem vazios nem repetições"""
+    out = []
+    for value in values:
+        for item in str(value).split(","):
+            item = item.strip()
+            if item and item not in out:
+                out.append(item)
+    return out
+
+
+def normalize_time(text, upper=False):
+    """
+    ISO (com 'T' do datetime-local ou espaço) -> texto no formato do banco, comparável como string.
+    upper: limite superior inclusivo; sem fração, vale até o fim do segundo (as leituras têm ms)
+    """
+    if not text:
+        return None
+    try:
+        dt = datetime.fromisoformat(text.strip())
+    except ValueError:
+        raise ValueError(f"data inválida: '{text}' (use AAAA-MM-DD HH:MM[:SS])")
+    if dt.microsecond:
+        return dt.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+    return dt.strftime("%Y-%m-%d %H:%M:%S") + (".999" if upper else "")
+
+
+def _number(text, name):
+    if text in (None, ""):
+        return None
+    try:
+        return float(text)
+    except ValueError:
+        raise ValueError(f"{name} deve ser numérico: '{text}'")
+
+
+class ReadingFilter:
+    """Filtros de leitura validados (ValueError com mensagem para o cliente se algo não fizer sentido)"""
+
+    def __init__(self, sensors=(), types=(), modes=(), start=None, end=None, value_min=None, value_max=None,
+                 rig=None):
+        self.sensors = _split(sensors)
+        self.types = _split(types)
+        self.modes = _split(modes)
+        self.start = normalize_time(start)
+        self.end = normalize_time(end, upper=True)
+        self.value_min = value_min
+        self.value_max = value_max
+        self.rig = rig or None
+        if len(self.sensors) > MAX_SENSORS:
+            raise ValueError(f"no máximo {MAX_SENSORS} sensores por consulta")
+        for t in self.types:
+            if t not in TYPES:
+                raise ValueError(f"tipo inválido: '{t}' ({', '.join(TYPES)})")
+        for m in self.modes:
+            if m not in MODES:
+                raise ValueError(f"modo inválido: '{m}' ({', '.join(MODES)})")
+        if self.start and self.end and self.start > self.end:
+            raise ValueError("start_date depois de end_date")
+        if value_min is not None and value_max is not None and value_min > value_max:
+            raise ValueError("min maior que max")
+
+    @classmethod
+    def from_args(cls, args):
+        """Parâmetros de /api/data (request.args): sensor, type, mode (repetidos ou com vírgula),
+        start_date, end_date, min, max, rig"""
+        return cls(sensors=args.getlist('sensor'), types=args.getlist('type'), modes=args.getlist('mode'),
+                   start=args.get('start_date'), end=args.get('end_date'),
+                   value_min=_number(args.get('min'), 'min'), value_max=_number(args.get('max'), 'max'),
+                   rig=args.get('rig'))
+
+    def key(self):
+        """Identidade do filtro (entra no ETag)"""
+        return (tuple(self.sensors), tuple(self.types), tuple(self.modes), self.start, self.end,
+                self.value_min, self.value_max, self.rig)
+
+    def value_column(self, registry):
+        """Coluna da faixa de valor: a do tipo, se todos os sensores/tipos filtrados forem de um tipo só"""
+        types = set(self.types) or {registry.type_of(name) for name in self.sensors}
+        if len(types) == 1:
+            return VALUE_COLUMNS.get(types.pop(), ANY_VALUE)
+        return ANY_VALUE
+
+    def where(self, registry):
+        """-> (' WHERE ...' ou '', parâmetros)"""
+        clauses, params = [], []
+        if self.rig:
+            clauses.append("rig_id = ?")
+            params.append(self.rig)
+        if self.sensors:
+            clauses.append(f"sensor_name IN ({', '.join('?' * len(self.sensors))})")
+            params.extend(self.sensors)
+        if self.start:
+            clauses.append("timestamp >= ?")
+            params.append(self.start)
+        if self.end:
+            clauses.append("timestamp <= ?")
+            params.append(self.end)
+        if self.types:
+            clauses.append(f"sensor_type IN ({', '.join('?' * len(self.types))})")
+            params.extend(self.types)
+        if self.modes:
+            clauses.append(f"mode IN ({', '.join('?' * len(self.modes))})")
+            params.extend(self.modes)
+        if self.value_min is not None or self.value_max is not None:
+            column = self.value_column(registry)
+            if self.value_min is not None:
+                clauses.append(f"{column} >= ?")
+                params.append(self.value_min)
+            if self.value_max is not None:
+                clauses.append(f"{column} <= ?")
+                params.append(self.value_max)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+def page_queries(flt, registry, limit, offset):
+    """SQL do total e da página (mais recentes primeiro) para um filtro"""
+    where_sql, params = flt.where(registry)
+    count = (f"SELECT COUNT(*) FROM sensor_readings{where_sql}", params)
+    page = (f"SELECT * FROM sensor_readings{where_sql} ORDER BY timestamp DESC LIMIT ? OFFSET ?",
+            params + [limit, offset])
+    return count, page
+
+
+class cost_limit:
+    """
+    Orçamento de tempo para as consultas de uma conexão:
+        with cost_limit(conn, 2.0):
+            conn.execute(...)
+    Estourado o tempo, o SQLite aborta a instrução e sai QueryTooExpensive.
+    """
+
+    def __init__(self, conn, seconds=QUERY_TIME_LIMIT):
+        self.conn = conn
+        self.seconds = seconds
+
+    def __enter__(self):
+        deadline = time.monotonic() + self.seconds
+        self.conn.set_progress_handler(lambda: time.monotonic() > deadline, PROGRESS_STEPS)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.set_progress_handler(None, 0)
+        if exc_type is sqlite3.OperationalError and "interrupted" in str(exc):
+            QUERY_INTERRUPTED.inc()
+            raise QueryTooExpensive(f"consulta excedeu {self.seconds:g}s") from exc
+        return False
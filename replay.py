@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# replay.py
+# Reprodução histórica das leituras gravadas no sensor_data.db.
+# As linhas do intervalo são lidas em blocos (paginação por chave timestamp/id) por uma
+# thread de pré-carga, então nem um lote longo inteiro fica em memória nem o loop da
+# interface espera pelo banco.
+#   - dashboard.py --replay INICIO FIM --speed 60  -> mesmo overlay, valores do banco
+#   - python replay.py INICIO FIM --dst carga.db   -> fonte de carga para o gravador/servidor
+
+import argparse
+import queue
+import sqlite3
+import threading
+import time
+
+from sampling import parse_timestamp, format_timestamp
+
+# Posição do valor na linha do feed conforme o sensor_type
+VALUE_INDEX = {"temperature": 2, "pressure": 3, "velocity": 4}
+
+CHUNK_SQL = '''
+    SELECT id, timestamp, sensor_name, temperature, pressure, velocity, sensor_type, pins, mode
+    FROM sensor_readings
+    WHERE timestamp >= ? AND timestamp <= ? AND (timestamp, id) > (?, ?)
+    ORDER BY timestamp, id
+    LIMIT ?
+'''
+
+
+def normalize_bound(text):
+    """'2024-05-01 14:00' ou '2024-05-01T14:00:00' -> formato do banco ('YYYY-MM-DD HH:MM:SS')"""
+    text = text.strip().replace("T", " ")
+    if len(text) == 10:
+        text += " 00:00:00"
+    elif len(text) == 16:
+        text += ":00"
+    parse_timestamp(text)  # valida
+    return text
+
+
+def _upper_bound(text):
+    # Inclui as linhas com fração de segundo no último segundo do intervalo
+    return text + ".999" if "." not in text else text
+
+
+class ReplayFeed:
+    """
+    Itera (epoch, linha) no intervalo [start, end] em ordem de tempo.
+    linha = (timestamp, sensor_name, temperature, pressure, velocity, sensor_type, pins, mode)
+    """
+
+    def __init__(self, db_path, start, end, chunk_rows=5000, prefetch=4, sensors=None):
+        self.db_path = db_path
+        self.start = normalize_bound(start)
+        self.end = _upper_bound(normalize_bound(end))
+        self.chunk_rows = chunk_rows
+        self.sensors = set(sensors) if sensors else None
+        self.rows_read = 0
+        self._chunks = queue.Queue(maxsize=prefetch)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._prefetch, name="replay-prefetch", daemon=True)
+        self._thread.start()
+
+    def _prefetch(self):
+        conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        last = (self.start, -1)
+        try:
+            while not self._stop.is_set():
+                rows = conn.execute(CHUNK_SQL, (self.start, self.end, last[0], last[1], self.chunk_rows)).fetchall()
+                if not rows:
+                    break
+                last = (rows[-1][1], rows[-1][0])
+                self._put(rows)
+        finally:
+            conn.close()
+            self._put(None)
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._chunks.put(item, timeout=0.2)
+                return
+            except queue.Full:
+                continue
+
+    def __iter__(self):
+        while True:
+            chunk = self._chunks.get()
+            if chunk is None:
+                return
+            self.rows_read += len(chunk)
+            for row in chunk:
+                if self.sensors and row[2] not in self.sensors:
+                    continue
+                yield parse_timestamp(row[1]), row[1:]
+
+    def close(self):
+        self._stop.set()
+
+
+def row_value(row):
+    """Valor da linha conforme o tipo do sensor"""
+    index = VALUE_INDEX.get(row[5])
+    return row[index] if index else None
+
+
+class Replayer:
+    """
+    Avança o tempo dos dados conforme o relógio real x speed e devolve o último valor
+    de cada sensor (mesmo formato de compute_values()).
+    """
+
+    def __init__(self, feed, speed=1.0, clock=time.monotonic):
+        self.feed = feed
+        self.speed = speed
+        self.clock = clock
+        self.values = {}
+        self.data_time = None
+        self.done = False
+        self._it = iter(feed)
+        self._next = None
+        self._wall0 = None
+        self._data0 = None
+
+    def _peek(self):
+        if self._next is None and not self.done:
+            self._next = next(self._it, None)
+            if self._next is None:
+                self.done = True
+        return self._next
+
+    def advance(self):
+        first = self._peek()
+        if first is None:
+            return dict(self.values)
+        if self._wall0 is None:
+            self._wall0, self._data0 = self.clock(), first[0]
+        self.data_time = self._data0 + (self.clock() - self._wall0) * self.speed
+        while True:
+            item = self._peek()
+            if item is None or item[0] > self.data_time:
+                break
+            t, row = item
+            self.values[row[1]] = row_value(row)
+            self._next = None
+        return dict(self.values)
+
+    def close(self):
+        self.feed.close()
+
+
+# ============= FONTE DE CARGA =============
+def load(feed, speed=0.0, shift_to_now=True, ingest_url=None, rig_id="replay", batch=2000):
+    """
+    Reinjeta as linhas do intervalo: no gravador local (storage.log_sensor_reading com o
+    gravador em lotes) ou num servidor central (POST /api/ingest). speed=0 = sem espera.
+    Retorna o número de linhas reinjetadas.
+    """
+    import storage
+    from uploader import http_post
+    from ingest import encode_batch
+
+    wall0 = data0 = None
+    offset = 0.0
+    pending = []
+    n = 0
+    for t, row in feed:
+        if wall0 is None:
+            wall0, data0 = time.perf_counter(), t
+            offset = (time.time() - t) if shift_to_now else 0.0
+        if speed > 0:
+            wait = (t - data0) / speed - (time.perf_counter() - wall0)
+            if wait > 0:
+                time.sleep(wait)
+        timestamp = format_timestamp(t + offset) if shift_to_now else row[0]
+        if ingest_url:
+            pending.append((timestamp,) + tuple(row[1:]))
+            if len(pending) >= batch:
+                http_post(ingest_url.rstrip("/") + "/api/ingest", encode_batch(rig_id, pending))
+                pending = []
+        else:
+            storage.log_sensor_reading(row[1], row_value(row), row[5], row[6], row[7], timestamp=timestamp)
+        n += 1
+    if pending:
+        http_post(ingest_url.rstrip("/") + "/api/ingest", encode_batch(rig_id, pending))
+    return n
+
+
+def main():
+    import storage
+
+    ap = argparse.ArgumentParser(description="Reinjeta um intervalo do banco como carga sintética")
+    ap.add_argument("start", help="Início (UTC, ex.: '2024-05-01 14:00')")
+    ap.add_argument("end", help="Fim (UTC)")
+    ap.add_argument("--src", default=storage.DATABASE_PATH, help="Banco de origem (padrão: sensor_data.db)")
+    ap.add_argument("--dst", help="Banco de destino para o gravador (padrão: não grava localmente)")
+    ap.add_argument("--ingest", metavar="URL", help="Enviar ao servidor central em vez do gravador local")
+    ap.add_argument("--rig", default="replay", help="rig_id usado com --ingest (padrão: replay)")
+    ap.add_argument("--speed", type=float, default=0.0, help="Multiplicador de velocidade; 0 = o mais rápido possível")
+    ap.add_argument("--keep-timestamps", action="store_true", help="Manter os timestamps originais (padrão: desloca para agora)")
+    args = ap.parse_args()
+    if not args.dst and not args.ingest:
+        ap.error("informe --dst ou --ingest")
+
+    feed = ReplayFeed(args.src, args.start, args.end)
+    if args.dst:
+        storage.DATABASE_PATH = args.dst
+        storage.init_database(args.dst)
+        storage.start_writer(args.dst)
+    t0 = time.perf_counter()
+    try:
+        n = load(feed, args.speed, not args.keep_timestamps, args.ingest, args.rig)
+    finally:
+        feed.close()
+        storage.stop_writer()  # inclui na medida o tempo de esvaziar a fila do gravador
+    elapsed = time.perf_counter() - t0
+    print(f"🚚 {n} linhas reinjetadas em {elapsed:.2f}s ({n / elapsed if elapsed else 0:.0f} linhas/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# sampling.py
+# Amostragem por sensor e compressão "swinging door" para o logging.
+# Uma linha só é gravada quando a série deixa de ser representável por uma reta
+# dentro da tolerância, ou quando o intervalo de heartbeat expira. A reconstrução
+# por interpolação linear entre as linhas gravadas fica dentro da tolerância.
+
+import bisect
+from datetime import datetime, timezone
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+
+def format_timestamp(epoch):
+    """Epoch (s) -> texto UTC no mesmo formato do CURRENT_TIMESTAMP do SQLite (com ms)"""
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime(TIMESTAMP_FORMAT)[:-3]
+
+
+def parse_timestamp(text):
+    """Texto do banco (UTC, com ou sem fração, 'T' ou espaço) -> epoch (s)"""
+    text = text.replace("T", " ")
+    fmt = TIMESTAMP_FORMAT if "." in text else "%Y-%m-%d %H:%M:%S"
+    return datetime.strptime(text, fmt).replace(tzinfo=timezone.utc).timestamp()
+
+
+class SamplingPolicy:
+    """
+    period: intervalo entre leituras do sensor (s)
+    tolerance: desvio máximo aceito na reconstrução (unidade do sensor); 0 grava tudo
+    heartbeat: tempo máximo sem gravar uma linha (s)
+    """
+
+    def __init__(self, period=1.0, tolerance=0.0, heartbeat=60.0):
+        self.period = period
+        self.tolerance = tolerance
+        self.heartbeat = heartbeat
+
+
+class SwingingDoorCompressor:
+    """
+    Compressor swinging door com garantia de erro.
+    O ponto arquivado ao fechar a porta é projetado sobre a reta escolhida dentro
+    da porta, então todos os pontos descartados ficam a no máximo `tolerance` da
+    interpolação linear entre pontos arquivados.
+    """
+
+    def __init__(self, tolerance, heartbeat=60.0):
+        self.tolerance = tolerance
+        self.heartbeat = heartbeat
+        self.anchor = None    # (t, v) do último ponto arquivado
+        self.pending = None   # (t, v) do último ponto recebido e ainda não arquivado
+        self.low = float("-inf")
+        self.high = float("inf")
+        self.received = 0
+        self.archived = 0
+
+    def _slopes(self, t, v):
+        t0, v0 = self.anchor
+        dt = t - t0
+        return (v - self.tolerance - v0) / dt, (v + self.tolerance - v0) / dt
+
+    def _archive(self, t, v, low, high):
+        # Ponto sobre a reta da porta (dentro da tolerância do valor real)
+        t0, v0 = self.anchor
+        slope = min(high, max(low, (v - v0) / (t - t0)))
+        point = (t, v0 + slope * (t - t0))
+        self.anchor = point
+        self.pending = None
+        self.low, self.high = float("-inf"), float("inf")
+        self.archived += 1
+        return point
+
+    def add(self, t, v):
+        """Recebe uma amostra e retorna a lista de pontos (t, v) a gravar"""
+        self.received += 1
+        if self.anchor is None or self.tolerance <= 0:
+            self.anchor = (t, v)
+            self.archived += 1
+            return [(t, v)]
+        if t <= self.anchor[0]:
+            return []
+
+        out = []
+        low_i, high_i = self._slopes(t, v)
+        low, high = max(self.low, low_i), min(self.high, high_i)
+        if low > high:
+            # Porta fechou: arquiva o ponto anterior e recomeça a porta a partir dele
+            pt, pv = self.pending
+            out.append(self._archive(pt, pv, self.low, self.high))
+            low, high = self._slopes(t, v)
+
+        self.low, self.high = low, high
+        self.pending = (t, v)
+        if t - self.anchor[0] >= self.heartbeat:
+            out.append(self._archive(t, v, low, high))
+        return out
+
+    def flush(self):
+        """Arquiva o ponto pendente (ex.: ao encerrar o programa)"""
+        if self.pending is None:
+            return []
+        pt, pv = self.pending
+        return [self._archive(pt, pv, self.low, self.high)]
+
+    def interrupt(self):
+        """Arquiva o ponto pendente e começa um trecho novo (série interrompida, ex.: sensor em falha)"""
+        out = self.flush()
+        self.anchor = None
+        return out
+
+    @property
+    def ratio(self):
+        return self.received / self.archived if self.archived else 0.0
+
+
+def reconstruct(points, times):
+    """
+    Interpolação linear de uma série comprimida.
+    points: lista [(t, v)] ordenada por t; times: instantes desejados.
+    Instantes fora do intervalo gravado retornam None.
+    """
+    if not points:
+        return [None for _ in times]
+    ts = [p[0] for p in points]
+    out = []
+    for t in times:
+        i = bisect.bisect_left(ts, t)
+        if i < len(ts) and ts[i] == t:
+            out.append(points[i][1])
+        elif i == 0 or i == len(ts):
+            out.append(None)
+        else:
+            (t0, v0), (t1, v1) = points[i - 1], points[i]
+            out.append(v0 + (v1 - v0) * (t - t0) / (t1 - t0))
+    return out
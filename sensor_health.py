@@ -0,0 +1,144 @@
+# sensor_health.py
+# Saúde de cada sensor físico: disjuntor (circuit breaker) por sensor e qualidade de cada leitura.
+#
+#   fechado --(FAILURE_THRESHOLD falhas seguidas)--> aberto --(backoff vence)--> novo teste
+#   novo teste OK -> fechado; falhou -> aberto de novo com o dobro do backoff (até max_backoff)
+#
+# Com o disjuntor aberto o loop de aquisição nem toca no hardware (um MAX6675 com falha
+# custava o bit-banging inteiro a cada ciclo). Os novos testes rodam fora do loop, na thread
+# de teste do dashboard.py. Qualidade gravada junto com cada leitura:
+#   good  - leitura nova e válida
+#   stale - falha passageira: repete o último valor bom (por até max_stale s)
+#   fault - sem valor (disjuntor aberto ou falha sem valor bom recente)
+
+import random
+import threading
+import time
+
+from metrics import REGISTRY
+
+GOOD, STALE, FAULT = "good", "stale", "fault"
+QUALITIES = (GOOD, STALE, FAULT)
+
+CLOSED, OPEN = "closed", "open"
+
+FAILURE_THRESHOLD = 3
+
+READ_FAILURES = REGISTRY.counter("temppi_sensor_read_failures_total", "Leituras de sensor com erro", ("sensor",))
+BREAKER_TRIPS = REGISTRY.counter("temppi_sensor_breaker_trips_total", "Disjuntores abertos por sensor", ("sensor",))
+
+
+class CircuitBreaker:
+    """Disjuntor de um sensor (tempos em time.monotonic)"""
+
+    def __init__(self, threshold=FAILURE_THRESHOLD, base_backoff=5.0, max_backoff=300.0, jitter=0.1):
+        self.threshold = threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.state = CLOSED
+        self.failures = 0       # falhas seguidas
+        self.backoff = base_backoff
+        self.retry_at = 0.0     # próximo teste com o disjuntor aberto
+        self.last_error = None
+
+    def record_success(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.backoff = self.base_backoff
+        self.last_error = None
+
+    def record_failure(self, now, error=None):
+        """Conta uma falha; retorna True se o disjuntor abriu agora"""
+        self.failures += 1
+        self.last_error = error
+        if self.state == OPEN:
+            # Novo teste falhou: espera dobra
+            self.backoff = min(self.backoff * 2, self.max_backoff)
+            self._schedule(now)
+            return False
+        if self.failures >= self.threshold:
+            self.trip(now)
+            return True
+        return False
+
+    def trip(self, now):
+        """Abre o disjuntor (ex.: sensor reprovado no teste de partida)"""
+        self.state = OPEN
+        self._schedule(now)
+
+    def _schedule(self, now):
+        # Jitter para os sensores de um mesmo conector não serem testados todos juntos
+        self.retry_at = now + self.backoff * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def due(self, now):
+        return self.state == OPEN and now >= self.retry_at
+
+
+class SensorHealth:
+    """
+    Leituras com qualidade e disjuntores de um conjunto de sensores.
+    read(name, read_fn) -> (valor, qualidade); read_fn lê o hardware e levanta exceção
+    em caso de erro ou leitura inválida.
+    """
+
+    def __init__(self, names, threshold=FAILURE_THRESHOLD, base_backoff=5.0, max_backoff=300.0,
+                 max_stale=10.0, clock=time.monotonic):
+        self.breakers = {name: CircuitBreaker(threshold, base_backoff, max_backoff) for name in names}
+        self.max_stale = max_stale
+        self.clock = clock
+        self._last_good = {}  # nome -> (instante, valor)
+        self._lock = threading.Lock()
+
+    def read(self, name, read_fn):
+        breaker = self.breakers[name]
+        if breaker.state == OPEN:
+            return None, FAULT
+        try:
+            value = read_fn()
+        except Exception as e:
+            now = self.clock()
+            READ_FAILURES.labels(name).inc()
+            with self._lock:
+                if breaker.record_failure(now, str(e)):
+                    BREAKER_TRIPS.labels(name).inc()
+                    return None, FAULT
+            last = self._last_good.get(name)
+            if last is not None and now - last[0] <= self.max_stale:
+                return last[1], STALE
+            return None, FAULT
+        with self._lock:
+            breaker.record_success()
+        self._last_good[name] = (self.clock(), value)
+        return value, GOOD
+
+    def is_open(self, name):
+        return self.breakers[name].state == OPEN
+
+    def trip(self, name):
+        with self._lock:
+            if self.breakers[name].state != OPEN:
+                BREAKER_TRIPS.labels(name).inc()
+            self.breakers[name].trip(self.clock())
+
+    def due(self):
+        """Sensores com o disjuntor aberto cujo backoff venceu (hora de testar de novo)"""
+        now = self.clock()
+        with self._lock:
+            return [name for name, b in self.breakers.items() if b.due(now)]
+
+    def probe_result(self, name, ok, error=None):
+        """Resultado de um novo teste feito fora do loop de aquisição"""
+        with self._lock:
+            breaker = self.breakers[name]
+            if ok:
+                breaker.record_success()
+            else:
+                breaker.record_failure(self.clock(), error)
+
+    def next_due_in(self, default=1.0):
+        """Segundos até o próximo teste agendado (para a thread de teste dormir o necessário)"""
+        now = self.clock()
+        with self._lock:
+            waits = [b.retry_at - now for b in self.breakers.values() if b.state == OPEN]
+        return max(0.0, min(waits)) if waits else default
@@ -2,14 +2,60 @@
 # sensor_server.py
 # Servidor HTTP para visualização de dados dos sensores com gráficos
 
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, render_template, jsonify, request, g, Response
 import sqlite3
 import json
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+import hashlib
+import itertools
 import os
+import threading
+import time
+from sampling import parse_timestamp, format_timestamp, reconstruct
+from metrics import REGISTRY, CONTENT_TYPE, InstrumentedConnection
+from storage import migrate_schema
+from ingest import decode_batch, ingest_batch
+from chart_cache import ChartCache
+from channels import default_registry
+from shm_ring import LatestValues, SharedRing
+from query_builder import ReadingFilter, QueryTooExpensive, cost_limit, page_queries
+import wire
 
 app = Flask(__name__)
-DATABASE_PATH = "sensor_data.db"
+# Banco lido pelo servidor (o supervisor.py passa o seu --db por aqui)
+DATABASE_PATH = os.environ.get("TEMPPI_DB", "sensor_data.db")
+# Token exigido no POST /api/ingest (vazio = sem autenticação, só para rede fechada)
+INGEST_TOKEN = os.environ.get("TEMPPI_INGEST_TOKEN", "")
+_schema_ready = set()
+# Cache das séries de /api/chart em blocos de 15 min (limite de memória em MB)
+CHART_CACHE = ChartCache(int(os.environ.get("TEMPPI_CHART_CACHE_MB", "32")) * 1024 * 1024)
+# Orçamento de tempo de cada consulta filtrada de /api/data (ver query_builder.py)
+QUERY_TIME_LIMIT = int(os.environ.get("TEMPPI_QUERY_TIMEOUT_MS", "2000")) / 1000
+# Anel em memória compartilhada do modo multiprocesso (supervisor.py); vazio = sem /api/live
+RING_NAME = os.environ.get("TEMPPI_RING", "")
+_live = None
+_live_lock = threading.Lock()  # o cursor do leitor do anel não é compartilhável entre threads
+
+HTTP_LATENCY = REGISTRY.histogram("temppi_http_request_duration_seconds",
+                                  "Latência das requisições HTTP por rota", ("route", "method", "status"))
+CHART_CACHE_BYTES = REGISTRY.gauge("temppi_chart_cache_bytes", "Memória estimada do cache de séries",
+                                   function=lambda: CHART_CACHE.bytes)
+HTTP_NOT_MODIFIED = REGISTRY.counter("temppi_http_not_modified_total",
+                                     "Respostas 304 (validador ETag ainda válido) por rota", ("route",))
+
+# Respostas grandes (/api/chart, /api/data) saem em fluxo, lote a lote (fetchmany e blocos do
+# cache, tuplas em vez de sqlite3.Row): a memória de pico depende do lote, não do período pedido
+STREAM_BATCH = 1000
+# Página inteira cabe no primeiro lote, lido dentro do orçamento de tempo (cost_limit)
+MAX_PER_PAGE = STREAM_BATCH
+CHART_FIELDS = ('timestamp', 'temperature', 'pressure', 'velocity')
+
+# Janelas relativas ("últimas X horas") andam em degraus deste tamanho (s): sem escrita nova,
+# a resposta fica idêntica dentro do degrau e o ETag continua exato
+WINDOW_GRANULARITY = 60
+# Janelas que terminaram há mais que HISTORY_SETTLE são históricas e vão com cache longo
+HISTORY_SETTLE = timedelta(minutes=10)
+HISTORY_MAX_AGE = 86400
 
 # ============= FUNÇÕES DE BANCO DE DADOS =============
 
@@ -17,145 +63,222 @@ def get_db_connection():
     """Conecta ao banco de dados SQLite"""
     if not os.path.exists(DATABASE_PATH):
         return None
-    conn = sqlite3.connect(DATABASE_PATH)
+    # Conexão instrumentada: cada instrução SQL entra em temppi_sql_duration_seconds
+    conn = sqlite3.connect(DATABASE_PATH, factory=InstrumentedConnection)
     conn.row_factory = sqlite3.Row  # Para acessar colunas por nome
+    if DATABASE_PATH not in _schema_ready:
+        # Bancos antigos ganham as colunas rig_id e quality na primeira conexão (migração aditiva)
+        migrate_schema(conn)
+        conn.commit()
+        _schema_ready.add(DATABASE_PATH)
     return conn
 
-def get_sensor_list():
-    """Retorna lista de sensores disponíveis"""
+def db_time(dt):
+    """datetime UTC -> texto no formato gravado no banco (comparável como string)"""
+    return dt.strftime("%Y-%m-%d %H:%M:%S")
+
+def window_now():
+    """Hora UTC atual arredondada para baixo a WINDOW_GRANULARITY (limite das janelas relativas)"""
+    now = datetime.now(timezone.utc)
+    return now - timedelta(seconds=now.timestamp() % WINDOW_GRANULARITY)
+
+def write_watermark(sensor_name=None, rig=None):
+    """
+    Maior id gravado: muda a cada leitura nova (inclusive ingestão/backfill com timestamp antigo).
+    Por sensor é uma busca no idx_sensor_name; com rig usa o MAX(id) geral, que também é O(1)
+    (o índice da planta não tem o id em ordem e exigiria varrer o intervalo).
+    """
+    conn = get_db_connection()
+    if not conn:
+        return None
+    if sensor_name and not rig:
+        row = conn.execute("SELECT MAX(id) FROM sensor_readings WHERE sensor_name = ?", (sensor_name,)).fetchone()
+    else:
+        row = conn.execute("SELECT MAX(id) FROM sensor_readings").fetchone()
+    conn.close()
+    return row[0]
+
+def get_sensor_list(rig=None):
+    """Retorna lista de sensores disponíveis (rig: apenas os de uma planta)"""
     conn = get_db_connection()
     if not conn:
         return []
     
     cursor = conn.cursor()
-    cursor.execute("SELECT DISTINCT sensor_name FROM sensor_readings ORDER BY sensor_name")
+    if rig:
+        cursor.execute("SELECT DISTINCT sensor_name FROM sensor_readings WHERE rig_id = ? ORDER BY sensor_name", (rig,))
+    else:
+        cursor.execute("SELECT DISTINCT sensor_name FROM sensor_readings ORDER BY sensor_name")
     sensors = [row[0] for row in cursor.fetchall()]
     conn.close()
     return sensors
 
-def get_sensor_data(sensor_name=None, start_date=None, end_date=None, limit=100, offset=0):
-    """Busca dados dos sensores com filtros"""
+def get_sensor_data(sensor_name=None, start_date=None, end_date=None, limit=100, offset=0, rig=None, filters=None):
+    """
+    Busca dados dos sensores com filtros. filters (ReadingFilter) substitui os argumentos simples
+    e aceita vários sensores, tipo, modo e faixa de valor. A consulta roda com orçamento de tempo
+    (QueryTooExpensive se estourar). Retorna (lista de dicts, total); /api/data usa stream_sensor_data.
+    """
+    if filters is None:
+        filters = ReadingFilter(sensors=[sensor_name] if sensor_name else (), start=start_date, end=end_date, rig=rig)
+    total, fields, batches = stream_sensor_data(filters, limit, offset)
+    return [dict(zip(fields, row)) for batch in batches for row in batch], total
+
+def stream_sensor_data(filters, limit=100, offset=0):
+    """
+    Página de /api/data em fluxo: (total, nomes das colunas, lotes de tuplas). O total e o
+    primeiro lote saem dentro do orçamento de tempo, antes de a resposta começar (o erro ainda
+    pode virar 422); o resto da página vem por fetchmany enquanto é enviado. Com
+    limit <= STREAM_BATCH (MAX_PER_PAGE na rota) a página inteira é lida sob o orçamento.
+    """
     conn = get_db_connection()
     if not conn:
-        return [], 0
-    
-    cursor = conn.cursor()
-    
-    # Construir query base
-    where_clauses = []
-    params = []
-    
-    if sensor_name:
-        where_clauses.append("sensor_name = ?")
-        params.append(sensor_name)
-    
-    if start_date:
-        where_clauses.append("timestamp >= ?")
-        params.append(start_date)
-    
-    if end_date:
-        where_clauses.append("timestamp <= ?")
-        params.append(end_date)
-    
-    where_sql = " WHERE " + " AND ".join(where_clauses) if where_clauses else ""
+        return 0, (), iter(())
+    conn.row_factory = None  # tuplas: sem a cópia sqlite3.Row -> dict por linha
     
-    # Query para contar total
-    count_query = f"SELECT COUNT(*) FROM sensor_readings{where_sql}"
-    cursor.execute(count_query, params)
-    total = cursor.fetchone()[0]
-    
-    # Query para buscar dados
-    data_query = f"""
-        SELECT * FROM sensor_readings{where_sql} 
-        ORDER BY timestamp DESC 
-        LIMIT ? OFFSET ?
-    """
-    cursor.execute(data_query, params + [limit, offset])
-    
-    rows = cursor.fetchall()
-    data = []
-    for row in rows:
-        data.append({
-            'id': row['id'],
-            'timestamp': row['timestamp'],
-            'sensor_name': row['sensor_name'],
-            'temperature': row['temperature'],
-            'pressure': row['pressure'],
-            'velocity': row['velocity'],
-            'sensor_type': row['sensor_type'],
-            'pins': row['pins'],
-            'mode': row['mode']
-        })
-    
-    conn.close()
-    return data, total
+    # SQL sempre no formato que os índices atendem (ver query_builder.py)
+    (count_sql, count_params), (page_sql, page_params) = page_queries(filters, default_registry(), limit, offset)
+    try:
+        with cost_limit(conn, QUERY_TIME_LIMIT):
+            total = conn.execute(count_sql, count_params).fetchone()[0]
+            cursor = conn.execute(page_sql, page_params)
+            first = cursor.fetchmany(STREAM_BATCH)
+    except Exception:
+        conn.close()
+        raise
+    # Nomes pelo cursor: em bancos migrados a ordem das colunas acrescentadas pode variar
+    return total, tuple(d[0] for d in cursor.description), _fetch_batches(conn, cursor, first)
+
+def _fetch_batches(conn, cursor, batch):
+    """Lotes restantes de um cursor; a conexão fecha no fim (ou se o cliente desconectar)"""
+    try:
+        while batch:
+            yield batch
+            batch = cursor.fetchmany(STREAM_BATCH)
+    finally:
+        conn.close()
+
+def get_chart_data(sensor_name, hours=24, rig=None):
+    """Busca dados para gráficos (últimas X horas) como lista de dicts; /api/chart usa stream_chart_data"""
+    return [dict(zip(CHART_FIELDS, row)) for batch in stream_chart_data(sensor_name, hours, rig) for row in batch]
 
-def get_chart_data(sensor_name, hours=24):
-    """Busca dados para gráficos (últimas X horas)"""
+def stream_chart_data(sensor_name, hours=24, rig=None):
+    """Série das últimas X horas em lotes de tuplas (timestamp, temperature, pressure, velocity)"""
     conn = get_db_connection()
     if not conn:
-        return []
+        return iter(())
     
-    cursor = conn.cursor()
-    start_time = datetime.now() - timedelta(hours=hours)
-    
-    cursor.execute("""
-        SELECT timestamp, temperature, pressure, velocity 
-        FROM sensor_readings 
-        WHERE sensor_name = ? AND timestamp >= ?
-        ORDER BY timestamp ASC
-    """, (sensor_name, start_time.isoformat()))
-    
-    rows = cursor.fetchall()
-    data = []
-    for row in rows:
-        data.append({
-            'timestamp': row['timestamp'],
-            'temperature': row['temperature'],
-            'pressure': row['pressure'],
-            'velocity': row['velocity']
-        })
+    # O banco guarda UTC no formato 'YYYY-MM-DD HH:MM:SS'; comparar com isoformat() local ('T')
+    # deixava de fora as leituras do próprio dia
+    start_time = db_time(window_now() - timedelta(hours=hours))
     
-    conn.close()
-    return data
+    # Blocos fechados vêm do cache; só a cauda (bloco atual) vai ao banco
+    return _chart_batches(conn, sensor_name, start_time, rig)
+
+def _chart_batches(conn, sensor_name, start_time, rig):
+    try:
+        yield from CHART_CACHE.iter_series(conn, sensor_name, start_time, rig, DATABASE_PATH)
+    finally:
+        conn.close()
+
+def resample_chart_data(batches, step):
+    """
+    Reconstrói a série comprimida (swinging door) em uma grade regular de `step` segundos,
+    por interpolação linear entre as linhas gravadas (erro dentro da tolerância do logger).
+    Lotes de tuplas (timestamp, temperature, pressure, velocity) ordenados por tempo -> lotes
+    da grade, em fluxo: um ponto da grade sai assim que cada coluna tem o ponto seguinte
+    (ou, sem ponto anterior, o tempo já passou). Só fica retido o trecho da grade dentro de
+    um intervalo sem pontos de uma coluna (ex.: sensor em falha) até o próximo ponto dela.
+    """
+    if step <= 0:
+        yield from batches
+        return
+    ncols = len(CHART_FIELDS) - 1
+    grid = []             # [t, valores] ainda não enviados; grid[0] é o ponto `base` da grade
+    base = 0
+    pending = [0] * ncols  # por coluna: primeiro ponto da grade ainda sem valor
+    last = [None] * ncols  # por coluna: último ponto gravado (t, v)
+    g = None
+    for batch in batches:
+        for row in batch:
+            t = parse_timestamp(row[0])
+            if g is None:
+                g = t
+            while g <= t:
+                grid.append((g, [None] * ncols))
+                g += step
+            end = base + len(grid)
+            for c in range(ncols):
+                v = row[c + 1]
+                i = pending[c]
+                if v is None:
+                    if last[c] is None:
+                        # Coluna ainda sem pontos: os instantes anteriores ficam None
+                        while i < end and grid[i - base][0] < t:
+                            i += 1
+                        pending[c] = i
+                    continue
+                prev = last[c]
+                while i < end and grid[i - base][0] <= t:
+                    gt, values = grid[i - base]
+                    if gt == t:
+                        values[c] = v
+                    elif prev is not None:
+                        t0, v0 = prev
+                        values[c] = v0 + (v - v0) * (gt - t0) / (t - t0)
+                    i += 1
+                pending[c] = i
+                last[c] = (t, v)
+        done = min(pending) - base
+        if done:
+            yield [(format_timestamp(gt),) + tuple(values) for gt, values in grid[:done]]
+            del grid[:done]
+            base += done
+    # Depois do último ponto de cada coluna: None
+    if grid:
+        yield [(format_timestamp(gt),) + tuple(values) for gt, values in grid]
 
-def get_statistics():
-    """Retorna estatísticas gerais do sistema"""
+def get_statistics(rig=None):
+    """Retorna estatísticas gerais do sistema (rig: apenas de uma planta)"""
     conn = get_db_connection()
     if not conn:
         return {}
     
     cursor = conn.cursor()
+    rig_where, rig_and = ("WHERE rig_id = ?", "AND rig_id = ?") if rig else ("", "")
+    rig_params = (rig,) if rig else ()
     
     # Total de registros
-    cursor.execute("SELECT COUNT(*) FROM sensor_readings")
+    cursor.execute(f"SELECT COUNT(*) FROM sensor_readings {rig_where}", rig_params)
     total_readings = cursor.fetchone()[0]
     
     # Registros por sensor
-    cursor.execute("""
+    cursor.execute(f"""
         SELECT sensor_name, COUNT(*) as count 
         FROM sensor_readings 
+        {rig_where}
         GROUP BY sensor_name 
         ORDER BY count DESC
-    """)
+    """, rig_params)
     sensor_counts = dict(cursor.fetchall())
     
     # Última leitura
-    cursor.execute("""
+    cursor.execute(f"""
         SELECT timestamp, sensor_name 
         FROM sensor_readings 
+        {rig_where}
         ORDER BY timestamp DESC 
         LIMIT 1
-    """)
+    """, rig_params)
     last_reading = cursor.fetchone()
     
     # Registros nas últimas 24h
-    yesterday = datetime.now() - timedelta(days=1)
-    cursor.execute("""
+    yesterday = db_time(window_now() - timedelta(days=1))
+    cursor.execute(f"""
         SELECT COUNT(*) 
         FROM sensor_readings 
-        WHERE timestamp >= ?
-    """, (yesterday.isoformat(),))
+        WHERE timestamp >= ? {rig_and}
+    """, (yesterday,) + rig_params)
     readings_24h = cursor.fetchone()[0]
     
     conn.close()
@@ -167,51 +290,278 @@ def get_statistics():
         'readings_24h': readings_24h
     }
 
+def get_rigs():
+    """Plantas que já enviaram leituras (resumo mantido pela ingestão, sem varrer a tabela)"""
+    conn = get_db_connection()
+    if not conn:
+        return []
+    
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT rig_id, first_seen, last_seen, last_reading, total_rows
+        FROM rigs
+        ORDER BY rig_id
+    """)
+    rigs = [dict(row) for row in cursor.fetchall()]
+    conn.close()
+    return rigs
+
+def negotiate_format(allowed):
+    """
+    Formato da resposta: ?format= tem prioridade, senão o cabeçalho Accept
+    (application/json continua sendo o padrão para navegadores e clientes antigos).
+    Retorna None se o formato pedido não for suportado pela rota.
+    """
+    requested = request.args.get('format')
+    if requested:
+        return requested if requested in allowed else None
+    mimes = [wire.FORMAT_MIMES[f] for f in allowed]
+    best = request.accept_mimetypes.best_match(mimes, default=wire.JSON_MIME)
+    return next(f for f in allowed if wire.FORMAT_MIMES[f] == best)
+
+def json_array(batches, fields):
+    """Lotes de tuplas -> pedaços de um array JSON de objetos (só um lote vira dict por vez)"""
+    yield '['
+    sep = ''
+    for batch in batches:
+        yield sep + json.dumps([dict(zip(fields, row)) for row in batch], separators=(',', ':'))[1:-1]
+        sep = ','
+    yield ']'
+
+def chart_response(fmt, batches):
+    """Série (lotes de tuplas) no formato negociado, em fluxo: cada lote é codificado e enviado antes do próximo"""
+    if fmt == 'json':
+        return Response(json_array(batches, CHART_FIELDS), content_type=wire.JSON_MIME)
+    if fmt == 'binary':
+        return Response(wire.series_binary_stream(batches), content_type=wire.BINARY_MIME)
+    return Response(wire.series_columnar_stream(batches), content_type=wire.COLUMNAR_MIME)
+
+# ============= CACHE HTTP =============
+
+def make_etag(*parts):
+    """ETag a partir da rota, parâmetros, formato e marca d'água de escrita"""
+    return hashlib.sha1(repr(parts).encode()).hexdigest()[:20]
+
+def historical_end(end_date):
+    """
+    Fim de uma janela absoluta que terminou há mais de HISTORY_SETTLE (não recebe mais
+    leituras ao vivo) como datetime UTC; None para janelas abertas ou recentes
+    """
+    if not end_date:
+        return None
+    try:
+        # Datas HTTP têm resolução de segundo (o fim inclusivo vem com .999)
+        end = datetime.fromisoformat(end_date.replace('T', ' ')).replace(tzinfo=timezone.utc, microsecond=0)
+    except ValueError:
+        return None
+    return end if end < datetime.now(timezone.utc) - HISTORY_SETTLE else None
+
+def not_modified(etag, last_modified=None):
+    """
+    Resposta 304 se o cliente já tem esta versão, senão None. If-None-Match tem prioridade;
+    If-Modified-Since só vale para janelas históricas (last_modified = fim da janela).
+    """
+    if request.if_none_match:
+        fresh = etag in request.if_none_match
+    else:
+        since = request.if_modified_since
+        fresh = bool(last_modified and since and last_modified <= since)
+    if not fresh:
+        return None
+    HTTP_NOT_MODIFIED.labels(request.url_rule.rule).inc()
+    return cache_headers(Response(status=304), etag, last_modified)
+
+def cache_headers(response, etag, last_modified=None):
+    """
+    Validadores e política de cache. Dados ao vivo: no-cache (o navegador sempre revalida e
+    recebe 304 enquanto não houver escrita). Janelas históricas: Last-Modified e cache longo,
+    absorvido pelo navegador/proxy sem chegar ao Pi.
+    """
+    response.set_etag(etag)
+    response.headers['Vary'] = 'Accept'
+    if last_modified:
+        response.last_modified = last_modified
+        response.headers['Cache-Control'] = f'public, max-age={HISTORY_MAX_AGE}'
+    else:
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+# ============= INSTRUMENTAÇÃO =============
+
+@app.before_request
+def _start_timer():
+    g.request_t0 = time.perf_counter()
+
+@app.after_request
+def _observe_latency(response):
+    t0 = g.pop('request_t0', None)
+    if t0 is not None:
+        # Rótulo pela regra da rota (ex.: /api/chart/<sensor_name>) para não explodir a cardinalidade
+        route = request.url_rule.rule if request.url_rule else 'desconhecida'
+        HTTP_LATENCY.labels(route, request.method, response.status_code).observe(time.perf_counter() - t0)
+    return response
+
+@app.route('/metrics')
+def metrics():
+    """Métricas no formato texto do Prometheus"""
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
+
 # ============= ROTAS DO SERVIDOR =============
 
 @app.route('/')
 def index():
     """Página principal"""
-    sensors = get_sensor_list()
+    sensors = get_sensor_list(request.args.get('rig'))
     stats = get_statistics()
     return render_template('index.html', sensors=sensors, stats=stats)
 
 @app.route('/api/sensors')
 def api_sensors():
     """API: Lista de sensores"""
-    return jsonify(get_sensor_list())
+    rig = request.args.get('rig')
+    etag = make_etag('sensors', rig, write_watermark())
+    return not_modified(etag) or cache_headers(jsonify(get_sensor_list(rig)), etag)
 
 @app.route('/api/data')
 def api_data():
-    """API: Dados dos sensores com paginação e filtros"""
-    sensor_name = request.args.get('sensor')
-    start_date = request.args.get('start_date')
-    end_date = request.args.get('end_date')
-    page = int(request.args.get('page', 1))
-    per_page = int(request.args.get('per_page', 50))
+    """API: Dados dos sensores com paginação e filtros (json ou columnar)"""
+    fmt = negotiate_format(('json', 'columnar'))
+    if fmt is None:
+        return jsonify({'error': 'formato não suportado (json ou columnar)'}), 406
+    try:
+        page = int(request.args.get('page', 1))
+        per_page = int(request.args.get('per_page', 50))
+    except ValueError:
+        return jsonify({'error': 'page e per_page devem ser inteiros'}), 400
+    if page < 1 or not 1 <= per_page <= MAX_PER_PAGE:
+        return jsonify({'error': f'page >= 1 e per_page entre 1 e {MAX_PER_PAGE}'}), 400
+    # Filtros: sensor e type/mode (repetidos ou separados por vírgula), start_date, end_date, min, max, rig
+    try:
+        filters = ReadingFilter.from_args(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # Validador barato antes da consulta: nada gravado desde o último poll -> 304 sem tocar na tabela
+    single = filters.sensors[0] if len(filters.sensors) == 1 else None
+    etag = make_etag('data', fmt, filters.key(), page, per_page, write_watermark(single, filters.rig))
+    last_modified = historical_end(filters.end)
+    cached = not_modified(etag, last_modified)
+    if cached:
+        return cached
     
     offset = (page - 1) * per_page
-    data, total = get_sensor_data(sensor_name, start_date, end_date, per_page, offset)
+    try:
+        total, fields, batches = stream_sensor_data(filters, per_page, offset)
+    except QueryTooExpensive as e:
+        return jsonify({'error': f'{e}: restrinja os sensores ou o período'}), 422
     
-    return jsonify({
-        'data': data,
+    result = {
         'total': total,
         'page': page,
         'per_page': per_page,
         'total_pages': (total + per_page - 1) // per_page
-    })
+    }
+    if fmt == 'columnar':
+        # Colunas e dicionários precisam da página inteira (limitada por per_page)
+        result['data'] = wire.data_columnar([dict(zip(fields, row)) for batch in batches for row in batch])
+        response = Response(json.dumps(result, separators=(',', ':')), content_type=wire.COLUMNAR_MIME)
+    else:
+        # Metadados primeiro e as linhas em fluxo no fim do objeto
+        head = json.dumps(result, separators=(',', ':'))[:-1] + ',"data":'
+        body = itertools.chain((head,), json_array(batches, fields), ('}',))
+        response = Response(body, content_type=wire.JSON_MIME)
+    return cache_headers(response, etag, last_modified)
 
 @app.route('/api/chart/<sensor_name>')
 def api_chart(sensor_name):
-    """API: Dados para gráficos"""
+    """API: Dados para gráficos (json, columnar ou binary)"""
+    fmt = negotiate_format(('json', 'columnar', 'binary'))
+    if fmt is None:
+        return jsonify({'error': 'formato não suportado (json, columnar ou binary)'}), 406
     hours = int(request.args.get('hours', 24))
-    data = get_chart_data(sensor_name, hours)
-    return jsonify(data)
+    step = request.args.get('step', type=float)
+    rig = request.args.get('rig')
+    # O início da janela entra no ETag: ele só muda a cada WINDOW_GRANULARITY segundos
+    etag = make_etag('chart', fmt, sensor_name, hours, step, rig, window_now().timestamp(),
+                     write_watermark(sensor_name, rig))
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    batches = stream_chart_data(sensor_name, hours, rig)
+    if step:
+        batches = resample_chart_data(batches, step)
+    return cache_headers(chart_response(fmt, batches), etag)
 
 @app.route('/api/stats')
 def api_stats():
     """API: Estatísticas gerais"""
-    return jsonify(get_statistics())
+    rig = request.args.get('rig')
+    etag = make_etag('stats', rig, window_now().timestamp(), write_watermark())
+    return not_modified(etag) or cache_headers(jsonify(get_statistics(rig)), etag)
+
+@app.route('/api/channels')
+def api_channels():
+    """API: Registro de canais (tipo, unidade e faixa de cada sensor, ver channels.json)"""
+    return jsonify(default_registry().to_list())
+
+def get_live_values():
+    """Último valor de cada canal publicado no anel pela aquisição (None se o anel não existe)"""
+    global _live
+    with _live_lock:
+        if _live is None:
+            try:
+                _live = LatestValues(SharedRing(RING_NAME))
+            except FileNotFoundError:
+                return None
+        latest = dict(_live.update())
+    registry = default_registry()
+    live = {}
+    for channel_id, record in latest.items():
+        ch = registry.by_id.get(channel_id)
+        if ch is not None:
+            live[ch.name] = {'channel_id': ch.id, 'value': record.value, 'quality': record.quality,
+                             'timestamp': format_timestamp(record.t)}
+    return live
+
+@app.route('/api/live')
+def api_live():
+    """API: Leituras ao vivo (sem passar pelo banco), só no modo multiprocesso"""
+    if not RING_NAME:
+        return jsonify({'error': 'Servidor sem anel de leituras (defina TEMPPI_RING)'}), 404
+    live = get_live_values()
+    if live is None:
+        return jsonify({'error': f"Anel '{RING_NAME}' não encontrado (aquisição parada?)"}), 503
+    response = jsonify(live)
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+@app.route('/api/rigs')
+def api_rigs():
+    """API: Plantas conectadas ao servidor central"""
+    return jsonify(get_rigs())
+
+@app.route('/api/ingest', methods=['POST'])
+def api_ingest():
+    """API: Recebe um lote de leituras de uma planta (gzip JSON, ver ingest.py)"""
+    if INGEST_TOKEN and request.headers.get('Authorization') != f"Bearer {INGEST_TOKEN}":
+        return jsonify({'error': 'não autorizado'}), 401
+    try:
+        rig_id, rows = decode_batch(request.get_data(), request.headers.get('Content-Encoding'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # O servidor central pode começar sem banco: a primeira ingestão cria o esquema
+    if not os.path.exists(DATABASE_PATH):
+        from storage import init_database
+        init_database(DATABASE_PATH)
+    conn = get_db_connection()
+    try:
+        accepted, duplicates = ingest_batch(conn, rig_id, rows)
+    except sqlite3.Error as e:
+        return jsonify({'error': f'erro no banco: {e}'}), 503
+    finally:
+        conn.close()
+    return jsonify({'rig_id': rig_id, 'accepted': accepted, 'duplicates': duplicates})
 
 @app.route('/sensor/<sensor_name>')
 def sensor_detail(sensor_name):
@@ -0,0 +1,248 @@
+# shm_ring.py
+# Anel em memória compartilhada entre processos (um produtor, vários leitores), sem locks.
+#
+#   cabeçalho (64 B): magic | capacidade | head (próximo índice a escrever) | cursor do gravador | pid do produtor
+#   slots (32 B cada): seq | t | valor | channel_id | tipo | qualidade | modo | pinos
+#
+# Só o processo de aquisição escreve. Cada slot tem um número de sequência (seqlock):
+# o produtor zera o seq, escreve o registro e grava seq = índice + 1; depois avança o head.
+# O leitor confere o seq antes e depois de copiar o registro: se mudou, o slot foi
+# sobrescrito (o anel deu a volta) e o registro é descartado como perdido.
+# O produtor nunca espera por leitores: se o gravador atrasar, os registros mais antigos são perdidos
+# (contados em temppi_ring_dropped_total), mas a amostragem não para.
+#
+# Tipos de registro:
+#   LIVE    - toda leitura feita (painel e /api/live mostram o último valor de cada canal)
+#   ARCHIVE - ponto escolhido pela compressão (o storage_drain.py grava no SQLite)
+#
+# Cada leitor guarda o próprio cursor; só o do gravador fica no cabeçalho, para um
+# storage_drain.py reiniciado continuar de onde o anterior parou.
+
+import math
+import os
+import struct
+from multiprocessing import resource_tracker, shared_memory
+
+from metrics import REGISTRY
+
+RING_NAME = "temppi"
+CAPACITY = 8192  # ~2 h de pontos arquivados + leituras da planta atual (8 canais)
+
+MAGIC = 0x54505231  # "TPR1"
+HEADER = struct.Struct("<IIQQQ")  # magic, capacity, head, drain, producer_pid
+HEADER_SIZE = 64
+# head, cursor, pid e seq são palavras de 8 bytes alinhadas, lidas e escritas por uma visão
+# memoryview.cast("Q") (uma cópia de 8 bytes). Não use struct.pack_into nelas: ele zera o
+# campo antes de escrever e um leitor chegava a ver head = 0
+HEAD_WORD, DRAIN_WORD, PID_WORD = 1, 2, 3
+
+RECORD = struct.Struct("<QddHBBB3B")  # seq, t, valor, channel_id, tipo, qualidade, modo, pinos
+SLOT_SIZE = 32
+SLOT_WORDS = SLOT_SIZE // 8
+
+LIVE, ARCHIVE = 1, 2
+QUALITY_CODES = {"good": 0, "stale": 1, "fault": 2}
+QUALITY_NAMES = {code: name for name, code in QUALITY_CODES.items()}
+MODE_CODES = {"simulation": 0, "rpi": 1}
+MODE_NAMES = {code: name for name, code in MODE_CODES.items()}
+NO_PIN = 0xFF
+
+RING_PUBLISHED = REGISTRY.counter("temppi_ring_published_total", "Registros publicados no anel", ("kind",))
+RING_DROPPED = REGISTRY.counter("temppi_ring_dropped_total", "Registros sobrescritos antes de serem lidos")
+
+
+_created = set()  # anéis criados por este processo (o registro no resource_tracker é dele)
+
+
+class Record:
+    __slots__ = ("index", "t", "value", "channel_id", "kind", "quality", "mode", "pins")
+
+    def __init__(self, index, t, value, channel_id, kind, quality, mode, pins):
+        self.index = index
+        self.t = t
+        self.value = value
+        self.channel_id = channel_id
+        self.kind = kind
+        self.quality = quality
+        self.mode = mode
+        self.pins = pins
+
+    def __repr__(self):
+        return f"Record({self.index}, ch={self.channel_id}, {self.value}, {self.quality})"
+
+
+class SharedRing:
+    """
+    Anel de registros de leitura em multiprocessing.shared_memory.
+    create=True cria (ou recria) o segmento; create=False só se conecta a um existente
+    (FileNotFoundError se ninguém criou).
+    """
+
+    def __init__(self, name=RING_NAME, capacity=CAPACITY, create=False):
+        self.name = name
+        if create:
+            try:
+                old = shared_memory.SharedMemory(name=name)
+                old.close()
+                old.unlink()  # sobra de uma execução anterior que não terminou limpa
+            except FileNotFoundError:
+                pass
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=HEADER_SIZE + capacity * SLOT_SIZE)
+            HEADER.pack_into(self.shm.buf, 0, MAGIC, capacity, 0, 0, 0)
+            _created.add(name)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            # No Python < 3.13 o resource_tracker apagaria o segmento quando este processo
+            # saísse; só quem criou o anel (o supervisor) o remove
+            if name not in _created:
+                resource_tracker.unregister(self.shm._name, "shared_memory")
+            magic, capacity = HEADER.unpack_from(self.shm.buf, 0)[:2]
+            if magic != MAGIC:
+                self.shm.close()
+                raise ValueError(f"segmento '{name}' não é um anel do TempPi")
+        self.owner = create
+        self.capacity = capacity
+        self.buf = self.shm.buf
+        self.words = self.buf.cast("Q")
+
+    # --- cabeçalho ---
+    def head(self):
+        return self.words[HEAD_WORD]
+
+    def drain_cursor(self):
+        return self.words[DRAIN_WORD]
+
+    def set_drain_cursor(self, index):
+        self.words[DRAIN_WORD] = index
+
+    def producer_pid(self):
+        return self.words[PID_WORD]
+
+    def close(self):
+        if self.words is None:
+            return
+        self.words.release()
+        self.words = self.buf = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+            _created.discard(self.name)
+
+    def __del__(self):
+        # A visão cast("Q") precisa ser liberada antes do mmap (senão BufferError na saída)
+        if getattr(self, "words", None) is not None:
+            self.close()
+
+
+def open_ring(name=RING_NAME, capacity=CAPACITY):
+    """
+    Conecta-se ao anel ou cria se ainda não existir (aquisição rodando sem o supervisor).
+    O segmento criado aqui sobrevive a este processo, para o gravador terminar de esvaziá-lo.
+    """
+    try:
+        return SharedRing(name)
+    except FileNotFoundError:
+        ring = SharedRing(name, capacity, create=True)
+        resource_tracker.unregister(ring.shm._name, "shared_memory")
+        _created.discard(name)
+        ring.owner = False
+        return ring
+
+
+class RingWriter:
+    """Produtor único (processo de aquisição)"""
+
+    def __init__(self, ring):
+        pid = ring.producer_pid()
+        if pid and pid != os.getpid() and _alive(pid):
+            raise RuntimeError(f"anel '{ring.name}' já tem um produtor (pid {pid})")
+        ring.words[PID_WORD] = os.getpid()
+        self.ring = ring
+        self._head = ring.head()  # aquisição reiniciada continua a numeração
+
+    def publish(self, kind, t, value, channel_id, quality="good", mode="simulation", pins=None):
+        ring = self.ring
+        index = self._head
+        slot = index % ring.capacity
+        seq_word = HEADER_SIZE // 8 + slot * SLOT_WORDS
+        pin_bytes = (tuple(pins) + (NO_PIN,) * 3)[:3] if pins else (NO_PIN,) * 3
+        ring.words[seq_word] = 0  # slot em escrita
+        RECORD.pack_into(ring.buf, HEADER_SIZE + slot * SLOT_SIZE, 0, t, math.nan if value is None else value,
+                         channel_id or 0, kind, QUALITY_CODES[quality], MODE_CODES[mode], *pin_bytes)
+        ring.words[seq_word] = index + 1
+        self._head = index + 1
+        ring.words[HEAD_WORD] = self._head
+        RING_PUBLISHED.labels("live" if kind == LIVE else "archive").inc()
+
+    def close(self):
+        self.ring.words[PID_WORD] = 0
+
+
+class RingReader:
+    """
+    Leitor com cursor próprio. start=None começa no registro mais antigo ainda no anel
+    (um painel reiniciado reconstrói os últimos valores a partir dele).
+    """
+
+    def __init__(self, ring, start=None):
+        self.ring = ring
+        head = ring.head()
+        self.cursor = max(0, head - ring.capacity) if start is None else start
+        self.dropped = 0
+
+    def read(self, max_records=None):
+        """Registros novos desde a última chamada (perdidos por sobrescrita são pulados e contados)"""
+        ring = self.ring
+        head = ring.head()
+        if self.cursor > head:
+            self.cursor = max(0, head - ring.capacity)  # anel recriado: numeração recomeçou
+        if head - self.cursor > ring.capacity:
+            self._drop(head - ring.capacity - self.cursor)
+            self.cursor = head - ring.capacity
+        end = head if max_records is None else min(head, self.cursor + max_records)
+        records = []
+        while self.cursor < end:
+            index = self.cursor
+            slot = index % ring.capacity
+            seq_word = HEADER_SIZE // 8 + slot * SLOT_WORDS
+            seq = ring.words[seq_word]
+            fields = RECORD.unpack_from(ring.buf, HEADER_SIZE + slot * SLOT_SIZE)
+            if seq != index + 1 or ring.words[seq_word] != index + 1:
+                # Sobrescrito durante a leitura: o produtor já está uma volta à frente
+                self._drop(1)
+                self.cursor += 1
+                continue
+            _, t, value, channel_id, kind, quality, mode, *pins = fields
+            records.append(Record(index, t, None if math.isnan(value) else value, channel_id or None, kind,
+                                  QUALITY_NAMES.get(quality, "fault"), MODE_NAMES.get(mode, "simulation"),
+                                  tuple(p for p in pins if p != NO_PIN) or None))
+            self.cursor += 1
+        return records
+
+    def _drop(self, n):
+        self.dropped += n
+        RING_DROPPED.inc(n)
+
+
+class LatestValues:
+    """Último valor LIVE de cada canal, para quem só exibe (painel, /api/live)"""
+
+    def __init__(self, ring):
+        self.reader = RingReader(ring)
+        self.values = {}  # channel_id -> Record
+
+    def update(self):
+        for record in self.reader.read():
+            if record.kind == LIVE:
+                self.values[record.channel_id] = record
+        return self.values
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# simulator.py
+# Motor de simulação vetorizado (NumPy) da planta, com semente reprodutível.
+# Cada "unidade" é uma planta virtual com os 8 sensores do painel; todas avançam juntas
+# em operações de array, então milhares de leituras por segundo saem sem esforço.
+#
+# Modelo (por unidade):
+#   - Forno segue o valor base + deriva (random walk com retorno lento, ex.: variação da carga)
+#   - atraso térmico de 1ª ordem em cadeia: Forno -> Saída Gases, Forno -> Tanque -> Torre 1 -> 2 -> 3
+#   - pressão acompanha a temperatura dos gases; velocidade com deriva própria
+#   - ruído de medição e quantização do MAX6675 (0.25 °C)
+#   - quedas de sensor (dropouts): NaN por alguns segundos, em média a cada `dropout_mtbf` s
+#
+# Uso como carga sintética:
+#   python simulator.py --units 50 --seconds 3600 --dst carga.db
+#   python simulator.py --units 10 --realtime --dst sensor_data.db   (escrita contínua, 1 s por passo)
+
+import argparse
+import time
+
+import numpy as np
+
+# (nome, tipo, valor base, constante de tempo τ em s, sensor a montante, ganho do acoplamento)
+MODEL = [
+    ("Temp Forno",       "temperature", 350.0, 60.0,  None,            0.0),
+    ("Temp Saída Gases", "temperature", 300.0, 20.0,  "Temp Forno",    0.8),
+    ("Temp Tanque",      "temperature", 120.0, 180.0, "Temp Forno",    0.3),
+    ("Torre Nível 1",    "temperature", 110.0, 90.0,  "Temp Tanque",   0.9),
+    ("Torre Nível 2",    "temperature", 140.0, 120.0, "Torre Nível 1", 0.9),
+    ("Torre Nível 3",    "temperature", 180.0, 150.0, "Torre Nível 2", 0.9),
+    ("Pressão Gases",    "pressure",    2.00,  5.0,   "Temp Saída Gases", 0.01),
+    ("Velocidade",       "velocity",    600.0, 30.0,  None,            0.0),
+]
+SENSOR_NAMES = [m[0] for m in MODEL]
+SENSOR_TYPES = [m[1] for m in MODEL]
+
+# Ruído de processo (random walk, por √s) e de medição, na unidade de cada sensor
+PROCESS_NOISE = np.array([0.3, 0.2, 0.05, 0.05, 0.05, 0.05, 0.005, 3.0])
+MEASUREMENT_NOISE = np.array([0.15, 0.15, 0.1, 0.1, 0.1, 0.1, 0.01, 2.0])
+# Resolução de cada leitura: MAX6675 em 0.25 °C, pressão em 0.01 bar, velocidade inteira
+RESOLUTION = np.array([0.25, 0.25, 0.25, 0.25, 0.25, 0.25, 0.01, 1.0])
+
+# Canais do channels.json fora do MODEL: 1ª ordem em torno do próprio base, sem acoplamento.
+# Tipo -> (ruído de processo, ruído de medição, resolução, τ em s), na escala dos canais acima
+TYPE_NOISE = {
+    "temperature": (0.05, 0.1, 0.25, 90.0),
+    "pressure":    (0.005, 0.01, 0.01, 5.0),
+    "velocity":    (3.0, 2.0, 1.0, 30.0),
+}
+
+
+class PlantSimulator:
+    """
+    units: número de plantas virtuais; seed: semente (mesma semente = mesma série)
+    base: dict nome -> valor base (padrão: MODEL); noise_scale multiplica todos os ruídos
+    """
+
+    def __init__(self, units=1, seed=None, base=None, noise_scale=1.0,
+                 drift_sigma=1.5, drift_tau=1800.0, dropout_mtbf=3600.0, dropout_mttr=8.0):
+        self.units = units
+        self.rng = np.random.default_rng(seed)
+        self.noise_scale = noise_scale
+        self.drift_sigma = drift_sigma
+        self.drift_tau = drift_tau
+        self.dropout_mtbf = dropout_mtbf
+        self.dropout_mttr = dropout_mttr
+
+        n = len(MODEL)
+        self.base = np.array([m[2] for m in MODEL], dtype=float)
+        if base:
+            for name, value in base.items():
+                self.set_base(name, value)
+        # Ponto de operação nominal: o acoplamento propaga desvios em relação a ele, então
+        # mudar o base do Forno (set_base) também leva Gases/Tanque/Torres a novos patamares
+        self.nominal = self.base.copy()
+        self.tau = np.array([m[3] for m in MODEL])
+        self.upstream = np.array([SENSOR_NAMES.index(m[4]) if m[4] else -1 for m in MODEL])
+        self.gain = np.array([m[5] for m in MODEL])
+
+        self.state = np.tile(self.base, (units, 1))
+        self.drift = np.zeros(units)
+        self.dropped = np.zeros((units, n), dtype=bool)
+        self.t = 0.0
+
+    def set_base(self, name, value):
+        """Muda o base de um sensor do MODEL; retorna False (sem efeito) para outros nomes"""
+        if name not in SENSOR_NAMES:
+            return False
+        self.base[SENSOR_NAMES.index(name)] = value
+        return True
+
+    def _targets(self):
+        target = np.tile(self.base, (self.units, 1))
+        target[:, 0] += self.drift
+        # Cada nó persegue o seu base + desvio atual do nó a montante (atraso em cadeia)
+        coupled = self.upstream >= 0
+        up = self.upstream[coupled]
+        target[:, coupled] += self.gain[coupled] * (self.state[:, up] - self.nominal[up])
+        return target
+
+    def step(self, dt=1.0):
+        """Avança dt segundos; retorna as leituras (units x sensores), NaN nos sensores em queda"""
+        rng = self.rng
+        # Deriva do forno: Ornstein-Uhlenbeck (random walk que volta devagar ao setpoint)
+        a = np.exp(-dt / self.drift_tau)
+        self.drift = self.drift * a + self.drift_sigma * np.sqrt(1 - a * a) * rng.standard_normal(self.units)
+
+        # Atraso de 1ª ordem, discretização exata (estável para qualquer dt)
+        alpha = 1.0 - np.exp(-dt / self.tau)
+        self.state += alpha * (self._targets() - self.state)
+        self.state += self.noise_scale * PROCESS_NOISE * np.sqrt(dt) * rng.standard_normal(self.state.shape)
+        self.state[:, 6] = np.maximum(self.state[:, 6], 0.0)
+        self.state[:, 7] = np.maximum(self.state[:, 7], 0.0)
+
+        # Quedas: processo liga/desliga com tempos médios mtbf/mttr
+        u = rng.random(self.dropped.shape)
+        start = ~self.dropped & (u < dt / self.dropout_mtbf) if self.dropout_mtbf else False
+        end = self.dropped & (u < dt / self.dropout_mttr)
+        self.dropped = (self.dropped | start) & ~end
+        self.t += dt
+
+        reading = self.state + self.noise_scale * MEASUREMENT_NOISE * rng.standard_normal(self.state.shape)
+        reading = np.round(reading / RESOLUTION) * RESOLUTION
+        reading[self.dropped] = np.nan
+        return reading
+
+    def run(self, steps, dt=1.0):
+        """steps passos de dt segundos -> array (steps x units x sensores)"""
+        out = np.empty((steps, self.units, len(MODEL)))
+        for i in range(steps):
+            out[i] = self.step(dt)
+        return out
+
+
+class LiveSimulator:
+    """
+    Adaptador para o dashboard: uma unidade, avançada pelo relógio real a cada ciclo.
+    Nomes de `base` fora do MODEL (canais novos no channels.json) são simulados à parte com
+    o ruído do tipo (`types`: nome -> tipo; padrão temperature), com gerador próprio: as séries
+    do MODEL para uma semente não mudam quando um canal é acrescentado.
+    """
+
+    def __init__(self, base, seed=None, noise_scale=1.0, max_dt=5.0, types=None):
+        self.sim = PlantSimulator(units=1, seed=seed, base=base, noise_scale=noise_scale)
+        self.max_dt = max_dt
+        self.values = {}
+        self._last = None
+
+        self.types = dict(zip(SENSOR_NAMES, SENSOR_TYPES))
+        self.extra = [name for name in (base or {}) if name not in self.types]
+        for name in self.extra:
+            self.types[name] = (types or {}).get(name, "temperature")
+        params = np.array([TYPE_NOISE[self.types[name]] for name in self.extra]).reshape(-1, 4)
+        self._process, self._measurement, self._resolution, self._tau = params.T
+        self._extra_base = np.array([base[name] for name in self.extra], dtype=float)
+        self._extra_state = self._extra_base.copy()
+        self._extra_dropped = np.zeros(len(self.extra), dtype=bool)
+        self._nonnegative = np.array([self.types[name] != "temperature" for name in self.extra], dtype=bool)
+        self._rng = np.random.default_rng(np.random.SeedSequence(seed).spawn(1)[0])
+
+    def _step_extra(self, dt):
+        """Avança os canais fora do MODEL (mesmo esquema do PlantSimulator.step, sem acoplamento)"""
+        sim, rng, n = self.sim, self._rng, len(self.extra)
+        alpha = 1.0 - np.exp(-dt / self._tau)
+        self._extra_state += alpha * (self._extra_base - self._extra_state)
+        self._extra_state += sim.noise_scale * self._process * np.sqrt(dt) * rng.standard_normal(n)
+        self._extra_state[self._nonnegative] = np.maximum(self._extra_state[self._nonnegative], 0.0)
+
+        u = rng.random(n)
+        start = ~self._extra_dropped & (u < dt / sim.dropout_mtbf) if sim.dropout_mtbf else False
+        end = self._extra_dropped & (u < dt / sim.dropout_mttr)
+        self._extra_dropped = (self._extra_dropped | start) & ~end
+
+        reading = self._extra_state + sim.noise_scale * self._measurement * rng.standard_normal(n)
+        reading = np.round(reading / self._resolution) * self._resolution
+        reading[self._extra_dropped] = np.nan
+        return reading
+
+    def advance(self, now):
+        if self._last is not None:
+            dt = min(self.max_dt, now - self._last)
+            if dt <= 0:
+                return
+            reading = self.sim.step(dt)[0]
+            extra = self._step_extra(dt)
+        else:
+            reading = self.sim.state[0]
+            extra = self._extra_state
+        self._last = now
+        self.values = {name: (None if np.isnan(v) else float(v))
+                       for name, v in zip(SENSOR_NAMES + self.extra, np.concatenate((reading, extra)))}
+
+    def read(self, name):
+        value = self.values.get(name)
+        if value is None:
+            return None
+        # Mesmo arredondamento das leituras do painel: °C com 1 casa, bar com 2, rpm inteiro
+        kind = self.types.get(name)
+        if kind == "velocity":
+            return int(value)
+        return round(value, 2 if kind == "pressure" else 1)
+
+
+# ============= CARGA SINTÉTICA =============
+def iter_readings(readings, t0, dt, rig_ids=None, mode="simulation"):
+    """Array (steps x units x sensores) -> tuplas no formato do storage (com rig_id no fim)"""
+    from sampling import format_timestamp
+    column = {"temperature": 0, "pressure": 1, "velocity": 2}
+    for i, frame in enumerate(readings):
+        ts = format_timestamp(t0 + i * dt)
+        for u, row in enumerate(frame):
+            rig = rig_ids[u] if rig_ids else None
+            for s, v in enumerate(row.tolist()):
+                if v != v:  # NaN: sensor em queda, sem linha
+                    continue
+                values = [None, None, None]
+                values[column[SENSOR_TYPES[s]]] = v
+                yield (ts, SENSOR_NAMES[s], values[0], values[1], values[2], SENSOR_TYPES[s], None, mode, rig)
+
+
+def main():
+    import sqlite3
+    import storage
+
+    ap = argparse.ArgumentParser(description="Gera carga sintética com o simulador vetorizado")
+    ap.add_argument("--units", type=int, default=10, help="Plantas virtuais (padrão: 10)")
+    ap.add_argument("--seconds", type=float, default=3600, help="Tempo simulado em segundos (padrão: 3600)")
+    ap.add_argument("--dt", type=float, default=1.0, help="Passo da simulação em segundos (padrão: 1)")
+    ap.add_argument("--seed", type=int, default=0, help="Semente (padrão: 0)")
+    ap.add_argument("--dst", default=storage.DATABASE_PATH, help="Banco de destino (padrão: sensor_data.db)")
+    ap.add_argument("--realtime", action="store_true", help="Um passo a cada dt segundos reais, terminando no horário atual")
+    ap.add_argument("--chunk", type=int, default=600, help="Passos gerados por lote (padrão: 600)")
+    args = ap.parse_args()
+
+    storage.init_database(args.dst)
+    conn = sqlite3.connect(args.dst)
+    sql = '''INSERT OR IGNORE INTO sensor_readings
+        (timestamp, sensor_name, temperature, pressure, velocity, sensor_type, pins, mode, rig_id)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)'''
+    sim = PlantSimulator(units=args.units, seed=args.seed)
+    rig_ids = [f"sim-{u:03d}" for u in range(args.units)] if args.units > 1 else None
+    steps = int(args.seconds / args.dt)
+    chunk = 1 if args.realtime else args.chunk
+    t0 = time.time() - (0 if args.realtime else steps * args.dt)
+
+    start = time.perf_counter()
+    written = gen_time = 0
+    try:
+        for first in range(0, steps, chunk):
+            n = min(chunk, steps - first)
+            g = time.perf_counter()
+            readings = sim.run(n, args.dt)
+            gen_time += time.perf_counter() - g
+            rows = list(iter_readings(readings, t0 + first * args.dt, args.dt, rig_ids))
+            with conn:
+                conn.executemany(sql, rows)
+            written += len(rows)
+            if args.realtime:
+                time.sleep(max(0.0, t0 + (first + 1) * args.dt - time.time()))
+    except KeyboardInterrupt:
+        pass
+    conn.close()
+    elapsed = time.perf_counter() - start
+    print(f"🧪 {written:,} leituras de {args.units} plantas em {elapsed:.2f}s "
+          f"({written / elapsed:,.0f}/s gravadas; simulação {written / max(gen_time, 1e-9):,.0f}/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,7 @@ let overviewChart = null;
 // Carregar gráfico de overview
 async function loadOverviewChart() {
     try {
-        const sensors = await fetchAPI('sensors');
+        const [sensors, channels] = await Promise.all([fetchAPI('sensors'), loadChannels()]);
         const ctx = document.getElementById('overview-chart');
         
         if (!ctx || sensors.length === 0) return;
@@ -16,32 +16,13 @@ async function loadOverviewChart() {
         const colors = ['#dc3545', '#007bff', '#28a745', '#ffc107'];
         
         for (let i = 0; i < Math.min(4, sensors.length); i++) {
-            const sensorData = await fetchAPI(`chart/${encodeURIComponent(sensors[i])}?hours=24`);
+            const series = await fetchSeries(`chart/${encodeURIComponent(sensors[i])}?hours=24`);
             
-            if (sensorData.length > 0) {
-                // Determinar qual valor usar baseado no tipo de sensor
-                let dataPoints = [];
-                let label = sensors[i];
-                
-                if (sensors[i].includes('Temp') || sensors[i].includes('Torre')) {
-                    dataPoints = sensorData.map(d => ({
-                        x: new Date(d.timestamp).getTime(),
-                        y: d.temperature
-                    })).filter(d => d.y !== null && !isNaN(d.x));
-                    label += ' (°C)';
-                } else if (sensors[i].includes('Pressão')) {
-                    dataPoints = sensorData.map(d => ({
-                        x: new Date(d.timestamp).getTime(),
-                        y: d.pressure
-                    })).filter(d => d.y !== null && !isNaN(d.x));
-                    label += ' (bar)';
-                } else if (sensors[i].includes('Velocidade')) {
-                    dataPoints = sensorData.map(d => ({
-                        x: new Date(d.timestamp).getTime(),
-                        y: d.velocity
-                    })).filter(d => d.y !== null && !isNaN(d.x));
-                    label += ' (rpm)';
-                }
+            if (series.n > 0) {
+                // Coluna e unidade vêm do registro de canais (o tipo é o nome da coluna)
+                const channel = channels[sensors[i]];
+                const dataPoints = channel ? seriesPoints(series, channel.type) : [];
+                const label = channel ? `${sensors[i]} (${channel.unit})` : sensors[i];
                 
                 if (dataPoints.length > 0) {
                     datasets.push({
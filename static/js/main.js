@@ -106,12 +106,16 @@ function showToast(message, type = 'info') {
     }, 5000);
 }
 
-// API Calls
-async function fetchAPI(endpoint) {
+// API Calls (accept: tipo de resposta desejado, ex.: WIRE_MIME.columnar de wire.js)
+async function fetchAPI(endpoint, accept = 'application/json') {
     try {
-        const response = await fetch(`${API_BASE}/api/${endpoint}`);
+        const response = await fetch(`${API_BASE}/api/${endpoint}`, {
+            headers: { Accept: accept }
+        });
         if (!response.ok) {
-            throw new Error(`HTTP error! status: ${response.status}`);
+            // Filtros inválidos (400) e consultas caras demais (422) trazem a explicação em "error"
+            const body = await response.json().catch(() => ({}));
+            throw new Error(body.error || `HTTP error! status: ${response.status}`);
         }
         return await response.json();
     } catch (error) {
@@ -121,6 +125,23 @@ async function fetchAPI(endpoint) {
     }
 }
 
+// Registro de canais (/api/channels): tipo e unidade de cada sensor, buscado uma vez por página
+let channelsPromise = null;
+
+async function loadChannels() {
+    if (!channelsPromise) {
+        channelsPromise = fetchAPI('channels').then(list => {
+            const byName = {};
+            list.forEach(ch => { byName[ch.name] = ch; });
+            return byName;
+        }).catch(error => {
+            channelsPromise = null;
+            throw error;
+        });
+    }
+    return channelsPromise;
+}
+
 // Carregar lista de sensores no dropdown
 async function loadSensorsDropdown() {
     try {
@@ -156,7 +177,9 @@ async function loadData(page = 1, filters = {}) {
             ...filters
         });
         
-        const data = await fetchAPI(`data?${params}`);
+        // Formato colunar: payload bem menor que a lista de objetos (ver wire.js)
+        const data = await fetchAPI(`data?${params}`, WIRE_MIME.columnar);
+        data.data = decodeColumnarRows(data.data);
         
         // Atualizar tabela
         updateDataTable(data.data);
@@ -182,6 +205,17 @@ async function loadData(page = 1, filters = {}) {
     }
 }
 
+// Qualidade da leitura (ver sensor_health.py): só marca o que não é leitura boa
+function qualityBadge(quality) {
+    if (quality === 'stale') {
+        return '<span class="badge bg-warning text-dark" title="Falha passageira: último valor bom repetido">repetido</span>';
+    }
+    if (quality === 'fault') {
+        return '<span class="badge bg-danger" title="Sensor em falha">falha</span>';
+    }
+    return '';
+}
+
 // Atualizar tabela de dados
 function updateDataTable(data) {
     const tbody = document.getElementById('data-table');
@@ -224,6 +258,7 @@ function updateDataTable(data) {
                 <span class="badge ${row.mode === 'rpi' ? 'bg-success' : 'bg-warning'}">
                     ${row.mode === 'rpi' ? 'Hardware' : 'Simulação'}
                 </span>
+                ${qualityBadge(row.quality)}
             </td>
             <td>
                 <button class="btn btn-sm btn-outline-info" onclick="showRowDetails(${row.id})">
@@ -332,13 +367,22 @@ document.addEventListener('DOMContentLoaded', function() {
             e.preventDefault();
             
             const filters = {};
-            const sensor = document.getElementById('sensor-filter').value;
+            const sensors = Array.from(document.getElementById('sensor-filter').selectedOptions, o => o.value);
             const startDate = document.getElementById('start-date').value;
             const endDate = document.getElementById('end-date').value;
+            const type = document.getElementById('type-filter').value;
+            const mode = document.getElementById('mode-filter').value;
+            const minValue = document.getElementById('min-value').value;
+            const maxValue = document.getElementById('max-value').value;
             
-            if (sensor) filters.sensor = sensor;
+            // Vários sensores vão separados por vírgula (o servidor aceita as duas formas)
+            if (sensors.length) filters.sensor = sensors.join(',');
             if (startDate) filters.start_date = startDate;
             if (endDate) filters.end_date = endDate;
+            if (type) filters.type = type;
+            if (mode) filters.mode = mode;
+            if (minValue !== '') filters.min = minValue;
+            if (maxValue !== '') filters.max = maxValue;
             
             loadData(1, filters);
         });
@@ -348,9 +392,10 @@ document.addEventListener('DOMContentLoaded', function() {
     const clearFiltersBtn = document.getElementById('clear-filters');
     if (clearFiltersBtn) {
         clearFiltersBtn.addEventListener('click', function() {
-            document.getElementById('sensor-filter').value = '';
-            document.getElementById('start-date').value = '';
-            document.getElementById('end-date').value = '';
+            Array.from(document.getElementById('sensor-filter').options).forEach(o => { o.selected = false; });
+            ['start-date', 'end-date', 'type-filter', 'mode-filter', 'min-value', 'max-value'].forEach(id => {
+                document.getElementById(id).value = '';
+            });
             loadData(1, {});
         });
     }
@@ -11,7 +11,9 @@ async function loadSensorData(hours = 24, forceUpdate = false) {
     try {
         // Limitar dados para evitar sobrecarga
         const maxDataPoints = 500;
-        const data = await fetchAPI(`chart/${encodeURIComponent(sensorName)}?hours=${hours}&limit=${maxDataPoints}`);
+        // Série binária (Float32Array), convertida nas linhas usadas pelos gráficos
+        const series = await fetchSeries(`chart/${encodeURIComponent(sensorName)}?hours=${hours}&limit=${maxDataPoints}`);
+        const data = seriesRows(series);
         
         // Verificar se há novos dados (evitar atualização desnecessária)
         if (!forceUpdate && data.length === lastDataCount) {
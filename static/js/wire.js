@@ -0,0 +1,186 @@
+// TempPi Dashboard - Formatos compactos das APIs (ver wire.py)
+// binary:   séries de /api/chart direto em Int32Array/Float32Array ('TPS2': tempos absolutos em Float64Array),
+//           em quadros concatenados (um por lote)
+// columnar: JSON colunar de /api/chart e /api/data
+
+const WIRE_MIME = {
+    columnar: 'application/vnd.temppi.columnar+json',
+    binary: 'application/vnd.temppi.series'
+};
+
+// Um quadro binário a partir de `start` (alinhado em 8 bytes) -> { n, t, columns, end }
+function decodeFrame(buffer, start) {
+    const view = new DataView(buffer);
+    const magic = String.fromCharCode(view.getUint8(start), view.getUint8(start + 1),
+                                      view.getUint8(start + 2), view.getUint8(start + 3));
+    if (magic !== 'TPS1' && magic !== 'TPS2') {
+        throw new Error('Formato binário desconhecido');
+    }
+    // TPS2: algum intervalo não cabe em Int32 (buraco de mais de ~24,8 dias)
+    const wide = magic === 'TPS2';
+    const n = view.getUint32(start + 4, true);
+    const t0 = view.getFloat64(start + 8, true);
+    const ncols = view.getUint32(start + 16, true);
+    let offset = start + 20;
+    const names = [];
+    const decoder = new TextDecoder();
+    for (let i = 0; i < ncols; i++) {
+        const len = view.getUint8(offset);
+        names.push(decoder.decode(new Uint8Array(buffer, offset + 1, len)));
+        offset += 1 + len;
+    }
+    const align = wide ? 8 : 4;
+    offset += (align - offset % align) % align;
+
+    let t;
+    if (wide) {
+        t = new Float64Array(buffer, offset, n);
+        offset += 8 * n;
+    } else {
+        const deltas = new Int32Array(buffer, offset, n);
+        offset += 4 * n;
+        t = new Float64Array(n);
+        let acc = t0;
+        for (let i = 0; i < n; i++) {
+            acc += deltas[i];
+            t[i] = acc;
+        }
+    }
+    const columns = {};
+    names.forEach(name => {
+        columns[name] = new Float32Array(buffer, offset, n);
+        offset += 4 * n;
+    });
+    return { n, t, columns, end: offset + (8 - offset % 8) % 8 };
+}
+
+// Série binária (quadros concatenados, um por lote do servidor) ->
+// { n, t: Float64Array (ms), columns: { nome: Float32Array (NaN = nulo) } }
+function decodeSeries(buffer) {
+    const parts = [];
+    let offset = 0;
+    do {
+        const frame = decodeFrame(buffer, offset);
+        parts.push(frame);
+        offset = frame.end;
+    } while (offset < buffer.byteLength);
+    return mergeSeries(parts);
+}
+
+// Blocos consecutivos de uma série -> uma série; coluna ausente num bloco vira NaN
+function mergeSeries(parts) {
+    if (parts.length === 1) {
+        return { n: parts[0].n, t: parts[0].t, columns: parts[0].columns };
+    }
+    const n = parts.reduce((sum, part) => sum + part.n, 0);
+    const t = new Float64Array(n);
+    const columns = {};
+    parts.forEach(part => Object.keys(part.columns).forEach(name => {
+        if (!columns[name]) columns[name] = new Float32Array(n).fill(NaN);
+    }));
+    let at = 0;
+    parts.forEach(part => {
+        t.set(part.t, at);
+        Object.entries(columns).forEach(([name, values]) => {
+            if (part.columns[name]) values.set(part.columns[name], at);
+        });
+        at += part.n;
+    });
+    return { n, t, columns };
+}
+
+// Bloco colunar JSON ({n, t0, t, columns}) -> mesmo formato de decodeSeries
+function decodeColumnarChunk(chunk) {
+    const t = new Float64Array(chunk.n);
+    let acc = chunk.t0;
+    for (let i = 0; i < chunk.n; i++) {
+        acc += chunk.t[i];
+        t[i] = acc;
+    }
+    const columns = {};
+    Object.entries(chunk.columns).forEach(([name, values]) => {
+        columns[name] = Float32Array.from(values, v => (v === null ? NaN : v));
+    });
+    return { n: chunk.n, t, columns };
+}
+
+// Série colunar JSON (blocos em `chunks`, um por lote do servidor) -> mesmo formato de decodeSeries
+function decodeColumnarSeries(payload) {
+    if (!payload.chunks) {
+        return decodeColumnarChunk(payload);
+    }
+    if (!payload.chunks.length) {
+        return { n: 0, t: new Float64Array(0), columns: {} };
+    }
+    return mergeSeries(payload.chunks.map(decodeColumnarChunk));
+}
+
+// Série -> pontos {x, y} do Chart.js (nulos removidos)
+function seriesPoints(series, field) {
+    const values = series.columns[field];
+    const points = [];
+    if (!values) return points;
+    for (let i = 0; i < series.n; i++) {
+        if (!isNaN(values[i])) {
+            points.push({ x: series.t[i], y: values[i] });
+        }
+    }
+    return points;
+}
+
+// Série -> linhas no formato antigo ({timestamp (ms), temperature, pressure, velocity})
+function seriesRows(series) {
+    const rows = new Array(series.n);
+    for (let i = 0; i < series.n; i++) {
+        const row = { timestamp: series.t[i], temperature: null, pressure: null, velocity: null };
+        Object.entries(series.columns).forEach(([name, values]) => {
+            if (!isNaN(values[i])) row[name] = values[i];
+        });
+        rows[i] = row;
+    }
+    return rows;
+}
+
+// Dados colunares de /api/data -> linhas no formato antigo (timestamp em ms)
+function decodeColumnarRows(payload) {
+    const rows = new Array(payload.n);
+    let id = payload.id0;
+    let t = payload.t0;
+    for (let i = 0; i < payload.n; i++) {
+        id += payload.id[i];
+        t += payload.t[i];
+        const row = {
+            id: id,
+            timestamp: t,
+            temperature: null,
+            pressure: null,
+            velocity: null
+        };
+        ['sensor_name', 'sensor_type', 'pins', 'mode', 'rig_id', 'quality', 'channel_id'].forEach(name => {
+            const col = payload[name];
+            row[name] = col.dict[col.idx[i]];
+        });
+        if (payload.field[i] >= 0) {
+            row[payload.fields[payload.field[i]]] = payload.value[i];
+        }
+        rows[i] = row;
+    }
+    return rows;
+}
+
+// Busca uma série de /api/chart no formato binário
+async function fetchSeries(endpoint) {
+    try {
+        const response = await fetch(`${API_BASE}/api/${endpoint}`, {
+            headers: { Accept: WIRE_MIME.binary }
+        });
+        if (!response.ok) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+        return decodeSeries(await response.arrayBuffer());
+    } catch (error) {
+        console.error('API Error:', error);
+        showToast(`Erro na API: ${error.message}`, 'danger');
+        throw error;
+    }
+}
@@ -0,0 +1,227 @@
+# storage.py
+# Gravação das leituras no banco SQLite (compartilhado pelo dashboard, benchmarks e ferramentas).
+
+import queue
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+from channels import default_registry
+from metrics import REGISTRY
+
+DATABASE_PATH = "sensor_data.db"
+
+def init_database(path=None):
+    """Inicializa banco de dados SQLite para logging dos sensores (path=None usa DATABASE_PATH)"""
+    path = path or DATABASE_PATH
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    
+    # Criar tabela de leituras dos sensores
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sensor_readings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            sensor_name TEXT NOT NULL,
+            temperature REAL,
+            pressure REAL,
+            velocity REAL,
+            sensor_type TEXT NOT NULL,
+            pins TEXT,
+            mode TEXT DEFAULT 'simulation'
+        )
+    ''')
+    
+    # Índices para melhor performance
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_timestamp ON sensor_readings(timestamp)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_sensor_name ON sensor_readings(sensor_name)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_sensor_type ON sensor_readings(sensor_type)')
+    
+    migrate_schema(conn)
+    conn.commit()
+    conn.close()
+    print(f"📊 Banco de dados inicializado: {path}")
+
+def migrate_schema(conn):
+    """Migrações aditivas para bancos criados por versões anteriores"""
+    migrate_rig_schema(conn)
+    migrate_quality_schema(conn)
+    migrate_channel_schema(conn)
+    migrate_index_schema(conn)
+
+def migrate_rig_schema(conn):
+    """
+    Dimensão de planta (rig) para o servidor central:
+      - coluna rig_id (NULL nas leituras locais do próprio Pi)
+      - índice único parcial (rig_id, sensor_name, timestamp) só para linhas recebidas,
+        que deduplica os envios e atende as consultas por planta sem pesar nas locais
+      - tabela rigs com o resumo de cada planta (evita varrer sensor_readings)
+    """
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(sensor_readings)")]
+    if "rig_id" not in columns:
+        conn.execute("ALTER TABLE sensor_readings ADD COLUMN rig_id TEXT")
+    conn.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_rig_sensor_ts
+        ON sensor_readings(rig_id, sensor_name, timestamp) WHERE rig_id IS NOT NULL
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS rigs (
+            rig_id TEXT PRIMARY KEY,
+            first_seen TEXT,
+            last_seen TEXT,
+            last_reading TEXT,
+            total_rows INTEGER DEFAULT 0
+        )
+    ''')
+
+def migrate_quality_schema(conn):
+    """
+    Coluna quality (good/stale/fault, ver sensor_health.py). Linhas antigas ficam 'good':
+    até aqui só leituras válidas (ou simuladas) eram gravadas.
+    """
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(sensor_readings)")]
+    if "quality" not in columns:
+        conn.execute("ALTER TABLE sensor_readings ADD COLUMN quality TEXT DEFAULT 'good'")
+
+def migrate_channel_schema(conn):
+    """
+    Coluna channel_id (id inteiro do canal em channels.json). Ao criar a coluna, as linhas
+    antigas recebem o id pelo nome, uma vez, usando o idx_sensor_name.
+    """
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(sensor_readings)")]
+    if "channel_id" not in columns:
+        conn.execute("ALTER TABLE sensor_readings ADD COLUMN channel_id INTEGER")
+        for ch in default_registry():
+            conn.execute("UPDATE sensor_readings SET channel_id = ? WHERE sensor_name = ?", (ch.id, ch.name))
+
+def migrate_index_schema(conn):
+    """
+    Índice composto (sensor_name, timestamp): filtros por sensor + período (/api/data, /api/chart)
+    viram uma busca de intervalo por sensor em vez de varrer todas as linhas do sensor.
+    O idx_sensor_name continua: o MAX(id) por sensor (ETag do servidor) depende da ordem do id nele.
+    """
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_sensor_ts ON sensor_readings(sensor_name, timestamp)')
+
+INSERT_SQL = '''
+    INSERT INTO sensor_readings 
+    (timestamp, sensor_name, temperature, pressure, velocity, sensor_type, pins, mode, quality, channel_id)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+DB_WRITE = REGISTRY.histogram("temppi_db_write_seconds", "Duração de cada gravação no banco (linha ou lote)")
+DB_ROWS = REGISTRY.counter("temppi_db_rows_written_total", "Leituras gravadas no banco")
+WRITER_QUEUE = REGISTRY.gauge("temppi_writer_queue_depth", "Leituras aguardando o gravador em segundo plano",
+                              function=lambda: _writer.depth() if _writer else 0)
+
+def reading_row(sensor_name, value, sensor_type, pins=None, mode="simulation", timestamp=None, quality="good",
+                channel_id=None):
+    """
+    Monta a tupla na ordem do INSERT_SQL (timestamp=None usa a hora UTC atual;
+    channel_id=None procura o canal pelo nome no registro padrão)
+    """
+    temperature = value if sensor_type == "temperature" else None
+    pressure = value if sensor_type == "pressure" else None
+    velocity = value if sensor_type == "velocity" else None
+    if timestamp is None:
+        timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    pins_str = str(pins) if pins else None
+    if channel_id is None:
+        channel_id = default_registry().id_of(sensor_name)
+    return (timestamp, sensor_name, temperature, pressure, velocity, sensor_type, pins_str, mode, quality, channel_id)
+
+def log_sensor_reading(sensor_name, value, sensor_type, pins=None, mode="simulation", timestamp=None,
+                       quality="good", channel_id=None):
+    """
+    Salva leitura do sensor no banco de dados (timestamp=None usa a hora UTC atual).
+    Com o gravador em segundo plano ativo (start_writer), apenas enfileira a leitura.
+    """
+    row = reading_row(sensor_name, value, sensor_type, pins, mode, timestamp, quality, channel_id)
+    if _writer is not None:
+        _writer.submit(row)
+        return
+    try:
+        with DB_WRITE.time():
+            conn = sqlite3.connect(DATABASE_PATH)
+            cursor = conn.cursor()
+            cursor.execute(INSERT_SQL, row)
+            conn.commit()
+            conn.close()
+        DB_ROWS.inc()
+    except Exception as e:
+        print(f"❌ Erro ao salvar no banco: {e}")
+
+# ============= GRAVADOR EM SEGUNDO PLANO =============
+class AsyncWriter:
+    """
+    Thread que grava as leituras enfileiradas em lotes (uma transação por lote),
+    tirando o custo do SQLite do loop de aquisição/UI.
+    """
+
+    def __init__(self, path, max_batch=500, flush_interval=0.5):
+        self.path = path
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def submit(self, row):
+        self.queue.put(row)
+
+    def depth(self):
+        return self.queue.qsize()
+
+    def _run(self):
+        conn = sqlite3.connect(self.path)
+        stopping = False
+        while not stopping:
+            try:
+                item = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch = []
+            while True:
+                if item is _STOP:
+                    stopping = True
+                else:
+                    batch.append(item)
+                if stopping or len(batch) >= self.max_batch:
+                    break
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            if not batch:
+                continue
+            try:
+                with DB_WRITE.time():
+                    conn.executemany(INSERT_SQL, batch)
+                    conn.commit()
+                DB_ROWS.inc(len(batch))
+            except Exception as e:
+                print(f"❌ Erro ao salvar no banco: {e}")
+        conn.close()
+
+    def stop(self, timeout=10.0):
+        """Grava o que falta na fila e encerra a thread"""
+        self.queue.put(_STOP)
+        self._thread.join(timeout)
+
+_STOP = object()
+_writer = None
+
+def start_writer(path=None, **kwargs):
+    """Ativa o gravador em segundo plano para log_sensor_reading"""
+    global _writer
+    if _writer is None:
+        _writer = AsyncWriter(path or DATABASE_PATH, **kwargs).start()
+    return _writer
+
+def stop_writer():
+    global _writer
+    if _writer is not None:
+        writer, _writer = _writer, None
+        writer.stop()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# storage_drain.py
+# Processo de gravação: lê os pontos ARCHIVE do anel em memória compartilhada (shm_ring.py)
+# e grava no SQLite em lotes, uma transação por lote. Fica fora do processo de aquisição,
+# então um banco lento (cartão SD, backup, consulta pesada do servidor) não atrasa a amostragem.
+#
+# O cursor fica no cabeçalho do anel e só avança depois do COMMIT: um gravador reiniciado
+# continua de onde o anterior parou (no pior caso regrava o último lote).
+#
+#   python3 storage_drain.py --ring temppi --db sensor_data.db
+
+import argparse
+import signal
+import sqlite3
+import time
+
+import storage
+from channels import load_channels
+from metrics import REGISTRY, serve_metrics
+from sampling import format_timestamp
+from shm_ring import ARCHIVE, RING_NAME, RingReader, SharedRing
+
+RING_BACKLOG = REGISTRY.gauge("temppi_ring_backlog", "Registros no anel ainda não gravados no banco",
+                              function=lambda: _ring.head() - _ring.drain_cursor() if _ring else 0)
+_ring = None
+
+
+class StorageDrain:
+    def __init__(self, ring, path, channels, max_batch=500, flush_interval=0.5):
+        self.ring = ring
+        self.path = path
+        self.channels = channels
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.reader = RingReader(ring, start=ring.drain_cursor())
+        self.conn = sqlite3.connect(path)
+
+    def rows(self, records):
+        rows = []
+        for r in records:
+            if r.kind != ARCHIVE:
+                continue
+            ch = self.channels.by_id.get(r.channel_id)
+            if ch is None:
+                continue  # canal removido do channels.json
+            rows.append(storage.reading_row(ch.name, r.value, ch.type, r.pins, r.mode,
+                                            timestamp=format_timestamp(r.t), quality=r.quality, channel_id=ch.id))
+        return rows
+
+    def drain_once(self):
+        """Grava um lote; retorna quantos registros do anel foram consumidos (0 = anel em dia)"""
+        cursor, dropped = self.reader.cursor, self.reader.dropped
+        records = self.reader.read(self.max_batch * 4)
+        rows = self.rows(records)
+        if rows:
+            try:
+                with storage.DB_WRITE.time():
+                    self.conn.executemany(storage.INSERT_SQL, rows)
+                    self.conn.commit()
+            except sqlite3.Error:
+                # Lote não gravado: volta o leitor para relê-lo na próxima tentativa
+                self.conn.rollback()
+                self.reader.cursor, self.reader.dropped = cursor, dropped
+                raise
+            storage.DB_ROWS.inc(len(rows))
+        if records or self.reader.dropped:
+            self.ring.set_drain_cursor(self.reader.cursor)
+        return len(records)
+
+    def run(self, should_stop):
+        while True:
+            stopping = should_stop()
+            try:
+                while self.drain_once():
+                    pass
+            except sqlite3.Error as e:
+                # Banco ocupado/travado: os registros continuam no anel, tenta de novo
+                print(f"❌ Erro ao salvar no banco: {e}")
+            if stopping:
+                break
+            time.sleep(self.flush_interval)
+        self.conn.close()
+
+
+def main():
+    global _ring
+    ap = argparse.ArgumentParser(description="Grava no SQLite as leituras publicadas no anel de memória compartilhada")
+    ap.add_argument("--ring", default=RING_NAME, help=f"Nome do anel (padrão: {RING_NAME})")
+    ap.add_argument("--db", default=storage.DATABASE_PATH, help="Banco SQLite (padrão: sensor_data.db)")
+    ap.add_argument("--channels", metavar="ARQUIVO", help="Registro de canais (padrão: channels.json)")
+    ap.add_argument("--batch", type=int, default=500, help="Linhas por transação (padrão: 500)")
+    ap.add_argument("--interval", type=float, default=0.5, help="Espera entre lotes em segundos (padrão: 0.5)")
+    ap.add_argument("--metrics-port", type=int, default=0, help="Expor métricas Prometheus nesta porta")
+    args = ap.parse_args()
+
+    stop = []
+    signal.signal(signal.SIGINT, lambda *_: stop.append(True))
+    signal.signal(signal.SIGTERM, lambda *_: stop.append(True))
+
+    # O anel é criado pela aquisição (ou pelo supervisor); espera ele aparecer
+    while not stop:
+        try:
+            _ring = SharedRing(args.ring)
+            break
+        except FileNotFoundError:
+            time.sleep(0.5)
+    if _ring is None:
+        return
+
+    storage.init_database(args.db)
+    if args.metrics_port:
+        serve_metrics(args.metrics_port)
+    drain = StorageDrain(_ring, args.db, load_channels(args.channels), args.batch, args.interval)
+    print(f"💾 Gravando o anel '{args.ring}' em {args.db} (a partir do registro {drain.reader.cursor})")
+    drain.run(lambda: bool(stop))
+    if drain.reader.dropped:
+        print(f"⚠️  {drain.reader.dropped} registros perdidos (anel sobrescrito antes da gravação)")
+    _ring.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# supervisor.py
+# Modo multiprocesso: cada papel em um processo próprio, ligados pelo anel em memória
+# compartilhada (shm_ring.py). Um frame lento ou um banco travado não atrasa mais a
+# amostragem (o GIL é por processo) e um Pi 4/5 usa todos os núcleos.
+#
+#   aquisição  dashboard.py --no-ui --publish-ring   GPIO/MAX6675, compressão, controle
+#   gravação   storage_drain.py                      anel -> SQLite em lotes
+#   painel     dashboard.py --ring-view              OpenCV (só com --img)
+#   servidor   sensor_server.py                      Flask; /api/live lê o anel (só com --server)
+#
+# O supervisor cria o anel, sobe os processos e reinicia quem cair, com espera
+# exponencial; os outros seguem rodando. Ctrl+C encerra a aquisição primeiro (o que a
+# compressão ainda guarda vai para o anel), depois a gravação esvazia o anel e termina.
+#
+#   python3 supervisor.py --use-rpi --img assets/base.jpeg --server
+
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+
+from shm_ring import CAPACITY, RING_NAME, SharedRing
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+MIN_BACKOFF = 1.0
+MAX_BACKOFF = 30.0
+STABLE_AFTER = 60.0  # processo vivo por mais que isso zera a espera de reinício
+STOP_TIMEOUT = 15.0
+
+
+class Child:
+    """Um processo supervisionado"""
+
+    def __init__(self, name, argv, cpus=None, env=None):
+        self.name = name
+        self.argv = argv
+        self.cpus = cpus
+        self.env = env
+        self.proc = None
+        self.started_at = 0.0
+        self.backoff = MIN_BACKOFF
+        self.restart_at = 0.0
+        self.restarts = 0
+
+    def start(self):
+        # Sessão própria: o Ctrl+C do terminal chega só ao supervisor, que encerra na ordem certa
+        self.proc = subprocess.Popen(self.argv, cwd=HERE, env=self.env, start_new_session=True)
+        self.started_at = time.monotonic()
+        if self.cpus and hasattr(os, "sched_setaffinity"):
+            try:
+                os.sched_setaffinity(self.proc.pid, self.cpus)
+            except OSError as e:
+                print(f"⚠️  {self.name}: afinidade de CPU não aplicada ({e})")
+        cpus = f" (CPUs {sorted(self.cpus)})" if self.cpus else ""
+        print(f"▶️  {self.name}: pid {self.proc.pid}{cpus}")
+
+    def poll(self, now):
+        """Reinicia o processo se ele saiu e a espera já venceu"""
+        if self.proc is not None:
+            code = self.proc.poll()
+            if code is None:
+                return
+            if now - self.started_at >= STABLE_AFTER:
+                self.backoff = MIN_BACKOFF
+            print(f"💥 {self.name} saiu (código {code}); reiniciando em {self.backoff:.0f}s")
+            self.proc = None
+            self.restart_at = now + self.backoff
+            self.backoff = min(self.backoff * 2, MAX_BACKOFF)
+            return
+        if now >= self.restart_at:
+            self.restarts += 1
+            self.start()
+
+    def stop(self, timeout=STOP_TIMEOUT):
+        """SIGINT (saída limpa do próprio processo); SIGKILL se não sair a tempo"""
+        if self.proc is None or self.proc.poll() is not None:
+            return
+        os.killpg(self.proc.pid, signal.SIGINT)  # o grupo todo (ex.: reloader do Flask e seu filho)
+        try:
+            self.proc.wait(timeout)
+        except subprocess.TimeoutExpired:
+            print(f"⚠️  {self.name} não saiu em {timeout:.0f}s; encerrando à força")
+            os.killpg(self.proc.pid, signal.SIGKILL)
+            self.proc.wait()
+
+
+def cpu_plan(count):
+    """
+    Núcleo exclusivo para a aquisição (o último) e os demais para gravação, painel e servidor.
+    Com um núcleo só não há o que separar.
+    """
+    if count < 2:
+        return None, None
+    return {count - 1}, set(range(count - 1))
+
+
+def build_children(args, extra):
+    python = sys.executable
+    channels = ["--channels", args.channels] if args.channels else []
+    acquisition_cpus, other_cpus = cpu_plan(os.cpu_count() or 1) if args.affinity else (None, None)
+    children = [
+        Child("aquisição", [python, "dashboard.py", "--no-ui", "--publish-ring", args.ring, *channels, *extra],
+              acquisition_cpus),
+        Child("gravação", [python, "storage_drain.py", "--ring", args.ring, "--db", args.db, *channels],
+              other_cpus),
+    ]
+    if args.img:
+        children.append(Child("painel", [python, "dashboard.py", "--ring-view", args.ring, "--img", args.img,
+                                         "--scale", str(args.scale), *channels], other_cpus))
+    if args.server:
+        env = dict(os.environ, TEMPPI_RING=args.ring, TEMPPI_DB=os.path.abspath(args.db))
+        children.append(Child("servidor", [python, "sensor_server.py"], other_cpus, env))
+    return children
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Sobe aquisição, gravação, painel e servidor em processos separados e reinicia quem cair",
+        epilog="Argumentos não reconhecidos vão para o processo de aquisição (ex.: --use-rpi --control).")
+    ap.add_argument("--ring", default=RING_NAME, help=f"Nome do anel em memória compartilhada (padrão: {RING_NAME})")
+    ap.add_argument("--capacity", type=int, default=CAPACITY, help=f"Registros no anel (padrão: {CAPACITY})")
+    ap.add_argument("--db", default="sensor_data.db", help="Banco SQLite (padrão: sensor_data.db)")
+    ap.add_argument("--channels", metavar="ARQUIVO", help="Registro de canais para todos os processos (padrão: channels.json)")
+    ap.add_argument("--img", help="Imagem de fundo do painel (sem ela o painel não é aberto)")
+    ap.add_argument("--scale", type=float, default=1.0, help="Escala da janela do painel (padrão: 1.0)")
+    ap.add_argument("--server", action="store_true", help="Subir também o sensor_server.py")
+    ap.add_argument("--no-affinity", dest="affinity", action="store_false",
+                    help="Não reservar um núcleo para a aquisição")
+    args, extra = ap.parse_known_args()
+
+    stopping = []
+    signal.signal(signal.SIGINT, lambda *_: stopping.append(True))
+    signal.signal(signal.SIGTERM, lambda *_: stopping.append(True))
+
+    ring = SharedRing(args.ring, args.capacity, create=True)
+    print(f"🧵 Anel '{args.ring}': {args.capacity} registros")
+    children = build_children(args, extra)
+    for child in children:
+        child.start()
+
+    try:
+        while not stopping:
+            now = time.monotonic()
+            for child in children:
+                child.poll(now)
+            time.sleep(0.5)
+    finally:
+        print("\n⏹️  Encerrando (aquisição, gravação, demais)...")
+        # Ordem importa: a aquisição publica o que falta, a gravação esvazia o anel
+        for child in children:
+            child.stop()
+        for child in children:
+            if child.restarts:
+                print(f"   {child.name}: {child.restarts} reinício(s)")
+        ring.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# sync_db.py
+# Replicação incremental do sensor_data.db para um nó de backup (arquivo local ou remoto).
+# Só as linhas com id maior que o último replicado são enviadas, em lotes comprimidos e
+# verificados por sha256. O destino grava o lote e o novo cursor na mesma transação, então
+# uma sincronização interrompida retoma exatamente de onde parou.
+# A leitura usa uma conexão somente-leitura, lote a lote, então o gravador do dashboard
+# espera no máximo a leitura de um lote. A tabela é só de inserção; alterações em linhas
+# antigas não são replicadas. A réplica mantém os ids da origem (é um espelho restaurável),
+# por isso cada destino aceita uma única origem.
+#
+# Uso:
+#   python sync_db.py push sensor_data.db /mnt/backup/sensor_data.db
+#   python sync_db.py push sensor_data.db --remote "ssh backup python3 /opt/temppi/sync_db.py serve /data/sensor_data.db"
+#   python sync_db.py push sensor_data.db /mnt/backup/sensor_data.db --interval 60   (contínuo)
+
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import time
+import zlib
+
+import storage
+
+BATCH_ROWS = 5000
+
+
+# ============= LOTES =============
+def pack_batch(columns, rows):
+    """Linhas -> (cabeçalho, payload comprimido); o sha256 cobre o payload"""
+    payload = zlib.compress(json.dumps({"columns": columns, "rows": rows},
+                                       separators=(",", ":")).encode(), 6)
+    header = {
+        "rows": len(rows),
+        "first_id": rows[0][0],
+        "last_id": rows[-1][0],
+        "size": len(payload),
+        "sha256": hashlib.sha256(payload).hexdigest(),
+    }
+    return header, payload
+
+
+def unpack_batch(header, payload):
+    """Verifica tamanho e sha256 antes de descomprimir; levanta ValueError se não bater"""
+    if len(payload) != header["size"]:
+        raise ValueError(f"tamanho do lote {len(payload)} != {header['size']}")
+    digest = hashlib.sha256(payload).hexdigest()
+    if digest != header["sha256"]:
+        raise ValueError(f"sha256 do lote não confere ({digest[:12]} != {header['sha256'][:12]})")
+    batch = json.loads(zlib.decompress(payload))
+    rows = batch["rows"]
+    if len(rows) != header["rows"] or rows[0][0] != header["first_id"] or rows[-1][0] != header["last_id"]:
+        raise ValueError("conteúdo do lote não confere com o cabeçalho")
+    return batch["columns"], rows
+
+
+# ============= ORIGEM =============
+class Source:
+    def __init__(self, path):
+        if not os.path.exists(path):
+            raise SystemExit(f"❌ Banco de origem não encontrado: {path}")
+        self.path = path
+        # Somente-leitura. O banco usa o journal padrão (rollback, não WAL): cada SELECT segura um
+        # lock compartilhado só enquanto lê o lote, e um COMMIT do gravador pode esperar esse tempo
+        self.conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        self.columns = [row[1] for row in self.conn.execute("PRAGMA table_info(sensor_readings)")]
+
+    def batches(self, after_id, batch_rows=BATCH_ROWS):
+        """Gera lotes (cabeçalho, payload) com id > after_id, em ordem de id"""
+        sql = f"SELECT {', '.join(self.columns)} FROM sensor_readings WHERE id > ? ORDER BY id LIMIT ?"
+        while True:
+            rows = self.conn.execute(sql, (after_id, batch_rows)).fetchall()
+            if not rows:
+                return
+            yield pack_batch(self.columns, [list(r) for r in rows])
+            after_id = rows[-1][0]
+
+    def max_id(self):
+        return self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM sensor_readings").fetchone()[0]
+
+
+# ============= DESTINO =============
+class LocalReplica:
+    """Aplica lotes num arquivo SQLite local (também é o que o modo 'serve' usa do outro lado)"""
+
+    def __init__(self, path, source_name):
+        self.source_name = source_name
+        if not os.path.exists(path):
+            # No modo serve o stdout é o canal do protocolo
+            with contextlib.redirect_stdout(sys.stderr):
+                storage.init_database(path)
+        self.conn = sqlite3.connect(path)
+        storage.migrate_schema(self.conn)
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS sync_state (
+                source TEXT PRIMARY KEY,
+                last_id INTEGER NOT NULL,
+                last_sha256 TEXT,
+                updated TEXT
+            )
+        ''')
+        self.conn.commit()
+        try:
+            self._check_single_source()
+        except ValueError:
+            self.conn.close()
+            raise
+
+    def _check_single_source(self):
+        """
+        As linhas entram com o id da origem: uma segunda origem no mesmo destino sobrescreveria
+        as linhas de mesmo id da primeira. Recusa destinos de outra origem ou já com leituras.
+        """
+        other = self.conn.execute("SELECT source FROM sync_state WHERE source != ? LIMIT 1",
+                                  (self.source_name,)).fetchone()
+        if other:
+            raise ValueError(f"destino já é réplica de '{other[0]}' (use outro arquivo, ou --name "
+                             f"com esse nome se for a mesma origem)")
+        if self.last_id() == 0 and self.conn.execute("SELECT 1 FROM sensor_readings LIMIT 1").fetchone():
+            raise ValueError("destino já tem leituras que não vieram desta origem")
+
+    def last_id(self):
+        row = self.conn.execute("SELECT last_id FROM sync_state WHERE source = ?",
+                                (self.source_name,)).fetchone()
+        return row[0] if row else 0
+
+    def apply(self, header, payload):
+        columns, rows = unpack_batch(header, payload)
+        if header["first_id"] <= self.last_id():
+            raise ValueError(f"lote fora de ordem: começa em {header['first_id']}, destino já em {self.last_id()}")
+        sql = (f"INSERT OR REPLACE INTO sensor_readings ({', '.join(columns)}) "
+               f"VALUES ({', '.join('?' * len(columns))})")
+        # Linhas e cursor na mesma transação: ou o lote inteiro entra, ou nada muda
+        with self.conn:
+            self.conn.executemany(sql, rows)
+            self.conn.execute('''
+                INSERT INTO sync_state (source, last_id, last_sha256, updated)
+                VALUES (?, ?, ?, datetime('now'))
+                ON CONFLICT(source) DO UPDATE SET
+                    last_id = excluded.last_id, last_sha256 = excluded.last_sha256, updated = excluded.updated
+            ''', (self.source_name, header["last_id"], header["sha256"]))
+        return header["last_id"]
+
+    def close(self):
+        self.conn.close()
+
+
+class PipeReplica:
+    """
+    Destino remoto: um processo `sync_db.py serve` (ex.: via ssh) falando pelo stdin/stdout.
+    Protocolo por linhas JSON: hello -> {"last_id"}; cada lote = linha de cabeçalho + payload
+    binário -> {"ok": last_id} ou {"error": ...}.
+    """
+
+    def __init__(self, command, source_name):
+        self.proc = subprocess.Popen(command, shell=True, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        self._send({"op": "hello", "source": source_name})
+        try:
+            self._last_id = self._recv()["last_id"]
+        except ValueError:
+            self.proc.stdin.close()
+            self.proc.wait(10)
+            raise
+
+    def _send(self, msg, payload=b""):
+        self.proc.stdin.write(json.dumps(msg).encode() + b"\n" + payload)
+        self.proc.stdin.flush()
+
+    def _recv(self):
+        line = self.proc.stdout.readline()
+        if not line:
+            raise ConnectionError(f"destino remoto encerrou (código {self.proc.poll()})")
+        msg = json.loads(line)
+        if "error" in msg:
+            raise ValueError(f"destino remoto: {msg['error']}")
+        return msg
+
+    def last_id(self):
+        return self._last_id
+
+    def apply(self, header, payload):
+        self._send(dict(header, op="batch"), payload)
+        self._last_id = self._recv()["ok"]
+        return self._last_id
+
+    def close(self):
+        with contextlib.suppress(OSError):
+            self._send({"op": "bye"})
+            self.proc.stdin.close()
+        self.proc.wait(10)
+
+
+def serve(path, stdin=None, stdout=None):
+    """Lado remoto do PipeReplica: aplica os lotes recebidos no arquivo `path`"""
+    stdin = stdin or sys.stdin.buffer
+    stdout = stdout or sys.stdout.buffer
+    replica = None
+
+    def reply(msg):
+        stdout.write(json.dumps(msg).encode() + b"\n")
+        stdout.flush()
+
+    for line in iter(stdin.readline, b""):
+        msg = json.loads(line)
+        op = msg.get("op")
+        if op == "hello":
+            try:
+                replica = LocalReplica(path, msg["source"])
+            except ValueError as e:
+                reply({"error": str(e)})
+                break
+            reply({"last_id": replica.last_id()})
+        elif op == "batch":
+            payload = stdin.read(msg["size"])
+            try:
+                reply({"ok": replica.apply(msg, payload)})
+            except (ValueError, sqlite3.Error) as e:
+                reply({"error": str(e)})
+        elif op == "bye":
+            break
+    if replica:
+        replica.close()
+
+
+# ============= SINCRONIZAÇÃO =============
+def push(source, replica, batch_rows=BATCH_ROWS, verbose=True):
+    """Envia tudo que falta; retorna (linhas, bytes comprimidos)"""
+    t0 = time.perf_counter()
+    start = replica.last_id()
+    rows = sent = 0
+    for header, payload in source.batches(start, batch_rows):
+        # Em caso de erro a exceção sobe e a próxima execução retoma do último lote confirmado
+        confirmed = replica.apply(header, payload)
+        if confirmed != header["last_id"]:
+            raise ValueError(f"destino confirmou id {confirmed}, esperado {header['last_id']}")
+        rows += header["rows"]
+        sent += header["size"]
+    if verbose:
+        end = replica.last_id()
+        print(f"🔁 {rows} linhas replicadas (ids {start + 1 if rows else start}..{end}), "
+              f"{sent / 1024:.1f} KiB em {time.perf_counter() - t0:.2f}s")
+    return rows, sent
+
+
+def default_source_name(path):
+    return f"{socket.gethostname()}:{os.path.abspath(path)}"
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Replicação incremental do banco de leituras")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("push", help="Envia as linhas novas da origem para o destino")
+    p.add_argument("source", help="Banco de origem (ex.: sensor_data.db)")
+    p.add_argument("dest", nargs="?", help="Banco de destino local")
+    p.add_argument("--remote", metavar="CMD", help="Comando que inicia 'sync_db.py serve DEST' no destino (ex.: via ssh)")
+    p.add_argument("--name", help="Nome da origem no destino (padrão: hostname:caminho)")
+    p.add_argument("--batch", type=int, default=BATCH_ROWS, help=f"Linhas por lote (padrão: {BATCH_ROWS})")
+    p.add_argument("--interval", type=float, default=0, help="Repetir a cada N segundos (padrão: executa uma vez)")
+
+    s = sub.add_parser("serve", help="Lado remoto: aplica lotes recebidos pelo stdin")
+    s.add_argument("dest", help="Banco de destino")
+
+    args = ap.parse_args()
+    if args.cmd == "serve":
+        serve(args.dest)
+        return
+    if bool(args.dest) == bool(args.remote):
+        ap.error("informe o destino local ou --remote (apenas um)")
+
+    name = args.name or default_source_name(args.source)
+    while True:
+        source = Source(args.source)
+        replica = None
+        try:
+            replica = PipeReplica(args.remote, name) if args.remote else LocalReplica(args.dest, name)
+            push(source, replica, args.batch)
+        except (ValueError, ConnectionError, sqlite3.Error, OSError) as e:
+            print(f"❌ Sincronização interrompida: {e} (será retomada do último lote confirmado)")
+            if not args.interval:
+                raise SystemExit(1)
+        finally:
+            if replica:
+                replica.close()
+            source.conn.close()
+        if not args.interval:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
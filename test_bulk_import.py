@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# Teste da carga em massa: CSV e banco de versão anterior, deduplicação (na carga e contra o
+# banco), linhas rejeitadas, índices reconstruídos e carga interrompida sem gravar nada
+
+import os
+import sqlite3
+import tempfile
+
+import bulk_import
+import storage
+from channels import default_registry
+from bulk_import import normalize_timestamp, run_import
+
+
+def write_csv(path, lines):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def old_database(path):
+    """Banco de uma versão anterior (sem quality, rig_id nem channel_id)"""
+    conn = sqlite3.connect(path)
+    conn.execute("""CREATE TABLE sensor_readings (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp DATETIME,
+                    sensor_name TEXT NOT NULL, temperature REAL, pressure REAL, velocity REAL,
+                    sensor_type TEXT NOT NULL, pins TEXT, mode TEXT)""")
+    rows = [(f"2024-05-01 10:{i // 60:02d}:{i % 60:02d}", "Temp Forno", 300.0 + i, None, None, "temperature",
+             "(11, 9, 10)", "rpi") for i in range(600)]
+    rows.append(("ontem", "Temp Forno", 1.0, None, None, "temperature", None, "rpi"))
+    conn.executemany("INSERT INTO sensor_readings (timestamp, sensor_name, temperature, pressure, velocity, "
+                     "sensor_type, pins, mode) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+
+
+def test_normalize_timestamp():
+    assert normalize_timestamp("2024-05-01 12:00:00") == "2024-05-01 12:00:00"
+    assert normalize_timestamp("2024-05-01T12:00:00.250Z") == "2024-05-01 12:00:00.250"
+    assert normalize_timestamp("2024-05-01T09:00:00-03:00") == "2024-05-01 12:00:00"
+    assert normalize_timestamp("1714564800") == "2024-05-01 12:00:00.000"
+    try:
+        normalize_timestamp("01/05/2024")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("timestamp inválido aceito")
+    print("  ✅ Timestamps ISO, com fuso e epoch convertidos para UTC no formato do banco")
+
+
+def test_import_and_dedup():
+    tmp = tempfile.mkdtemp()
+    db = os.path.join(tmp, "destino.db")
+    storage.init_database(db)
+    conn = sqlite3.connect(db)
+    # Uma leitura que o banco já tem
+    conn.execute(storage.INSERT_SQL, storage.reading_row("Temp Forno", 300.0, "temperature",
+                                                         timestamp="2024-05-01 10:00:00"))
+    conn.commit()
+    conn.close()
+
+    old = os.path.join(tmp, "sd_antigo.db")
+    old_database(old)
+    lab = os.path.join(tmp, "lab.csv")
+    write_csv(lab, [
+        "timestamp,sensor,value,quality",
+        "2024-05-01T10:00:01Z,Temp Forno,301,good",       # repetida do banco antigo
+        "2024-05-02T08:00:00Z,Pressão Gases,2.5,good",
+        "2024-05-02T08:00:00Z,Pressão Gases,2.5,good",    # repetida dentro do CSV
+        "2024-05-02T08:00:01Z,Velocidade,610,stale",
+        "2024-05-02T08:00:02Z,Sensor Novo,1,good",        # fora do registro e sem sensor_type
+        "2024-05-02T08:00:03Z,Velocidade,abc,good",
+    ])
+    stats, _ = run_import(db, [old, lab], verbose=False)
+    assert stats.read == 607 and stats.rejected == 3
+    assert stats.duplicates == 3 and stats.inserted == 601, vars(stats)
+
+    conn = sqlite3.connect(db)
+    assert conn.execute("SELECT COUNT(*) FROM sensor_readings").fetchone()[0] == 602
+    assert conn.execute("SELECT COUNT(*) FROM (SELECT 1 FROM sensor_readings "
+                        "GROUP BY sensor_name, timestamp HAVING COUNT(*) > 1)").fetchone()[0] == 0
+    reg = default_registry()
+    assert conn.execute("SELECT velocity, quality, mode, channel_id FROM sensor_readings "
+                        "WHERE sensor_name = 'Velocidade'").fetchone() == (610.0, "stale", "rpi",
+                                                                          reg.id_of("Velocidade"))
+    indexes = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' "
+                                          "AND tbl_name = 'sensor_readings' AND sql IS NOT NULL")}
+    assert {"idx_timestamp", "idx_sensor_name", "idx_sensor_type", "idx_sensor_ts", "idx_rig_sensor_ts"} <= indexes
+    conn.close()
+
+    # Segunda carga igual: nada novo
+    stats, _ = run_import(db, [old, lab], verbose=False)
+    assert stats.inserted == 0 and stats.duplicates == 604
+    print("  ✅ CSV + banco antigo: 601 novas, repetidas (na carga e no banco) e inválidas puladas, índices de volta")
+
+
+def test_rig_and_rollback():
+    tmp = tempfile.mkdtemp()
+    db = os.path.join(tmp, "central.db")
+    old = os.path.join(tmp, "sd.db")
+    old_database(old)
+    stats, _ = run_import(db, [old], rig="forno-02", verbose=False)
+    assert stats.inserted == 600
+    conn = sqlite3.connect(db)
+    assert conn.execute("SELECT rig_id, last_reading, total_rows FROM rigs").fetchone() == \
+        ("forno-02", "2024-05-01 10:09:59", 600)
+    conn.close()
+    # A mesma origem como outra planta não é duplicata
+    assert run_import(db, [old], rig="forno-03", verbose=False)[0].inserted == 600
+
+    # Falha no fim (depois da inserção e dos índices): a transação é desfeita e o banco fica como estava
+    lab = os.path.join(tmp, "lab.csv")
+    write_csv(lab, ["timestamp,sensor_name,value", "2024-06-01 00:00:00,Temp Forno,1"])
+    original, bulk_import.RIG_UPSERT_SQL = bulk_import.RIG_UPSERT_SQL, "INSERT INTO tabela_inexistente VALUES (?)"
+    try:
+        run_import(db, [lab], rig="forno-04", defer_indexes="always", verbose=False)
+    except sqlite3.OperationalError:
+        pass
+    else:
+        raise AssertionError("falha não propagada")
+    finally:
+        bulk_import.RIG_UPSERT_SQL = original
+    conn = sqlite3.connect(db)
+    assert conn.execute("SELECT COUNT(*) FROM sensor_readings").fetchone()[0] == 1200
+    assert conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE name = 'idx_sensor_ts'").fetchone()[0] == 1
+    conn.close()
+    print("  ✅ rig_id e resumo de plantas; carga interrompida não grava nada")
+
+
+if __name__ == "__main__":
+    print("🧪 Testando carga em massa...")
+    test_normalize_timestamp()
+    test_import_and_dedup()
+    test_rig_and_rollback()
+    print("🎉 Teste concluído!")
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# Teste do registro de canais: channels.json válido e coerente com o simulador,
+# erros de configuração, channel_id no banco e rota /api/channels
+
+import json
+import os
+import signal
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+import sensor_server
+import storage
+from channels import CHANNELS_PATH, load_channels, default_registry
+from simulator import SENSOR_NAMES, SENSOR_TYPES
+
+
+def test_registry():
+    reg = default_registry()
+    assert len(reg) == 8 and len({ch.id for ch in reg}) == 8
+    # O simulador modela os mesmos canais, com o mesmo tipo
+    assert sorted(reg.names) == sorted(SENSOR_NAMES)
+    for name, stype in zip(SENSOR_NAMES, SENSOR_TYPES):
+        assert reg.type_of(name) == stype, name
+    assert reg.type_of("Sensor de outra planta") == "unknown"
+    assert all(len(ch.pins) == 3 for ch in reg.of_hardware("max6675"))
+    print(f"  ✅ {len(reg)} canais, {len(reg.of_hardware('max6675'))} termopares")
+
+
+def test_invalid_config():
+    path = os.path.join(tempfile.mkdtemp(), "ch.json")
+    bad = [
+        {"channels": [{"id": 1, "name": "A", "type": "humidity", "unit": "%", "range": [0, 100]}]},
+        {"channels": [{"id": 1, "name": "A", "type": "pressure", "unit": "bar", "range": [0, 1]},
+                      {"id": 1, "name": "B", "type": "pressure", "unit": "bar", "range": [0, 1]}]},
+        {"channels": [{"id": 1, "name": "A", "type": "temperature", "unit": "°C", "range": [0, 1],
+                       "hardware": "max6675", "pins": [1, 2]}]},
+        {"channels": [{"id": 1, "name": "A", "type": "temperature", "unit": "°C", "range": [0, 1], "cor": "azul"}]},
+        {"canais": []},
+    ]
+    for config in bad:
+        with open(path, "w") as f:
+            json.dump(config, f)
+        try:
+            load_channels(path)
+        except ValueError:
+            continue
+        raise AssertionError(f"configuração inválida aceita: {config}")
+    print(f"  ✅ {len(bad)} configurações inválidas rejeitadas")
+
+
+def test_channel_id_column():
+    path = os.path.join(tempfile.mkdtemp(), "c.db")
+    conn = sqlite3.connect(path)
+    # Banco de versão anterior: linhas sem channel_id
+    conn.execute("""CREATE TABLE sensor_readings (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp DATETIME,
+                    sensor_name TEXT NOT NULL, temperature REAL, pressure REAL, velocity REAL,
+                    sensor_type TEXT NOT NULL, pins TEXT, mode TEXT)""")
+    conn.execute("INSERT INTO sensor_readings (timestamp, sensor_name, velocity, sensor_type) "
+                 "VALUES ('2024-01-01 00:00:00', 'Velocidade', 600, 'velocity')")
+    conn.commit()
+    conn.close()
+    storage.init_database(path)
+    conn = sqlite3.connect(path)
+    conn.execute(storage.INSERT_SQL, storage.reading_row("Temp Forno", 350.0, "temperature"))
+    conn.commit()
+    rows = conn.execute("SELECT sensor_name, channel_id FROM sensor_readings ORDER BY id").fetchall()
+    reg = default_registry()
+    assert rows == [("Velocidade", reg.id_of("Velocidade")), ("Temp Forno", reg.id_of("Temp Forno"))]
+
+    sensor_server.DATABASE_PATH = path
+    client = sensor_server.app.test_client()
+    channels = client.get("/api/channels").get_json()
+    assert [c["name"] for c in channels] == reg.names + [ch.name for ch in reg.derived]
+    assert client.get("/api/data").get_json()["data"][0]["channel_id"] == reg.id_of("Temp Forno")
+    print("  ✅ channel_id preenchido nas linhas antigas e novas; /api/channels ok")
+
+
+def test_dashboard_extra_channel():
+    """Canal novo só no channels.json: o dashboard parte, simula e grava o canal como 'good'"""
+    tmp = tempfile.mkdtemp()
+    with open(CHANNELS_PATH, encoding="utf-8") as f:
+        config = json.load(f)
+    config["channels"].append({"id": 9, "name": "Temp Condensador", "type": "temperature", "unit": "°C",
+                               "range": [0, 200], "period": 0.5, "tolerance": 0.0, "base": 45.0})
+    path = os.path.join(tmp, "ch.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(config, f)
+    proc = subprocess.Popen([sys.executable, os.path.join(os.path.dirname(CHANNELS_PATH), "dashboard.py"), "--no-ui", "--channels", path,
+                             "--sim-seed", "1", "--no-compression"],
+                            cwd=tmp, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    time.sleep(3)
+    proc.send_signal(signal.SIGTERM)
+    out = proc.communicate(timeout=30)[0]
+    assert proc.returncode == 0, out
+    conn = sqlite3.connect(os.path.join(tmp, "sensor_data.db"))
+    rows = conn.execute("SELECT temperature, quality, channel_id FROM sensor_readings "
+                        "WHERE sensor_name = 'Temp Condensador'").fetchall()
+    conn.close()
+    assert len(rows) >= 3 and all(q == "good" and cid == 9 and 30 < t < 60 for t, q, cid in rows), rows
+    print(f"  ✅ Dashboard com canal extra no registro: {len(rows)} leituras simuladas gravadas")
+
+
+if __name__ == "__main__":
+    print("🧪 Testando registro de canais...")
+    test_registry()
+    test_invalid_config()
+    test_channel_id_column()
+    test_dashboard_extra_channel()
+    print("🎉 Teste concluído!")
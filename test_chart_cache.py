@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# Teste do cache de séries por blocos: mesmo resultado da consulta direta, invalidação por
+# backfill, limite de memória e ganho numa janela de 24 h
+
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+import storage
+from chart_cache import ChartCache, CHART_SQL, TAIL_END, CACHE_MISSES
+
+NOW = datetime.now(timezone.utc)
+
+
+def ts(seconds_ago):
+    return (NOW - timedelta(seconds=seconds_ago)).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def make_db(hours=24):
+    path = os.path.join(tempfile.mkdtemp(), "cc.db")
+    storage.init_database(path)
+    conn = sqlite3.connect(path)
+    rows = [storage.reading_row("Temp Forno", 300.0 + (i % 500) / 10, "temperature", timestamp=ts(hours * 3600 - i))
+            for i in range(hours * 3600)]
+    rows += [storage.reading_row("Velocidade", 600 + i % 40, "velocity", timestamp=ts(hours * 3600 - i))
+             for i in range(0, hours * 3600, 10)]
+    conn.executemany(storage.INSERT_SQL, rows)
+    conn.commit()
+    return conn
+
+
+def direct(conn, sensor_name, start):
+    return conn.execute(CHART_SQL, (sensor_name, start, TAIL_END)).fetchall()
+
+
+def test_matches_direct_query():
+    conn = make_db(hours=6)
+    cache = ChartCache()
+    for start in (ts(6 * 3600), ts(3 * 3600 + 17), ts(60)):
+        assert cache.series(conn, "Temp Forno", start) == direct(conn, "Temp Forno", start)
+    n = len(cache)
+    assert cache.series(conn, "Temp Forno", ts(3 * 3600)) == direct(conn, "Temp Forno", ts(3 * 3600))
+    assert len(cache) == n  # nenhum bloco novo
+
+    # Backfill de uma leitura antiga (ex.: planta que reenviou dados) invalida só o bloco dela
+    conn.execute(storage.INSERT_SQL, storage.reading_row("Temp Forno", -1.0, "temperature", timestamp=ts(4 * 3600)))
+    conn.execute(storage.INSERT_SQL, storage.reading_row("Temp Forno", -2.0, "temperature"))
+    conn.commit()
+    start = ts(5 * 3600)
+    misses = CACHE_MISSES.labels().value
+    assert cache.series(conn, "Temp Forno", start) == direct(conn, "Temp Forno", start)
+    assert CACHE_MISSES.labels().value - misses == 1
+    print(f"  ✅ Igual à consulta direta; backfill invalidou 1 de {n} blocos")
+
+
+def test_memory_cap():
+    conn = make_db(hours=6)
+    cache = ChartCache(max_bytes=1024 * 1024)
+    start = ts(6 * 3600)
+    assert cache.series(conn, "Temp Forno", start) == direct(conn, "Temp Forno", start)
+    assert cache.bytes <= 1024 * 1024
+    print(f"  ✅ Limite de memória: {cache.bytes / 1024:.0f} KiB em {len(cache)} blocos")
+
+
+def test_sliding_window_speed():
+    conn = make_db(hours=24)
+    cache = ChartCache()
+    start = ts(24 * 3600)
+    cache.series(conn, "Temp Forno", start)
+
+    t0 = time.perf_counter()
+    for _ in range(5):
+        expected = direct(conn, "Temp Forno", start)
+    t_direct = (time.perf_counter() - t0) / 5
+    t0 = time.perf_counter()
+    for _ in range(5):
+        got = cache.series(conn, "Temp Forno", start)
+    t_cache = (time.perf_counter() - t0) / 5
+    assert got == expected
+    assert t_cache < t_direct
+    print(f"  ✅ Janela de 24 h ({len(got)} linhas): direta {t_direct * 1000:.0f} ms, com cache {t_cache * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    print("🧪 Testando cache de séries...")
+    test_matches_direct_query()
+    test_memory_cap()
+    test_sliding_window_speed()
+    print("🎉 Teste concluído!")
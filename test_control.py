@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# Teste do subsistema de controle usando o backend GPIO falso e relógio simulado
+
+from control import PID, TimeProportionalOutput, StepPulseGenerator, ControlScheduler, ProcessControl
+from gpio_backend import FakeGPIO
+
+PINS = {"ventilador": 14, "resistencia": 26, "motor_rosca": 12, "tambor_dir": 13, "tambor_pul": 19}
+
+
+class FakeClock:
+    """Relógio simulado: sleep apenas avança o tempo"""
+
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+    def sleep(self, dt):
+        self.t += dt
+
+
+def make_gpio(clock):
+    gpio = FakeGPIO(clock=clock)
+    gpio.setmode(gpio.BCM)
+    for pin in PINS.values():
+        gpio.setup(pin, gpio.OUT, initial=gpio.LOW)
+    return gpio
+
+
+def test_relay_duty():
+    """Relé com 25% de duty fica ligado 1/4 do tempo"""
+    clock = FakeClock()
+    gpio = make_gpio(clock)
+    relay = TimeProportionalOutput(gpio, PINS["resistencia"], window_s=2.0)
+    relay.set_duty(0.25)
+    while clock.t < 20.0:
+        relay.tick(clock.t)
+        clock.sleep(0.01)
+    on = gpio.high_time(PINS["resistencia"], until=clock.t)
+    assert abs(on - 5.0) < 0.1, on
+    print(f"  ✅ Relé: {on:.2f}s ligado em 20s (esperado 5s)")
+
+
+def test_step_pulses():
+    """60 rpm com 400 passos/volta = 400 pulsos por segundo"""
+    clock = FakeClock()
+    gpio = make_gpio(clock)
+    stepper = StepPulseGenerator(gpio, PINS["tambor_pul"], PINS["tambor_dir"], steps_per_rev=400)
+    stepper.set_rpm(60.0)
+    while clock.t < 5.0:
+        stepper.tick(clock.t)
+        clock.sleep(0.001)
+    assert abs(gpio.rising_edges(PINS["tambor_pul"]) - 2000) <= 1, gpio.rising_edges(PINS["tambor_pul"])
+    assert gpio.level(PINS["tambor_dir"]) == gpio.HIGH
+    print(f"  ✅ Tambor: {gpio.rising_edges(PINS['tambor_pul'])} pulsos em 5s")
+
+
+def test_step_burst_carry():
+    """Ticks atrasados pedem mais que max_burst: o excedente sai nos ticks seguintes"""
+    clock = FakeClock()
+    gpio = make_gpio(clock)
+    stepper = StepPulseGenerator(gpio, PINS["tambor_pul"], PINS["tambor_dir"], steps_per_rev=400, max_burst=10)
+    stepper.set_rpm(60.0)
+    while clock.t < 1.0:  # 20 passos devidos por tick, só 10 por tick
+        stepper.tick(clock.t)
+        clock.sleep(0.05)
+    behind = gpio.rising_edges(PINS["tambor_pul"])
+    assert behind <= 200, behind
+    while clock.t < 2.0:
+        stepper.tick(clock.t)
+        clock.sleep(0.001)
+    total = gpio.rising_edges(PINS["tambor_pul"])
+    assert abs(total - 800) <= 1 and stepper.pulses == total, total
+    print(f"  ✅ Tambor com ticks atrasados: {behind} pulsos em 1s, recupera para {total} em 2s")
+
+
+def test_pid_converges():
+    """PID leva uma planta térmica de primeira ordem ao setpoint"""
+    pid = PID(0.05, 0.002, 0.0, setpoint=350.0)
+    temp, dt = 25.0, 1.0
+    for _ in range(3000):
+        power = pid.update(temp, dt)
+        # planta: aquece até 600°C com potência total, perde calor para 25°C
+        temp += dt * ((25.0 + 575.0 * power) - temp) / 120.0
+    assert abs(temp - 350.0) < 1.0, temp
+    assert pid.update(None, dt) == 0.0
+    print(f"  ✅ PID: temperatura final {temp:.2f}°C (setpoint 350°C)")
+
+
+def test_scheduler_deadlines():
+    """Prazos absolutos: nenhum drift e overruns contados quando a tarefa atrasa"""
+    clock = FakeClock()
+    sched = ControlScheduler(clock=clock, sleep=clock.sleep)
+    runs = []
+    sched.add_task("rapida", 0.01, lambda now: runs.append(now))
+    sched.add_task("lenta", 0.5, lambda now: clock.sleep(0.03))
+    while clock.t < 10.0:
+        sched.run_pending()
+    stats = sched.stats()
+    assert abs(runs[-1] - 10.0) < 0.05
+    assert stats["lenta"]["runs"] in (20, 21)
+    assert stats["rapida"]["overruns"] > 0
+    print(f"  ✅ Escalonador: {stats['rapida']['runs']} ciclos rápidos, "
+          f"jitter máx {stats['rapida']['jitter_max_ms']:.1f} ms")
+
+
+def test_process_control_fail_safe():
+    """Sem leitura do forno a resistência fica desligada; stop deixa tudo em LOW"""
+    clock = FakeClock()
+    gpio = make_gpio(clock)
+    reading = {"Temp Forno": 300.0}
+    ctrl = ProcessControl(gpio, PINS, read_forno=lambda: reading.get("Temp Forno"), setpoint=350.0,
+                          tambor_rpm=30.0, clock=clock, sleep=clock.sleep)
+    while clock.t < 5.0:
+        ctrl.scheduler.run_pending()
+    assert ctrl.heater.duty > 0.0
+    reading.clear()
+    while clock.t < 10.0:
+        ctrl.scheduler.run_pending()
+    assert ctrl.heater.duty == 0.0
+    ctrl.set_output("ventilador", True)
+    ctrl.stop()
+    assert all(gpio.level(pin) == gpio.LOW for name, pin in PINS.items() if name != "tambor_dir")
+    print("  ✅ Controle: falha do sensor desliga a resistência")
+
+
+if __name__ == "__main__":
+    print("🧪 Testando subsistema de controle...")
+    test_relay_duty()
+    test_step_pulses()
+    test_step_burst_carry()
+    test_pid_converges()
+    test_scheduler_deadlines()
+    test_process_control_fail_safe()
+    print("🎉 Teste concluído!")
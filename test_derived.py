@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# Teste dos canais derivados: janelas incrementais iguais ao cálculo direto, EWMA com
+# amostragem irregular, diferença com entrada parada, validação do channels.json e
+# derivados gravados e servidos como os canais físicos
+
+import json
+import math
+import os
+import random
+import sqlite3
+import tempfile
+
+import sensor_server
+import storage
+from channels import load_channels, default_registry
+from derived import DerivedPipeline, Ewma, RollingWindow
+
+BASE = [
+    {"id": 1, "name": "A", "type": "temperature", "unit": "°C", "range": [0, 600]},
+    {"id": 2, "name": "B", "type": "temperature", "unit": "°C", "range": [0, 600]},
+]
+
+
+def registry(derived):
+    path = os.path.join(tempfile.mkdtemp(), "ch.json")
+    with open(path, "w") as f:
+        json.dump({"channels": BASE, "derived": derived}, f)
+    return load_channels(path)
+
+
+def test_rolling_matches_brute_force():
+    rng = random.Random(7)
+    window = RollingWindow(30.0)
+    history = []
+    t = 0.0
+    for _ in range(5000):
+        t += rng.choice((0.5, 1.0, 2.0, 45.0 if rng.random() < 0.01 else 1.0))  # com buracos
+        v = round(rng.gauss(300, 20), 2)
+        window.add(t, v)
+        history.append((t, v))
+        inside = [x for ts, x in history if ts >= t - 30.0]
+        assert window.min() == min(inside) and window.max() == max(inside)
+        assert math.isclose(window.mean(), sum(inside) / len(inside), rel_tol=1e-9)
+    assert len(window.samples) <= 61  # só a janela fica na memória
+    print("  ✅ mean/min/max incrementais = cálculo direto em 5000 amostras irregulares")
+
+
+def test_ewma_and_derivative():
+    # Mesma constante de tempo com períodos diferentes chega ao mesmo ponto
+    slow, fast = Ewma(10.0), Ewma(10.0)
+    slow.add(0.0, 0.0)
+    fast.add(0.0, 0.0)
+    for i in range(1, 11):
+        slow.add(i * 2.0, 100.0)
+    for i in range(1, 41):
+        fast.add(i * 0.5, 100.0)
+    assert math.isclose(slow.value, fast.value, rel_tol=1e-9)
+    assert math.isclose(slow.value, 100.0 * (1 - math.exp(-2.0)), rel_tol=1e-9)
+
+    reg = registry([{"id": 10, "name": "Taxa A", "type": "temperature", "unit": "°C/min", "range": [-30, 30],
+                     "function": "derivative", "inputs": ["A"], "window": 60, "scale": 60}])
+    pipeline = DerivedPipeline(reg)
+    rates = [pipeline.add("A", float(t), 300.0 + 0.05 * t) for t in range(120)]
+    # Sem meia janela de histórico não há taxa; depois, 0.05 °C/s = 3 °C/min
+    assert rates[10] == [] and all(r[0][1] == 3.0 for r in rates[30:])
+    print("  ✅ EWMA independente do período; derivada em °C/min após meia janela")
+
+
+def test_difference_and_cascade():
+    reg = registry([
+        {"id": 10, "name": "Delta", "type": "temperature", "unit": "°C", "range": [-100, 100],
+         "function": "difference", "inputs": ["A", "B"], "window": 10},
+        {"id": 11, "name": "Delta Máx", "type": "temperature", "unit": "°C", "range": [-100, 100],
+         "function": "max", "inputs": ["Delta"], "window": 60},
+    ])
+    pipeline = DerivedPipeline(reg)
+    assert pipeline.add("A", 0.0, 150.0) == []  # B ainda sem leitura
+    out = pipeline.add("B", 1.0, 100.0)
+    assert [(ch.name, v) for ch, v in out] == [("Delta", 50.0), ("Delta Máx", 50.0)]
+    out = pipeline.add("A", 2.0, 120.0)
+    assert [(ch.name, v) for ch, v in out] == [("Delta", 20.0), ("Delta Máx", 50.0)]
+    assert pipeline.add("A", 20.0, 130.0) == []  # B parou há mais que a janela
+    pipeline.add("B", 21.0, 100.0)
+    pipeline.invalidate("B")  # B em falha
+    assert pipeline.add("A", 22.0, 130.0) == []
+    print("  ✅ Diferença com idade máxima e falha; derivado de derivado em cascata")
+
+
+def test_invalid_config():
+    bad = [
+        {"id": 10, "name": "X", "type": "temperature", "unit": "°C", "range": [0, 1],
+         "function": "median", "inputs": ["A"], "window": 10},
+        {"id": 10, "name": "X", "type": "temperature", "unit": "°C", "range": [0, 1],
+         "function": "difference", "inputs": ["A"]},
+        {"id": 10, "name": "X", "type": "temperature", "unit": "°C", "range": [0, 1],
+         "function": "ewma", "inputs": ["C"], "window": 10},
+        {"id": 10, "name": "X", "type": "temperature", "unit": "°C", "range": [0, 1],
+         "function": "mean", "inputs": ["A"]},
+        {"id": 2, "name": "X", "type": "temperature", "unit": "°C", "range": [0, 1],
+         "function": "ewma", "inputs": ["A"], "window": 10},
+        {"id": 10, "name": "X", "type": "temperature", "unit": "°C", "range": [0, 1],
+         "function": "ewma", "inputs": ["X"], "window": 10},
+    ]
+    for entry in bad:
+        try:
+            registry([entry])
+        except ValueError:
+            continue
+        raise AssertionError(f"derivado inválido aceito: {entry}")
+    print(f"  ✅ {len(bad)} derivados inválidos rejeitados (função, entradas, janela, id, ciclo)")
+
+
+def test_stored_and_served():
+    reg = default_registry()
+    taxa = reg["Taxa Forno"]
+    path = os.path.join(tempfile.mkdtemp(), "d.db")
+    storage.init_database(path)
+    conn = sqlite3.connect(path)
+    pipeline = DerivedPipeline(reg)
+    rows = []
+    for i in range(120):
+        ts = f"2024-05-01 12:{i // 60:02d}:{i % 60:02d}"
+        for ch, value in pipeline.add("Temp Forno", float(i), 300.0 + 0.1 * i):
+            rows.append(storage.reading_row(ch.name, value, ch.type, timestamp=ts, channel_id=ch.id))
+    conn.executemany(storage.INSERT_SQL, rows)
+    conn.commit()
+    conn.close()
+
+    sensor_server.DATABASE_PATH = path
+    client = sensor_server.app.test_client()
+    channels = {c["name"]: c for c in client.get("/api/channels").get_json()}
+    assert channels["Taxa Forno"]["unit"] == "°C/min" and channels["Taxa Forno"]["inputs"] == ["Temp Forno"]
+    assert "Taxa Forno" in client.get("/api/sensors").get_json()
+    data = client.get("/api/data?sensor=Taxa Forno&min=5&per_page=200").get_json()
+    assert data["total"] == len(rows) and data["data"][0]["channel_id"] == taxa.id
+    assert all(r["temperature"] == 6.0 for r in data["data"])
+    print(f"  ✅ Taxa Forno gravada ({len(rows)} linhas) e servida por /api/channels, /api/sensors e /api/data")
+
+
+if __name__ == "__main__":
+    print("🧪 Testando canais derivados...")
+    test_rolling_matches_brute_force()
+    test_ewma_and_derivative()
+    test_difference_and_cascade()
+    test_invalid_config()
+    test_stored_and_served()
+    print("🎉 Teste concluído!")
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# Teste do cache HTTP: ETag pela marca d'água de escrita, 304 e cache longo em janelas históricas
+
+import os
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+import sensor_server
+import storage
+import wire
+
+
+def make_db():
+    path = os.path.join(tempfile.mkdtemp(), "c.db")
+    storage.init_database(path)
+    now = datetime.now(timezone.utc)
+    rows = [storage.reading_row(name, 300.0 + i, "temperature",
+                                timestamp=(now - timedelta(minutes=30 - i)).strftime("%Y-%m-%d %H:%M:%S"))
+            for i in range(20) for name in ("Temp Forno", "Temp Tanque")]
+    conn = sqlite3.connect(path)
+    conn.executemany(storage.INSERT_SQL, rows)
+    conn.commit()
+    conn.close()
+    return path
+
+
+def insert(path, sensor_name):
+    conn = sqlite3.connect(path)
+    conn.execute(storage.INSERT_SQL, storage.reading_row(sensor_name, 999.0, "temperature"))
+    conn.commit()
+    conn.close()
+
+
+def test_chart_revalidation():
+    sensor_server.WINDOW_GRANULARITY = 3600  # evita virar o degrau da janela no meio do teste
+    path = sensor_server.DATABASE_PATH = make_db()
+    client = sensor_server.app.test_client()
+    url = "/api/chart/Temp Forno?hours=1"
+
+    first = client.get(url, headers={"Accept": wire.BINARY_MIME})
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and first.headers["Cache-Control"] == "no-cache"
+    assert "Accept" in first.headers["Vary"]
+
+    again = client.get(url, headers={"Accept": wire.BINARY_MIME, "If-None-Match": etag})
+    assert again.status_code == 304 and again.data == b""
+
+    # Outro formato é outra representação
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 200
+
+    # Escrita em outro sensor não invalida; no próprio sensor, sim
+    insert(path, "Temp Tanque")
+    assert client.get(url, headers={"Accept": wire.BINARY_MIME, "If-None-Match": etag}).status_code == 304
+    insert(path, "Temp Forno")
+    fresh = client.get(url, headers={"Accept": wire.BINARY_MIME, "If-None-Match": etag})
+    assert fresh.status_code == 200 and fresh.headers["ETag"] != etag
+    print("  ✅ /api/chart: 304 sem escrita nova, 200 após leitura do próprio sensor")
+
+
+def test_data_and_history():
+    path = sensor_server.DATABASE_PATH = make_db()
+    client = sensor_server.app.test_client()
+
+    live = client.get("/api/data?per_page=10")
+    assert client.get("/api/data?per_page=10", headers={"If-None-Match": live.headers["ETag"]}).status_code == 304
+    insert(path, "Temp Tanque")
+    assert client.get("/api/data?per_page=10", headers={"If-None-Match": live.headers["ETag"]}).status_code == 200
+
+    end = (datetime.now(timezone.utc) - timedelta(days=2)).strftime("%Y-%m-%dT%H:%M")
+    old = client.get(f"/api/data?end_date={end}")
+    assert old.headers["Cache-Control"].startswith("public, max-age=")
+    assert old.headers["Last-Modified"]
+    since = client.get(f"/api/data?end_date={end}", headers={"If-Modified-Since": old.headers["Last-Modified"]})
+    assert since.status_code == 304
+
+    stats = client.get("/api/stats")
+    assert client.get("/api/stats", headers={"If-None-Match": stats.headers["ETag"]}).status_code == 304
+    assert b"temppi_http_not_modified_total" in client.get("/metrics").data
+    print("  ✅ /api/data e /api/stats revalidam; janela histórica com Last-Modified e cache longo")
+
+
+if __name__ == "__main__":
+    print("🧪 Testando cache HTTP...")
+    test_chart_revalidation()
+    test_data_and_history()
+    print("🎉 Teste concluído!")
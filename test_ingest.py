@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# Teste da ingestão de várias plantas: uploader store-and-forward -> POST /api/ingest
+
+import os
+import sqlite3
+import tempfile
+import time
+
+import sensor_server
+import storage
+from uploader import Uploader
+
+
+def make_local_db(path, n):
+    storage.init_database(path)
+    conn = sqlite3.connect(path)
+    rows = [storage.reading_row("Temp Forno", 300.0 + i, "temperature", mode="rpi",
+                                timestamp=f"2024-01-01 00:{i // 60:02d}:{i % 60:02d}")
+            for i in range(n)]
+    conn.executemany(storage.INSERT_SQL, rows)
+    conn.commit()
+    conn.close()
+
+
+class FlakyLink:
+    """Encaminha o POST ao cliente de teste do Flask; `down` simula queda do link"""
+
+    def __init__(self, client):
+        self.client = client
+        self.down = False
+        self.calls = 0
+
+    def __call__(self, url, body, token=None):
+        self.calls += 1
+        if self.down:
+            raise OSError("link fora do ar")
+        resp = self.client.post("/api/ingest", data=body, headers={"Content-Encoding": "gzip"})
+        assert resp.status_code == 200, resp.get_json()
+        return resp.get_json()
+
+
+def test_store_and_forward():
+    tmp = tempfile.mkdtemp()
+    central = os.path.join(tmp, "central.db")
+    sensor_server.DATABASE_PATH = central
+    client = sensor_server.app.test_client()
+    link = FlakyLink(client)
+
+    for rig in ("forno-01", "forno-02"):
+        local = os.path.join(tmp, f"{rig}.db")
+        make_local_db(local, 250)
+        up = Uploader(local, "http://central", rig, batch_size=100, post=link)
+
+        link.down = True
+        try:
+            up.upload_once()
+            raise AssertionError("o envio deveria falhar com o link fora do ar")
+        except OSError:
+            pass
+        assert up.last_id() == 0 and up.pending() == 250
+
+        link.down = False
+        while up.upload_once():
+            pass
+        assert up.pending() == 0
+
+        # Reenvio (ex.: resposta perdida) não duplica linhas
+        up._save_last_id(0)
+        while up.upload_once():
+            pass
+
+    conn = sqlite3.connect(central)
+    counts = dict(conn.execute("SELECT rig_id, COUNT(*) FROM sensor_readings GROUP BY rig_id"))
+    conn.close()
+    assert counts == {"forno-01": 250, "forno-02": 250}, counts
+
+    rigs = client.get("/api/rigs").get_json()
+    assert [r["rig_id"] for r in rigs] == ["forno-01", "forno-02"]
+    assert all(r["total_rows"] == 250 for r in rigs)
+    data = client.get("/api/data?rig=forno-02&per_page=10").get_json()
+    assert data["total"] == 250 and all(d["rig_id"] == "forno-02" for d in data["data"])
+    print(f"  ✅ 2 plantas x 250 leituras, sem duplicatas após reenvio ({link.calls} POSTs)")
+
+
+def test_survives_locked_database():
+    tmp = tempfile.mkdtemp()
+    sensor_server.DATABASE_PATH = os.path.join(tmp, "central.db")
+    link = FlakyLink(sensor_server.app.test_client())
+    local = os.path.join(tmp, "local.db")
+    make_local_db(local, 250)
+    up = Uploader(local, "http://central", "forno-01", batch_size=100, interval=0.05, post=link)
+
+    save, failures = up._save_last_id, []
+
+    def locked_once(last_id):
+        if not failures:
+            failures.append(last_id)
+            raise sqlite3.OperationalError("database is locked")
+        save(last_id)
+
+    up._save_last_id = locked_once
+    up.start()
+    deadline = time.monotonic() + 10
+    while up.pending() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    alive = up._thread.is_alive()
+    up.stop()
+    assert failures and alive and up.pending() == 0
+    conn = sqlite3.connect(sensor_server.DATABASE_PATH)
+    assert conn.execute("SELECT COUNT(*) FROM sensor_readings").fetchone()[0] == 250
+    conn.close()
+    print("  ✅ 'database is locked' no banco local: backoff e envio retomado, sem perder a thread")
+
+
+def test_rejects_bad_batches():
+    tmp = tempfile.mkdtemp()
+    sensor_server.DATABASE_PATH = os.path.join(tmp, "central.db")
+    client = sensor_server.app.test_client()
+    assert client.post("/api/ingest", data=b"nada").status_code == 400
+    assert client.post("/api/ingest", json={"rig_id": "../x", "rows": []}).status_code == 400
+    assert client.post("/api/ingest", json={"rig_id": "ok", "rows": [[1, 2]]}).status_code == 400
+
+
+if __name__ == "__main__":
+    print("🧪 Testando ingestão multi-planta...")
+    test_store_and_forward()
+    test_survives_locked_database()
+    test_rejects_bad_batches()
+    print("🎉 Teste concluído!")
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# Teste da instrumentação: formato texto do Prometheus (HELP/TYPE, rótulos escapados,
+# buckets cumulativos), tempos e linhas das instruções SQL (fetchall/fetchone/fetchmany)
+# e os endpoints /metrics do servidor e do dashboard
+
+import os
+import re
+import sqlite3
+import tempfile
+import urllib.error
+import urllib.request
+
+import sensor_server
+import storage
+from metrics import (CONTENT_TYPE, REGISTRY, SQL_DURATION, SQL_ROWS, InstrumentedConnection, Registry,
+                     normalize_sql, serve_metrics)
+
+# Linha de amostra: nome{rótulos} valor
+SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{(?:[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\]|\\.)*",?)*\})? (\S+)$')
+
+
+def parse(text):
+    """Texto do Prometheus -> {(nome, rótulos): valor}, validando cada linha"""
+    samples, typed = {}, set()
+    assert text.endswith("\n")
+    for line in text.splitlines():
+        if line.startswith("# HELP "):
+            continue
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split(" ")
+            assert kind in ("counter", "gauge", "histogram"), line
+            typed.add(name)
+            continue
+        m = SAMPLE.match(line)
+        assert m, f"linha fora do formato: {line!r}"
+        name, labels, value = m.groups()
+        assert re.sub(r"_(bucket|sum|count)$", "", name) in typed or name in typed, line
+        samples[(name, labels or "")] = float(value)
+    return samples
+
+
+def test_render_format():
+    reg = Registry()
+    requests = reg.counter("t_requests_total", "Requisições", ("route",))
+    requests.labels('/a"b\\c').inc()
+    requests.labels('/a"b\\c').inc(2)
+    reg.gauge("t_queue", "Fila", function=lambda: 7)
+    hist = reg.histogram("t_seconds", "Duração", buckets=(0.1, 1.0))
+    for v in (0.05, 0.1, 0.5, 3.0):
+        hist.observe(v)
+    assert reg.counter("t_requests_total", "outra", ("route",)) is requests  # registro idempotente
+
+    samples = parse(reg.render())
+    assert samples[("t_requests_total", '{route="/a\\"b\\\\c"}')] == 3.0
+    assert samples[("t_queue", "")] == 7.0
+    # Cumulativos; o limite entra no bucket (le = menor ou igual)
+    assert [samples[("t_seconds_bucket", '{le="%s"}' % le)] for le in ("0.1", "1.0", "+Inf")] == [2, 3, 4]
+    assert samples[("t_seconds_count", "")] == 4 and abs(samples[("t_seconds_sum", "")] - 3.65) < 1e-9
+    print("  ✅ Formato texto: HELP/TYPE, rótulos escapados, gauge calculado, buckets cumulativos")
+
+
+def sql_stats(sql):
+    statement = normalize_sql(sql)
+    child = SQL_DURATION.labels(statement)
+    return child.count, SQL_ROWS.labels(statement).value
+
+
+def test_sql_timing():
+    conn = sqlite3.connect(":memory:", factory=InstrumentedConnection)
+    cursor = conn.cursor()
+    cursor.execute("CREATE TABLE t (x INTEGER)")
+    insert = "INSERT INTO t VALUES (?)"
+    for i in range(1, 26):
+        before = sql_stats(insert)[0]
+        cursor.execute(insert, (i,))
+        assert sql_stats(insert)[0] == before + 1  # escrita: medida na execução
+
+    select = "SELECT x FROM t ORDER BY x"
+    count, rows = sql_stats(select)
+    assert len(cursor.execute(select).fetchall()) == 25
+    assert sql_stats(select) == (count + 1, rows + 25)
+
+    one = "SELECT MAX(x) FROM t"
+    count, rows = sql_stats(one)
+    cursor.execute(one).fetchone()
+    assert sql_stats(one) == (count + 1, rows + 1)
+    conn.execute(one).fetchone()  # atalho da conexão também medido
+    assert sql_stats(one) == (count + 2, rows + 2)
+
+    # fetchmany: uma observação por instrução, com as linhas de todos os lotes
+    count, rows = sql_stats(select)
+    cursor.execute(select)
+    batches = []
+    while True:
+        batch = cursor.fetchmany(10)
+        if not batch:
+            break
+        batches.append(len(batch))
+        if len(batches) < 3:
+            assert sql_stats(select)[0] == count  # lote cheio: instrução ainda aberta
+    assert batches == [10, 10, 5] and sql_stats(select) == (count + 1, rows + 25)
+    conn.close()
+    print("  ✅ SQL: escrita na execução; fetchall/fetchone/fetchmany com tempo e linhas por instrução")
+
+
+def test_endpoints():
+    path = os.path.join(tempfile.mkdtemp(), "m.db")
+    storage.init_database(path)
+    sensor_server.DATABASE_PATH = path
+    client = sensor_server.app.test_client()
+    client.get("/api/sensors")
+    resp = client.get("/metrics")
+    assert resp.status_code == 200 and resp.content_type == CONTENT_TYPE
+    samples = parse(resp.get_data(as_text=True))
+    assert any(name == "temppi_http_request_duration_seconds_count" and 'route="/api/sensors"' in labels
+               for name, labels in samples)
+    assert any(name == "temppi_sql_duration_seconds_count" for name, _ in samples)
+
+    server = serve_metrics(0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        with urllib.request.urlopen(f"{url}/metrics") as r:
+            assert r.headers["Content-Type"] == CONTENT_TYPE
+            assert parse(r.read().decode()).keys() == parse(REGISTRY.render()).keys()
+        try:
+            urllib.request.urlopen(f"{url}/outra")
+        except urllib.error.HTTPError as e:
+            assert e.code == 404
+        else:
+            raise AssertionError("rota desconhecida respondeu")
+    finally:
+        server.shutdown()
+        server.server_close()
+    print("  ✅ /metrics do servidor e endpoint local do dashboard no formato do Prometheus")
+
+
+def test_api_data_sql():
+    path = os.path.join(tempfile.mkdtemp(), "d.db")
+    storage.init_database(path)
+    conn = sqlite3.connect(path)
+    conn.executemany(storage.INSERT_SQL, [storage.reading_row("Temp Forno", 300.0 + i, "temperature")
+                                          for i in range(30)])
+    conn.commit()
+    conn.close()
+    sensor_server.DATABASE_PATH = path
+
+    def sql_samples():
+        return {labels: value for (name, labels), value in parse(REGISTRY.render()).items()
+                if name in ("temppi_sql_duration_seconds_count", "temppi_sql_rows_total")}
+
+    before = sql_samples()
+    resp = sensor_server.app.test_client().get("/api/data?sensor=Temp Forno&per_page=10")
+    assert resp.status_code == 200 and len(resp.get_json()["data"]) == 10
+    changed = {labels for labels, value in sql_samples().items() if value > before.get(labels, 0)}
+    assert any("COUNT(" in labels for labels in changed), changed
+    assert any("LIMIT" in labels for labels in changed), changed
+    print("  ✅ /api/data: contagem e página aparecem nas métricas SQL")
+
+
+if __name__ == "__main__":
+    print("🧪 Testando métricas...")
+    test_render_format()
+    test_sql_timing()
+    test_endpoints()
+    test_api_data_sql()
+    print("🎉 Teste concluído!")
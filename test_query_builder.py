@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# Teste dos filtros de /api/data: validação, SQL que usa os índices, resultados de filtros
+# combinados (vários sensores + faixa de valor) e limite de custo por consulta
+
+import os
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+import sensor_server
+import storage
+from channels import default_registry
+from query_builder import ReadingFilter, page_queries
+
+TORRES = ["Torre Nível 1", "Torre Nível 2", "Torre Nível 3"]
+
+
+def make_db(rows_per_sensor=3000):
+    path = os.path.join(tempfile.mkdtemp(), "q.db")
+    storage.init_database(path)
+    conn = sqlite3.connect(path)
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    rows = []
+    for i in range(rows_per_sensor):
+        ts = (now - timedelta(minutes=5 * i)).strftime("%Y-%m-%d %H:%M:%S")
+        for name in default_registry().names:
+            ch = default_registry()[name]
+            # Torres passam de 200 °C a cada 100 amostras; o resto fica abaixo
+            value = 250.0 if name in TORRES and i % 100 == 0 else ch.base
+            rows.append(storage.reading_row(name, value, ch.type, ch.pins, "rpi" if i % 2 else "simulation", ts))
+    conn.executemany(storage.INSERT_SQL, rows)
+    conn.commit()
+    return path, conn
+
+
+def test_validation():
+    for kwargs in ({"types": ["humidity"]}, {"modes": ["manual"]}, {"value_min": 5, "value_max": 1},
+                   {"start": "2024-05-02", "end": "2024-05-01"}, {"start": "ontem"},
+                   {"sensors": [f"s{i}" for i in range(40)]}):
+        try:
+            ReadingFilter(**kwargs)
+        except ValueError:
+            continue
+        raise AssertionError(f"filtro inválido aceito: {kwargs}")
+    f = ReadingFilter(sensors=["Torre Nível 1,Torre Nível 2", "Torre Nível 1"], start="2024-05-01T14:00",
+                      value_min=200)
+    assert f.sensors == ["Torre Nível 1", "Torre Nível 2"] and f.start == "2024-05-01 14:00:00"
+    where, params = f.where(default_registry())
+    # Sensores do mesmo tipo: a faixa vai direto na coluna temperature
+    assert "sensor_name IN (?, ?)" in where and "temperature >= ?" in where and "COALESCE" not in where
+    mixed, _ = ReadingFilter(sensors=["Temp Forno", "Velocidade"], value_max=10).where(default_registry())
+    assert "COALESCE(temperature, pressure, velocity) <= ?" in mixed
+    print("  ✅ Validação e SQL parametrizado (IN, coluna do tipo na faixa de valor)")
+
+
+def test_filters_and_plan():
+    path, conn = make_db()
+    week_ago = (datetime.now(timezone.utc) - timedelta(days=7)).strftime("%Y-%m-%d %H:%M:%S")
+    f = ReadingFilter(sensors=TORRES, start=week_ago, value_min=200)
+    (count_sql, count_params), (page_sql, page_params) = page_queries(f, default_registry(), 50, 0)
+    plan = " ".join(r[-1] for r in conn.execute("EXPLAIN QUERY PLAN " + page_sql, page_params))
+    assert "idx_sensor_ts" in plan, plan
+    expected = conn.execute("SELECT COUNT(*) FROM sensor_readings WHERE sensor_name LIKE 'Torre%' "
+                            "AND timestamp >= ? AND temperature > 200", (week_ago,)).fetchone()[0]
+    assert expected > 0 and conn.execute(count_sql, count_params).fetchone()[0] == expected
+    conn.close()
+
+    sensor_server.DATABASE_PATH = path
+    client = sensor_server.app.test_client()
+    body = client.get("/api/data", query_string={"sensor": ",".join(TORRES), "start_date": week_ago,
+                                                 "min": 200, "per_page": 100}).get_json()
+    assert body["total"] == expected
+    assert all(r["sensor_name"] in TORRES and r["temperature"] >= 200 for r in body["data"])
+
+    # Parâmetros repetidos, tipo e modo; o filtro de um sensor só continua funcionando
+    rpi = client.get("/api/data?type=pressure&mode=rpi&per_page=5").get_json()
+    assert rpi["total"] == 1500 and all(r["mode"] == "rpi" and r["sensor_type"] == "pressure" for r in rpi["data"])
+    two = client.get("/api/data?sensor=Temp Forno&sensor=Velocidade&per_page=1").get_json()
+    assert two["total"] == 6000
+    assert client.get("/api/data?sensor=Temp Forno&per_page=1").get_json()["total"] == 3000
+    assert client.get("/api/data?type=humidity").status_code == 400
+    assert client.get("/api/data?min=abc").status_code == 400
+    print(f"  ✅ Torres > 200 °C na última semana: {expected} linhas via idx_sensor_ts; tipo/modo/vários sensores")
+
+    # Limite de custo: filtro amplo com orçamento zero é interrompido (422), não trava o servidor
+    sensor_server.QUERY_TIME_LIMIT = 0.0
+    try:
+        slow = client.get("/api/data?min=-1000")
+        assert slow.status_code == 422 and "restrinja" in slow.get_json()["error"]
+    finally:
+        sensor_server.QUERY_TIME_LIMIT = 2.0
+    assert client.get("/api/data?min=-1000&per_page=1").status_code == 200
+    # Página sem limite rodaria fora do orçamento depois do primeiro lote
+    assert client.get(f"/api/data?per_page={sensor_server.MAX_PER_PAGE}").status_code == 200
+    for bad in (sensor_server.MAX_PER_PAGE + 1, 0, "abc"):
+        assert client.get(f"/api/data?per_page={bad}").status_code == 400
+    assert client.get("/api/data?page=0").status_code == 400
+    print("  ✅ Consulta acima do orçamento interrompida com 422")
+
+
+def test_end_inclusive_ms():
+    path = os.path.join(tempfile.mkdtemp(), "ms.db")
+    storage.init_database(path)
+    conn = sqlite3.connect(path)
+    conn.executemany(storage.INSERT_SQL, [
+        storage.reading_row("Temp Forno", 300.0 + i, "temperature", timestamp=ts)
+        for i, ts in enumerate(["2024-05-01 12:00:00.000", "2024-05-01 12:00:00.500",
+                                "2024-05-01 12:00:00.999", "2024-05-01 12:00:01.000"])])
+    conn.commit()
+    conn.close()
+    assert ReadingFilter(end="2024-05-01T12:00:00").end == "2024-05-01 12:00:00.999"
+    assert ReadingFilter(end="2024-05-01 12:00:00.250").end == "2024-05-01 12:00:00.250"
+    sensor_server.DATABASE_PATH = path
+    client = sensor_server.app.test_client()
+    assert client.get("/api/data?end_date=2024-05-01T12:00:00").get_json()["total"] == 3
+    assert client.get("/api/data?end_date=2024-05-01T12:00").get_json()["total"] == 3
+    assert client.get("/api/data?start_date=2024-05-01 12:00:00.500&end_date=2024-05-01 12:00:00.500"
+                      ).get_json()["total"] == 1
+    print("  ✅ end_date sem fração inclui as leituras com ms daquele segundo")
+
+
+if __name__ == "__main__":
+    print("🧪 Testando filtros de /api/data...")
+    test_validation()
+    test_filters_and_plan()
+    test_end_inclusive_ms()
+    print("🎉 Teste concluído!")
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# Teste da compressão swinging door: reconstrução dentro da tolerância e redução de linhas
+
+import math
+import random
+
+from sampling import SwingingDoorCompressor, reconstruct, format_timestamp, parse_timestamp
+
+
+def compress(samples, tolerance, heartbeat=60.0):
+    comp = SwingingDoorCompressor(tolerance, heartbeat)
+    points = []
+    for t, v in samples:
+        points.extend(comp.add(t, v))
+    points.extend(comp.flush())
+    return comp, points
+
+
+def slow_temperature(n, seed=1):
+    """Temperatura lenta com deriva, quantizada na resolução do MAX6675 (0.25 °C)"""
+    rng = random.Random(seed)
+    samples, drift = [], 0.0
+    for i in range(n):
+        drift += rng.gauss(0.0, 0.02)
+        v = 350.0 + 20.0 * math.sin(i / 900.0) + drift
+        samples.append((float(i), round(v * 4) / 4))
+    return samples
+
+
+def test_reconstruction_within_tolerance():
+    samples = slow_temperature(20000)
+    tol = 0.25
+    comp, points = compress(samples, tol)
+    rebuilt = reconstruct(points, [t for t, _ in samples])
+    worst = max(abs(r - v) for r, (_, v) in zip(rebuilt, samples))
+    assert worst <= tol + 1e-9, worst
+    assert len(points) * 10 < len(samples), len(points)
+    print(f"  ✅ {len(samples)} amostras -> {len(points)} linhas, erro máximo {worst:.3f} (tol {tol})")
+
+
+def test_heartbeat_limits_gap():
+    samples = [(float(t), 100.0) for t in range(600)]
+    _, points = compress(samples, 0.25, heartbeat=60.0)
+    gaps = [b[0] - a[0] for a, b in zip(points, points[1:])]
+    assert max(gaps) <= 60.0, max(gaps)
+    assert points[-1][0] == 599.0
+    print(f"  ✅ Sinal constante: {len(points)} linhas, maior intervalo {max(gaps):.0f}s")
+
+
+def test_zero_tolerance_keeps_everything():
+    samples = slow_temperature(500, seed=2)
+    _, points = compress(samples, 0.0)
+    assert points == samples
+
+
+def test_timestamp_roundtrip():
+    t = 1700000000.125
+    assert abs(parse_timestamp(format_timestamp(t)) - t) < 1e-3
+    assert parse_timestamp("2023-11-14 22:13:20") == 1700000000.0
+
+
+if __name__ == "__main__":
+    print("🧪 Testando compressão swinging door...")
+    test_reconstruction_within_tolerance()
+    test_heartbeat_limits_gap()
+    test_zero_tolerance_keeps_everything()
+    test_timestamp_roundtrip()
+    print("🎉 Teste concluído!")
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# Teste da camada de saúde dos sensores: stale/fault, disjuntor sem leitura no hardware,
+# backoff exponencial e coluna quality no banco
+
+import os
+import sqlite3
+import sys
+import tempfile
+
+import storage
+from ingest import LEGACY_COLUMNS, decode_batch
+from sensor_health import SensorHealth, GOOD, STALE, FAULT, OPEN
+
+
+class Clock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+class FlakySensor:
+    def __init__(self):
+        self.broken = False
+        self.calls = 0
+
+    def read(self):
+        self.calls += 1
+        if self.broken:
+            raise ValueError("Erro no termopar")
+        return 123.5
+
+
+def test_breaker():
+    clock = Clock()
+    health = SensorHealth(["Temp Forno"], threshold=3, base_backoff=5.0, max_backoff=20.0,
+                          max_stale=10.0, clock=clock)
+    sensor = FlakySensor()
+    assert health.read("Temp Forno", sensor.read) == (123.5, GOOD)
+
+    # Falha passageira: repete o último valor bom
+    sensor.broken = True
+    clock.t = 1.0
+    assert health.read("Temp Forno", sensor.read) == (123.5, STALE)
+    clock.t = 2.0
+    assert health.read("Temp Forno", sensor.read) == (123.5, STALE)
+    # Terceira falha seguida abre o disjuntor
+    clock.t = 3.0
+    assert health.read("Temp Forno", sensor.read) == (None, FAULT)
+    assert health.breakers["Temp Forno"].state == OPEN
+
+    # Aberto: o hardware não é mais lido
+    calls = sensor.calls
+    for _ in range(100):
+        assert health.read("Temp Forno", sensor.read) == (None, FAULT)
+    assert sensor.calls == calls
+
+    # Backoff exponencial nos novos testes (com jitter de 10%)
+    waits = []
+    for _ in range(4):
+        waits.append(health.next_due_in())
+        clock.t += waits[-1]
+        assert health.due() == ["Temp Forno"]
+        health.probe_result("Temp Forno", False)
+    assert 4.4 <= waits[0] <= 5.6 and 8.9 <= waits[1] <= 11.1 and 17.9 <= waits[2] <= 22.1 and waits[3] <= 22.1
+
+    health.probe_result("Temp Forno", True)
+    sensor.broken = False
+    assert health.read("Temp Forno", sensor.read) == (123.5, GOOD)
+    print(f"  ✅ stale -> fault, disjuntor sem leituras, novos testes em {[round(w, 1) for w in waits]} s")
+
+
+def test_quality_column():
+    path = os.path.join(tempfile.mkdtemp(), "q.db")
+    conn = sqlite3.connect(path)
+    # Banco de versão anterior, sem a coluna quality
+    conn.execute("""CREATE TABLE sensor_readings (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp DATETIME,
+                    sensor_name TEXT NOT NULL, temperature REAL, pressure REAL, velocity REAL,
+                    sensor_type TEXT NOT NULL, pins TEXT, mode TEXT)""")
+    conn.execute("INSERT INTO sensor_readings (timestamp, sensor_name, temperature, sensor_type) "
+                 "VALUES ('2024-01-01 00:00:00', 'Temp Forno', 300, 'temperature')")
+    conn.commit()
+    conn.close()
+    storage.init_database(path)
+    conn = sqlite3.connect(path)
+    conn.execute(storage.INSERT_SQL, storage.reading_row("Temp Forno", None, "temperature", mode="rpi", quality=FAULT))
+    conn.commit()
+    assert [r[0] for r in conn.execute("SELECT quality FROM sensor_readings ORDER BY id")] == [GOOD, FAULT]
+
+    # Plantas antigas enviam sem quality
+    body = ('{"rig_id": "r1", "columns": %s, "rows": [["2024-01-01 00:00:00", "Temp Forno", 1.0, null, null, '
+            '"temperature", null, "rpi"]]}' % str(list(LEGACY_COLUMNS)).replace("'", '"')).encode()
+    _, rows = decode_batch(body)
+    assert rows[0][-1] == GOOD
+    print("  ✅ Coluna quality migrada (linhas antigas = good) e lotes antigos aceitos")
+
+
+def test_simulated_dropout():
+    """Queda do sensor simulado passa por compute_values como 'fault' (sem ir ao compressor)"""
+    argv, sys.argv = sys.argv, ["dashboard.py", "--no-ui", "--sim-seed", "1"]
+    try:
+        import dashboard
+    finally:
+        sys.argv = argv
+    from simulator import LiveSimulator, SENSOR_NAMES
+    logged = []
+    saved = dashboard.log_sensor_reading, dashboard.SIM
+    dashboard.log_sensor_reading = lambda name, value, *a, quality="good", **kw: logged.append((name, value, quality))
+    dashboard.SIM = LiveSimulator({}, seed=1)
+    try:
+        dashboard.SIM.sim.dropout_mttr = 1e9  # a queda não termina durante o teste
+        dashboard.compute_values()
+        dashboard.SIM.sim.dropped[0, SENSOR_NAMES.index("Temp Forno")] = True
+        dashboard._next_sample.clear()
+        dashboard.SIM.advance(dashboard.time.monotonic() + 1.0)
+        values = dashboard.compute_values()
+    finally:
+        dashboard.log_sensor_reading, dashboard.SIM = saved
+    assert values["Temp Forno"] is None and dashboard._last_quality["Temp Forno"] == FAULT
+    assert ("Temp Forno", None, FAULT) in logged
+    assert "Temp Forno" not in dashboard.DERIVED.latest
+    print("  ✅ Queda do simulador vira leitura 'fault' no ciclo de aquisição")
+
+
+if __name__ == "__main__":
+    print("🧪 Testando saúde dos sensores...")
+    test_breaker()
+    test_quality_column()
+    test_simulated_dropout()
+    print("🎉 Teste concluído!")
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# Teste do anel em memória compartilhada: produtor em outro processo, sobrescrita contada
+# como perda, últimos valores por canal e gravação em lotes retomada pelo cursor do anel
+
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+import storage
+from channels import default_registry
+from shm_ring import ARCHIVE, LIVE, PID_WORD, LatestValues, RingReader, RingWriter, SharedRing
+from storage_drain import StorageDrain
+
+RING = f"temppi_test_{os.getpid()}"
+
+
+def produce(name, n):
+    ring = SharedRing(name)
+    writer = RingWriter(ring)
+    for i in range(n):
+        writer.publish(LIVE, 1_700_000_000.0 + i, float(i), 1 + i % 8)
+    writer.close()
+    ring.close()
+
+
+def test_cross_process():
+    ring = SharedRing(RING, capacity=1024, create=True)
+    try:
+        n = 200_000
+        reader = RingReader(ring, start=0)
+        # Processo separado, como a aquisição no supervisor.py
+        proc = subprocess.Popen([sys.executable, "-c", f"import test_shm_ring; test_shm_ring.produce({RING!r}, {n})"])
+        seen = last = 0
+        while proc.poll() is None or reader.cursor < ring.head():
+            for r in reader.read():
+                # Registro íntegro: valor, canal e tempo coerentes com o índice
+                assert r.value == float(r.index) and r.channel_id == 1 + r.index % 8
+                assert r.t == 1_700_000_000.0 + r.index and r.index >= last
+                last = r.index
+                seen += 1
+        assert proc.wait() == 0
+        assert ring.head() == n and seen + reader.dropped == n, (ring.head(), seen, reader.dropped)
+        print(f"  ✅ {n} registros de outro processo: {seen} lidos, {reader.dropped} sobrescritos (contados)")
+    finally:
+        ring.close()
+
+
+def test_overrun_and_latest():
+    ring = SharedRing(RING, capacity=16, create=True)
+    try:
+        writer = RingWriter(ring)
+        latest = LatestValues(ring)
+        for i in range(40):
+            writer.publish(LIVE, float(i), float(i), 1 + i % 2, "stale" if i == 39 else "good")
+        reader = RingReader(ring, start=0)
+        records = reader.read()
+        assert reader.dropped == 24 and [r.index for r in records] == list(range(24, 40))
+        values = latest.update()
+        assert values[1].value == 38.0 and values[2].value == 39.0 and values[2].quality == "stale"
+
+        # Um segundo produtor é recusado enquanto o primeiro estiver vivo (aqui: o processo pai)
+        ring.words[PID_WORD] = os.getppid()
+        try:
+            RingWriter(SharedRing(RING))
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError("dois produtores no mesmo anel")
+        print("  ✅ Sobrescrita pula para o mais antigo disponível; últimos valores por canal")
+    finally:
+        ring.close()
+
+
+def test_drain_resumes():
+    path = os.path.join(tempfile.mkdtemp(), "ring.db")
+    storage.init_database(path)
+    ring = SharedRing(RING, capacity=64, create=True)
+    try:
+        writer = RingWriter(ring)
+        registry = default_registry()
+        forno = registry["Temp Forno"]
+        t0 = time.time()
+        for i in range(10):
+            writer.publish(LIVE, t0 + i, 300.0 + i, forno.id, mode="rpi", pins=forno.pins)
+            writer.publish(ARCHIVE, t0 + i, 300.0 + i, forno.id, mode="rpi", pins=forno.pins)
+        drain = StorageDrain(ring, path, registry, max_batch=4)
+        while drain.drain_once():
+            pass
+        drain.conn.close()
+        assert ring.drain_cursor() == ring.head() == 20
+
+        # Gravador reiniciado: continua do cursor guardado no anel, sem regravar
+        writer.publish(ARCHIVE, t0 + 10, None, forno.id, "fault", "rpi", forno.pins)
+        drain = StorageDrain(ring, path, registry)
+        assert drain.reader.cursor == 20
+        drain.drain_once()
+        drain.conn.close()
+    finally:
+        ring.close()
+    conn = sqlite3.connect(path)
+    rows = conn.execute("SELECT sensor_name, temperature, sensor_type, pins, mode, quality, channel_id "
+                        "FROM sensor_readings ORDER BY id").fetchall()
+    assert len(rows) == 11
+    assert rows[0] == ("Temp Forno", 300.0, "temperature", str(forno.pins), "rpi", "good", forno.id)
+    assert rows[-1][1] is None and rows[-1][5] == "fault"
+    print(f"  ✅ Gravação em lotes: {len(rows)} linhas ARCHIVE, cursor retomado após reinício")
+
+
+def test_drain_locked_db():
+    """Banco travado durante a gravação: o lote fica no anel e é gravado na próxima volta"""
+    path = os.path.join(tempfile.mkdtemp(), "locked.db")
+    storage.init_database(path)
+    ring = SharedRing(RING, capacity=64, create=True)
+    try:
+        writer = RingWriter(ring)
+        registry = default_registry()
+        forno = registry["Temp Forno"]
+        t0 = time.time()
+        for i in range(5):
+            writer.publish(ARCHIVE, t0 + i, 300.0 + i, forno.id, mode="rpi", pins=forno.pins)
+        drain = StorageDrain(ring, path, registry)
+        drain.conn.execute("PRAGMA busy_timeout = 50")
+        lock = sqlite3.connect(path)
+        lock.execute("BEGIN EXCLUSIVE")  # servidor ou backup segurando o banco
+        try:
+            drain.drain_once()
+        except sqlite3.OperationalError:
+            pass
+        else:
+            raise AssertionError("gravou com o banco travado")
+        assert drain.reader.cursor == ring.drain_cursor() == 0
+        lock.rollback()
+        lock.close()
+
+        for i in range(5, 7):
+            writer.publish(ARCHIVE, t0 + i, 300.0 + i, forno.id, mode="rpi", pins=forno.pins)
+        while drain.drain_once():
+            pass
+        drain.conn.close()
+        assert ring.drain_cursor() == ring.head() == 7
+    finally:
+        ring.close()
+    conn = sqlite3.connect(path)
+    values = [v for (v,) in conn.execute("SELECT temperature FROM sensor_readings ORDER BY id")]
+    conn.close()
+    assert values == [300.0 + i for i in range(7)], values
+    print("  ✅ Banco travado: lote mantido no anel e gravado depois, sem perda")
+
+
+def test_supervisor_db():
+    """--db do supervisor chega à gravação e ao servidor web"""
+    import argparse
+    import supervisor
+    args = argparse.Namespace(ring=RING, db="outro.db", channels=None, img=None, scale=1.0, server=True,
+                              affinity=False)
+    children = {c.name: c for c in supervisor.build_children(args, [])}
+    assert children["gravação"].argv[-1] == "outro.db"
+    env = children["servidor"].env
+    assert env["TEMPPI_DB"] == os.path.abspath("outro.db")
+    out = subprocess.run([sys.executable, "-c", "import sensor_server; print(sensor_server.DATABASE_PATH)"],
+                         env=env, capture_output=True, text=True, check=True).stdout.strip()
+    assert out == os.path.abspath("outro.db"), out
+    print("  ✅ Supervisor: --db repassado ao storage_drain e ao sensor_server (TEMPPI_DB)")
+
+
+if __name__ == "__main__":
+    print("🧪 Testando anel em memória compartilhada...")
+    test_cross_process()
+    test_overrun_and_latest()
+    test_drain_resumes()
+    test_drain_locked_db()
+    test_supervisor_db()
+    print("🎉 Teste concluído!")
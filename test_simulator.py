@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# Teste do simulador vetorizado: reprodutibilidade, atraso térmico em cadeia, quedas e vazão
+
+import time
+
+import numpy as np
+
+from simulator import LiveSimulator, PlantSimulator, SENSOR_NAMES
+
+FORNO, TANQUE, TORRE3 = (SENSOR_NAMES.index(n) for n in ("Temp Forno", "Temp Tanque", "Torre Nível 3"))
+
+
+def test_seed_reproducible():
+    a = PlantSimulator(units=4, seed=7).run(200)
+    b = PlantSimulator(units=4, seed=7).run(200)
+    c = PlantSimulator(units=4, seed=8).run(200)
+    assert np.array_equal(a, b, equal_nan=True)
+    assert not np.array_equal(a, c, equal_nan=True)
+
+
+def test_thermal_lag_chain():
+    """Degrau no Forno chega primeiro ao Tanque e depois à Torre 3"""
+    sim = PlantSimulator(units=1, seed=1, noise_scale=0.0, drift_sigma=0.0, dropout_mtbf=0)
+    sim.set_base("Temp Forno", 400.0)
+    r = sim.run(3000)[:, 0, :]
+    rise = r - r[0]
+
+    def t63(col):
+        return int(np.argmax(rise[:, col] >= 0.63 * rise[-1, col]))
+
+    assert rise[-1, FORNO] > 45 and rise[-1, TORRE3] > 5
+    assert t63(FORNO) < t63(TANQUE) < t63(TORRE3), (t63(FORNO), t63(TANQUE), t63(TORRE3))
+    print(f"  ✅ Atraso: 63% do degrau em Forno {t63(FORNO)}s, Tanque {t63(TANQUE)}s, Torre 3 {t63(TORRE3)}s")
+
+
+def test_dropouts_and_rate():
+    sim = PlantSimulator(units=2000, seed=3, dropout_mtbf=600, dropout_mttr=10)
+    t0 = time.perf_counter()
+    r = sim.run(200)
+    rate = r.size / (time.perf_counter() - t0)
+    lost = np.isnan(r).mean()
+    assert 0.005 < lost < 0.05, lost
+    assert rate > 100_000, rate
+    print(f"  ✅ {rate:,.0f} leituras/s, {lost * 100:.1f}% em queda")
+
+
+def test_extra_channels():
+    """Canal fora do MODEL: ruído próprio em torno do base, sem mudar as séries do modelo"""
+    base = {"Temp Forno": 350.0, "Temp Condensador": 45.0, "Pressão Vácuo": 0.5, "Rosca": 30.0}
+    types = {"Pressão Vácuo": "pressure", "Rosca": "velocity"}
+    live = LiveSimulator(base, seed=5, types=types)
+    plain = LiveSimulator({"Temp Forno": 350.0}, seed=5)
+    assert not live.sim.set_base("Temp Condensador", 50.0)
+    live.sim.dropout_mtbf = plain.sim.dropout_mtbf = 0  # sem quedas: todas as leituras comparáveis
+    seen = {name: [] for name in base}
+    for t in range(600):
+        live.advance(float(t))
+        plain.advance(float(t))
+        assert all(live.values[n] == plain.values[n] for n in SENSOR_NAMES)
+        for name in base:
+            seen[name].append(live.read(name))
+    assert all(v is not None for values in seen.values() for v in values)
+    assert abs(np.mean(seen["Temp Condensador"]) - 45.0) < 2.0 and np.std(seen["Temp Condensador"]) > 0
+    assert abs(np.mean(seen["Pressão Vácuo"]) - 0.5) < 0.1 and min(seen["Pressão Vácuo"]) >= 0
+    assert all(isinstance(v, int) for v in seen["Rosca"]) and abs(np.mean(seen["Rosca"]) - 30.0) < 30
+    print("  ✅ Canais fora do modelo simulados pelo tipo; séries do modelo iguais para a mesma semente")
+
+
+if __name__ == "__main__":
+    print("🧪 Testando simulador...")
+    test_seed_reproducible()
+    test_thermal_lag_chain()
+    test_dropouts_and_rate()
+    test_extra_channels()
+    print("🎉 Teste concluído!")
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# Teste das respostas em fluxo de /api/chart e /api/data: mesmo conteúdo que a consulta
+# direta (com vários lotes), memória de pico que não cresce com a série e banco livre para
+# a aquisição gravar enquanto uma série longa é enviada
+
+import json
+import os
+import sqlite3
+import tempfile
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+import sensor_server
+import storage
+import wire
+from chart_cache import ChartCache
+from sampling import parse_timestamp, format_timestamp, reconstruct
+from test_wire import decode_binary, decode_columnar
+
+
+def make_db(rows):
+    path = os.path.join(tempfile.mkdtemp(), "s.db")
+    storage.init_database(path)
+    now = datetime.now(timezone.utc) - timedelta(minutes=5)
+    batch = []
+    for i in range(rows):
+        ts = (now - timedelta(seconds=(rows - i) * 2)).strftime("%Y-%m-%d %H:%M:%S")
+        batch.append(storage.reading_row("Temp Forno", 300.0 + (i % 500) / 10, "temperature", timestamp=ts))
+        if i % 10 == 0:
+            batch.append(storage.reading_row("Velocidade", 600.0 + i % 7, "velocity", timestamp=ts))
+    conn = sqlite3.connect(path)
+    conn.executemany(storage.INSERT_SQL, batch)
+    conn.commit()
+    conn.close()
+    return path
+
+
+def setup(rows, cache_bytes=32 * 1024 * 1024):
+    sensor_server.DATABASE_PATH = make_db(rows)
+    sensor_server.CHART_CACHE = ChartCache(cache_bytes)
+    return sensor_server.app.test_client()
+
+
+def test_same_content():
+    client = setup(3000)
+    original = sensor_server.STREAM_BATCH
+    sensor_server.STREAM_BATCH = 7  # várias voltas de fetchmany, inclusive lote final vazio
+    try:
+        conn = sqlite3.connect(sensor_server.DATABASE_PATH)
+        conn.row_factory = sqlite3.Row
+        start = sensor_server.db_time(sensor_server.window_now() - timedelta(hours=24))
+        direct = [dict(r) for r in conn.execute(
+            "SELECT timestamp, temperature, pressure, velocity FROM sensor_readings "
+            "WHERE sensor_name = 'Temp Forno' AND timestamp >= ? ORDER BY timestamp", (start,))]
+        resp = client.get("/api/chart/Temp Forno?hours=24")
+        assert resp.status_code == 200 and "Content-Length" not in resp.headers
+        assert resp.get_json() == direct and len(direct) == 3000
+
+        for per_page in (49, 70):
+            page = client.get(f"/api/data?sensor=Temp Forno&page=2&per_page={per_page}").get_json()
+            expected = [dict(r) for r in conn.execute(
+                "SELECT * FROM sensor_readings WHERE sensor_name = 'Temp Forno' "
+                "ORDER BY timestamp DESC LIMIT ? OFFSET ?", (per_page, per_page))]
+            assert page["data"] == expected and page["total"] == 3000
+            assert page["total_pages"] == (3000 + per_page - 1) // per_page
+        assert client.get("/api/data?sensor=Inexistente").get_json()["data"] == []
+        assert client.get("/api/chart/Inexistente?hours=1").get_json() == []
+        assert client.get("/api/chart/Temp Forno?hours=1&step=60").get_json()[0]["temperature"] is not None
+        conn.close()
+    finally:
+        sensor_server.STREAM_BATCH = original
+    print("  ✅ JSON em fluxo igual à consulta direta (chart, páginas de data, vazios e reamostrado)")
+
+
+def reference_resample(rows, step):
+    """Grade de uma vez, com a série inteira (como antes do fluxo)"""
+    times = [parse_timestamp(r[0]) for r in rows]
+    grid, t = [], times[0]
+    while t <= times[-1]:
+        grid.append(t)
+        t += step
+    columns = [reconstruct([(ts, r[i]) for ts, r in zip(times, rows) if r[i] is not None], grid)
+               for i in range(1, 4)]
+    return [(format_timestamp(t),) + tuple(col[i] for col in columns) for i, t in enumerate(grid)]
+
+
+def test_compact_formats_and_resample():
+    client = setup(3000)
+    rows = [row for batch in sensor_server.stream_chart_data("Temp Forno", 24) for row in batch]
+    expected_t = [wire.timestamp_ms(r[0]) for r in rows]
+    for fmt, decode in (("binary", lambda r: decode_binary(r.data)),
+                        ("columnar", lambda r: decode_columnar(r.get_json(force=True)))):
+        resp = client.get(f"/api/chart/Temp Forno?hours=24&format={fmt}")
+        assert resp.status_code == 200 and "Content-Length" not in resp.headers
+        t, columns = decode(resp)
+        assert t == expected_t and list(columns) == ["temperature"]
+        assert all(abs(v - r[1]) < 1e-3 for v, r in zip(columns["temperature"], rows))
+        empty = decode(client.get(f"/api/chart/Inexistente?hours=1&format={fmt}"))
+        assert empty == ([], {})
+
+    # Reamostragem em fluxo = grade calculada de uma vez, inclusive com falha (linhas nulas),
+    # colunas vazias e lotes pequenos
+    faulty = [(ts, None if 500 <= i < 800 else v, None, 700.0 + i if i % 3 == 0 else None)
+              for i, (ts, v, _, _) in enumerate(rows)]
+    for step in (1.0, 7.5, 60.0):
+        batches = [faulty[i:i + 13] for i in range(0, len(faulty), 13)]
+        streamed = [row for batch in sensor_server.resample_chart_data(iter(batches), step) for row in batch]
+        assert streamed == reference_resample(faulty, step), step
+    grid = client.get("/api/chart/Temp Forno?hours=24&step=60").get_json()
+    assert [tuple(r[f] for f in sensor_server.CHART_FIELDS) for r in grid] == reference_resample(rows, 60.0)
+    print("  ✅ binary e columnar em quadros por lote iguais ao json; reamostragem em fluxo igual à grade inteira")
+
+
+def peak(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_constant_memory():
+    sizes = {}
+    query = {"json": "", "binary": "&format=binary", "columnar": "&format=columnar", "step": "&step=5"}
+    for rows in (20_000, 80_000):
+        client = setup(rows, cache_bytes=256 * 1024)  # cache pequeno: nada da série fica retido
+
+        def stream(fmt):
+            resp = client.get(f"/api/chart/Temp Forno?hours=72{query[fmt]}", buffered=False)
+            total = sum(len(part) for part in resp.response)
+            resp.close()
+            assert total > rows * 4
+
+        def materialized():
+            json.dumps(sensor_server.get_chart_data("Temp Forno", 72))
+
+        sizes[rows] = {}
+        for fmt in query:
+            stream(fmt)  # primeira passada: imports e caches do Flask fora da medida
+            sizes[rows][fmt] = peak(lambda: stream(fmt))
+        sizes[rows]["whole"] = peak(materialized)
+    small, large = sizes[20_000], sizes[80_000]
+    for fmt in query:
+        assert large[fmt] < small[fmt] * 1.5, (fmt, sizes)  # 4x mais linhas, pico praticamente igual
+        assert large[fmt] * 10 < large["whole"], (fmt, sizes)
+    print("  ✅ Pico de memória em fluxo (20 mil -> 80 mil linhas): " +
+          ", ".join(f"{fmt} {small[fmt] / 1e6:.1f} -> {large[fmt] / 1e6:.1f} MB" for fmt in query) +
+          f"; lista + dumps {large['whole'] / 1e6:.1f} MB")
+
+
+def test_writer_not_blocked():
+    client = setup(20_000, cache_bytes=256 * 1024)
+    resp = client.get("/api/chart/Temp Forno?hours=72", buffered=False)
+    parts = iter(resp.response)
+    next(parts)
+    next(parts)  # envio pela metade, cliente lento
+    writer = sqlite3.connect(sensor_server.DATABASE_PATH, timeout=0.2)
+    writer.execute(storage.INSERT_SQL, storage.reading_row("Temp Forno", 1.0, "temperature"))
+    writer.commit()  # sqlite3.OperationalError (database is locked) se a leitura segurasse o lock
+    writer.close()
+    for _ in parts:
+        pass
+    resp.close()
+    print("  ✅ Aquisição grava no meio do envio de uma série longa")
+
+
+if __name__ == "__main__":
+    print("🧪 Testando respostas em fluxo...")
+    test_same_content()
+    test_compact_formats_and_resample()
+    test_constant_memory()
+    test_writer_not_blocked()
+    print("🎉 Teste concluído!")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# Teste da replicação incremental: retomada após falha, verificação do lote e destino remoto
+
+import os
+import sqlite3
+import sys
+import tempfile
+
+import storage
+import sync_db
+
+
+def add_rows(path, start, n):
+    conn = sqlite3.connect(path)
+    conn.executemany(storage.INSERT_SQL, [
+        storage.reading_row("Temp Torre 1", 100.0 + i, "temperature", timestamp=f"2024-01-01 {i // 3600:02d}:{i // 60 % 60:02d}:{i % 60:02d}")
+        for i in range(start, start + n)])
+    conn.commit()
+    conn.close()
+
+
+def table(path):
+    conn = sqlite3.connect(path)
+    rows = conn.execute("SELECT id, timestamp, sensor_name, temperature FROM sensor_readings ORDER BY id").fetchall()
+    conn.close()
+    return rows
+
+
+def test_incremental_resume():
+    tmp = tempfile.mkdtemp()
+    src, dst = os.path.join(tmp, "src.db"), os.path.join(tmp, "dst.db")
+    storage.init_database(src)
+    add_rows(src, 0, 1200)
+
+    # Lote corrompido no caminho: falha a verificação e nada é gravado além do último lote bom
+    replica = sync_db.LocalReplica(dst, "pi")
+    source = sync_db.Source(src)
+    batches = source.batches(0, 500)
+    replica.apply(*next(batches))
+    header, payload = next(batches)
+    try:
+        replica.apply(header, payload[:-1] + bytes([payload[-1] ^ 1]))
+        raise AssertionError("lote corrompido deveria ser rejeitado")
+    except ValueError:
+        pass
+    assert replica.last_id() == 500
+
+    rows, _ = sync_db.push(source, replica, 500, verbose=False)
+    assert rows == 700 and table(src) == table(dst)
+
+    # Execução seguinte só envia as linhas novas
+    add_rows(src, 1200, 30)
+    rows, _ = sync_db.push(sync_db.Source(src), replica, 500, verbose=False)
+    assert rows == 30 and table(src) == table(dst)
+    print("  ✅ Retomada após lote corrompido e envio incremental")
+
+
+def test_remote_pipe():
+    tmp = tempfile.mkdtemp()
+    src, dst = os.path.join(tmp, "src.db"), os.path.join(tmp, "remoto.db")
+    storage.init_database(src)
+    add_rows(src, 0, 2000)
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sync_db.py")
+    cmd = f'"{sys.executable}" "{script}" serve "{dst}"'
+
+    replica = sync_db.PipeReplica(cmd, "pi")
+    rows, size = sync_db.push(sync_db.Source(src), replica, 700, verbose=False)
+    replica.close()
+    assert rows == 2000 and table(src) == table(dst)
+
+    replica = sync_db.PipeReplica(cmd, "pi")
+    assert replica.last_id() == 2000
+    assert sync_db.push(sync_db.Source(src), replica, verbose=False) == (0, 0)
+    replica.close()
+    print(f"  ✅ Destino remoto via pipe: {rows} linhas em {size / 1024:.1f} KiB comprimidos")
+
+
+def test_single_source_per_destination():
+    tmp = tempfile.mkdtemp()
+    a, b, dst = (os.path.join(tmp, n) for n in ("a.db", "b.db", "dst.db"))
+    for path in (a, b):
+        storage.init_database(path)
+        add_rows(path, 0, 50)
+    replica = sync_db.LocalReplica(dst, "pi-a")
+    sync_db.push(sync_db.Source(a), replica, verbose=False)
+    replica.close()
+
+    # Os ids 1..50 de b sobrescreveriam os de a: o destino recusa a segunda origem
+    for make in (lambda: sync_db.LocalReplica(dst, "pi-b"),
+                 lambda: sync_db.PipeReplica(f'"{sys.executable}" "{sync_db.__file__}" serve "{dst}"', "pi-b")):
+        try:
+            make()
+        except ValueError as e:
+            assert "pi-a" in str(e)
+        else:
+            raise AssertionError("segunda origem aceita")
+    # Destino com leituras de outra procedência também
+    try:
+        sync_db.LocalReplica(b, "pi-a")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("destino com leituras aceito")
+    assert table(dst) == table(a)
+    print("  ✅ Uma origem por destino: segunda origem e destino já povoado recusados")
+
+
+if __name__ == "__main__":
+    print("🧪 Testando replicação incremental...")
+    test_incremental_resume()
+    test_single_source_per_destination()
+    test_remote_pipe()
+    print("🎉 Teste concluído!")
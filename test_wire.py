@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# Teste dos formatos compactos (wire.py) e da negociação de conteúdo do servidor
+
+import itertools
+import json
+import os
+import sqlite3
+import struct
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+import sensor_server
+import storage
+import wire
+
+
+def decode_frame(blob, offset):
+    """Um quadro a partir de offset -> (t, colunas, fim do quadro)"""
+    assert blob[offset:offset + 4] in (wire.BINARY_MAGIC, wire.BINARY_MAGIC_WIDE)
+    wide = blob[offset:offset + 4] == wire.BINARY_MAGIC_WIDE
+    n, t0, ncols = struct.unpack_from("<IdI", blob, offset + 4)
+    offset, names = offset + 20, []
+    for _ in range(ncols):
+        size = blob[offset]
+        names.append(blob[offset + 1:offset + 1 + size].decode())
+        offset += 1 + size
+    offset += -offset % (8 if wide else 4)
+    if wide:
+        t = list(struct.unpack_from(f"<{n}d", blob, offset))
+        offset += 8 * n
+    else:
+        deltas = struct.unpack_from(f"<{n}i", blob, offset)
+        offset += 4 * n
+        t, acc = [], t0
+        for d in deltas:
+            acc += d
+            t.append(acc)
+    columns = {}
+    for name in names:
+        columns[name] = list(struct.unpack_from(f"<{n}f", blob, offset))
+        offset += 4 * n
+    return t, columns, offset + (-offset % 8)
+
+
+def merge(parts):
+    """Blocos (t, colunas) em sequência -> uma série; coluna ausente num bloco vira NaN"""
+    t, columns = [], {}
+    for part_t, part_columns in parts:
+        for name in part_columns:
+            columns.setdefault(name, [float("nan")] * len(t))
+        for name, values in columns.items():
+            values.extend(part_columns.get(name, [float("nan")] * len(part_t)))
+        t.extend(part_t)
+    return t, columns
+
+
+def decode_binary(blob):
+    """Mesmo layout que decodeSeries() em static/js/wire.js: quadros concatenados"""
+    parts, offset = [], 0
+    while True:
+        t, columns, offset = decode_frame(blob, offset)
+        parts.append((t, columns))
+        if offset >= len(blob):
+            return merge(parts)
+
+
+def decode_columnar(payload):
+    """Mesmo que decodeColumnarSeries() em static/js/wire.js"""
+    parts = []
+    for chunk in payload["chunks"]:
+        t = list(itertools.accumulate(chunk["t"], initial=chunk["t0"]))[1:]
+        parts.append((t, {name: [float("nan") if v is None else v for v in values]
+                          for name, values in chunk["columns"].items()}))
+    assert payload["n"] == sum(len(t) for t, _ in parts)
+    return merge(parts)
+
+
+def make_db():
+    path = os.path.join(tempfile.mkdtemp(), "w.db")
+    storage.init_database(path)
+    now = datetime.now(timezone.utc)
+    rows = []
+    for i in range(300):
+        ts = (now - timedelta(seconds=300 - i)).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+        rows.append(storage.reading_row("Temp Forno", 350.0 + i / 4, "temperature", timestamp=ts))
+        rows.append(storage.reading_row("Velocidade", None if i % 50 == 0 else 600 + i, "velocity", timestamp=ts))
+    conn = sqlite3.connect(path)
+    conn.executemany(storage.INSERT_SQL, rows)
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_chart_formats():
+    sensor_server.DATABASE_PATH = make_db()
+    client = sensor_server.app.test_client()
+    legacy = client.get("/api/chart/Velocidade?hours=1").get_json()
+
+    resp = client.get("/api/chart/Velocidade?hours=1", headers={"Accept": wire.BINARY_MIME})
+    assert resp.content_type == wire.BINARY_MIME
+    t, columns = decode_binary(resp.data)
+    assert list(columns) == ["velocity"]
+    for ms, v, row in zip(t, columns["velocity"], legacy):
+        assert ms == wire.timestamp_ms(row["timestamp"])
+        assert (v != v) if row["velocity"] is None else v == row["velocity"]
+
+    col = client.get("/api/chart/Velocidade?hours=1&format=columnar").get_json(force=True)
+    t, columns = decode_columnar(col)
+    assert t == [wire.timestamp_ms(r["timestamp"]) for r in legacy]
+    assert [None if v != v else v for v in columns["velocity"]] == [r["velocity"] for r in legacy]
+    assert client.get("/api/chart/Velocidade?hours=1", headers={"Accept": "*/*"}).content_type == "application/json"
+    print(f"  ✅ /api/chart: json {len(json.dumps(legacy))} B, columnar {len(json.dumps(col))} B, binário {len(resp.data)} B")
+
+
+def test_binary_long_gap():
+    path = os.path.join(tempfile.mkdtemp(), "g.db")
+    storage.init_database(path)
+    now = datetime.now(timezone.utc)
+    stamps = [now - timedelta(days=40), now - timedelta(days=40) + timedelta(seconds=1), now - timedelta(minutes=5)]
+    conn = sqlite3.connect(path)
+    conn.executemany(storage.INSERT_SQL, [
+        storage.reading_row("Temp Forno", 300.0 + i, "temperature", timestamp=ts.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3])
+        for i, ts in enumerate(stamps)])
+    conn.commit()
+    conn.close()
+    sensor_server.DATABASE_PATH = path
+    client = sensor_server.app.test_client()
+
+    # Buraco de ~40 dias (> 2^31 ms) entre a 2ª e a 3ª leitura
+    resp = client.get("/api/chart/Temp Forno?hours=1000", headers={"Accept": wire.BINARY_MIME})
+    assert resp.status_code == 200
+    legacy = client.get("/api/chart/Temp Forno?hours=1000").get_json()
+    t, columns = decode_binary(resp.data)
+    assert t == [wire.timestamp_ms(r["timestamp"]) for r in legacy] and len(t) == 3
+    assert list(columns["temperature"]) == [300.0, 301.0, 302.0]
+    # O buraco dentro de um mesmo quadro vai como TPS2; sem buraco longo continua no layout Int32
+    rows = [(r["timestamp"], r["temperature"], r["pressure"], r["velocity"]) for r in legacy]
+    blob = wire.series_binary(rows)
+    assert blob[:4] == wire.BINARY_MAGIC_WIDE and decode_binary(blob) == (t, columns)
+    short = client.get("/api/chart/Temp Forno?hours=1", headers={"Accept": wire.BINARY_MIME})
+    assert short.data[:4] == wire.BINARY_MAGIC
+    print("  ✅ Buraco maior que 2^31 ms vai como TPS2 (tempos Float64), sem erro 500")
+
+
+def test_data_columnar():
+    sensor_server.DATABASE_PATH = make_db()
+    client = sensor_server.app.test_client()
+    legacy = client.get("/api/data?per_page=100").get_json()["data"]
+    col = client.get("/api/data?per_page=100", headers={"Accept": wire.COLUMNAR_MIME}).get_json(force=True)["data"]
+
+    # Reconstrução equivalente a decodeColumnarRows() do wire.js
+    rid, t = col["id0"], col["t0"]
+    for i, row in enumerate(legacy):
+        rid += col["id"][i]
+        t += col["t"][i]
+        assert rid == row["id"] and t == wire.timestamp_ms(row["timestamp"])
+        assert col["sensor_name"]["dict"][col["sensor_name"]["idx"][i]] == row["sensor_name"]
+        f = col["field"][i]
+        for j, name in enumerate(col["fields"]):
+            assert row[name] == (col["value"][i] if j == f else None)
+    assert client.get("/api/data?format=binary").status_code == 406
+    print("  ✅ /api/data colunar reconstrói as linhas originais")
+
+
+if __name__ == "__main__":
+    print("🧪 Testando formatos compactos...")
+    test_chart_formats()
+    test_binary_long_gap()
+    test_data_columnar()
+    print("🎉 Teste concluído!")
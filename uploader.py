@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# uploader.py
+# Envio "store-and-forward" das leituras locais do Pi para o servidor central.
+# O próprio sensor_data.db é o buffer: o uploader guarda apenas o último id enviado
+# (tabela upload_state) e, quando o link cai, continua de onde parou ao voltar.
+# O servidor deduplica por (rig, sensor, timestamp), então reenviar um lote é seguro.
+#
+# Uso:
+#   python uploader.py --server http://central:8080 --rig forno-01
+# ou junto com a coleta:
+#   python dashboard.py --img assets/base.jpeg --upload-to http://central:8080 --rig-id forno-01
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import storage
+from ingest import UPLOAD_COLUMNS, encode_batch
+from metrics import REGISTRY
+
+UPLOAD_ROWS = REGISTRY.counter("temppi_upload_rows_total", "Leituras enviadas ao servidor central")
+UPLOAD_FAILURES = REGISTRY.counter("temppi_upload_failures_total", "Envios ao servidor central que falharam")
+
+SELECT_SQL = f'''
+    SELECT id, {", ".join(UPLOAD_COLUMNS)}
+    FROM sensor_readings
+    WHERE id > ? AND rig_id IS NULL
+    ORDER BY id
+    LIMIT ?
+'''
+
+
+def http_post(url, body, token=None, timeout=30.0):
+    """POST do lote gzip; retorna a resposta JSON do servidor"""
+    req = urllib.request.Request(url, data=body, method="POST")
+    req.add_header("Content-Type", "application/json")
+    req.add_header("Content-Encoding", "gzip")
+    if token:
+        req.add_header("Authorization", f"Bearer {token}")
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        return json.loads(resp.read() or b"{}")
+
+
+class Uploader:
+    """
+    db_path: banco local; server_url: base do servidor central (ex.: http://central:8080)
+    post: função (url, body, token) -> dict, substituível nos testes
+    """
+
+    def __init__(self, db_path, server_url, rig_id, token=None, batch_size=2000,
+                 interval=10.0, max_backoff=300.0, post=http_post):
+        self.db_path = db_path
+        self.url = server_url.rstrip("/") + "/api/ingest"
+        self.rig_id = rig_id
+        self.token = token
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self.post = post
+        self._stop = threading.Event()
+        self._thread = None
+        self._conn = None
+
+    # ----- cursor de envio -----
+    def _connect(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            storage.migrate_schema(self._conn)
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS upload_state (
+                    target TEXT PRIMARY KEY,
+                    last_id INTEGER NOT NULL,
+                    updated TEXT
+                )
+            ''')
+            self._conn.commit()
+        return self._conn
+
+    def last_id(self):
+        row = self._connect().execute("SELECT last_id FROM upload_state WHERE target = ?",
+                                      (self.url,)).fetchone()
+        return row[0] if row else 0
+
+    def _save_last_id(self, last_id):
+        conn = self._connect()
+        conn.execute('''
+            INSERT INTO upload_state (target, last_id, updated) VALUES (?, ?, datetime('now'))
+            ON CONFLICT(target) DO UPDATE SET last_id = excluded.last_id, updated = excluded.updated
+        ''', (self.url, last_id))
+        conn.commit()
+
+    def pending(self):
+        """Quantidade de leituras locais ainda não enviadas"""
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM sensor_readings WHERE id > ? AND rig_id IS NULL",
+            (self.last_id(),)).fetchone()[0]
+
+    # ----- envio -----
+    def upload_once(self):
+        """Envia um lote; retorna quantas linhas foram enviadas (exceções indicam falha)"""
+        rows = self._connect().execute(SELECT_SQL, (self.last_id(), self.batch_size)).fetchall()
+        if not rows:
+            return 0
+        body = encode_batch(self.rig_id, [r[1:] for r in rows])
+        self.post(self.url, body, self.token)
+        # Só avança o cursor depois da confirmação do servidor
+        self._save_last_id(rows[-1][0])
+        UPLOAD_ROWS.inc(len(rows))
+        return len(rows)
+
+    def run(self):
+        backoff = 0.0
+        link_down = False
+        while not self._stop.is_set():
+            try:
+                sent = self.upload_once()
+            except (urllib.error.URLError, OSError, ValueError, sqlite3.Error) as e:
+                # sqlite3.Error: banco local ocupado (ex.: 'database is locked' durante o commit
+                # do gravador); o lote é reenviado depois e o servidor deduplica
+                if isinstance(e, sqlite3.Error) and self._conn is not None:
+                    self._conn.rollback()
+                UPLOAD_FAILURES.inc()
+                backoff = min(self.max_backoff, backoff * 2 if backoff else self.interval)
+                if not link_down:
+                    print(f"⚠️  Envio ao servidor central falhou ({e}); tentando novamente com backoff")
+                    link_down = True
+                # Jitter evita que várias plantas reconectem no mesmo instante
+                self._stop.wait(backoff * random.uniform(0.5, 1.0))
+                continue
+            if link_down:
+                print("✅ Envio ao servidor central restabelecido")
+                link_down = False
+            backoff = 0.0
+            # Lote cheio: ainda há atraso acumulado, segue sem esperar
+            if sent < self.batch_size:
+                self._stop.wait(self.interval)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name="uploader", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Envia as leituras locais para o servidor central")
+    ap.add_argument("--server", required=True, help="URL do servidor central (ex.: http://central:8080)")
+    ap.add_argument("--rig", required=True, help="Identificador desta planta (ex.: forno-01)")
+    ap.add_argument("--db", default=storage.DATABASE_PATH, help="Banco local (padrão: sensor_data.db)")
+    ap.add_argument("--token", default=os.environ.get("TEMPPI_INGEST_TOKEN"),
+                    help="Token do servidor (padrão: variável TEMPPI_INGEST_TOKEN)")
+    ap.add_argument("--batch", type=int, default=2000, help="Leituras por lote (padrão: 2000)")
+    ap.add_argument("--interval", type=float, default=10.0, help="Intervalo entre envios em segundos (padrão: 10)")
+    ap.add_argument("--once", action="store_true", help="Envia todo o atraso acumulado e sai")
+    args = ap.parse_args()
+
+    up = Uploader(args.db, args.server, args.rig, args.token, args.batch, args.interval)
+    print(f"📤 {up.pending()} leituras pendentes para {up.url} (rig {args.rig})")
+    if args.once:
+        total = 0
+        while True:
+            sent = up.upload_once()
+            total += sent
+            if sent < args.batch:
+                break
+        print(f"✅ {total} leituras enviadas")
+        return
+    try:
+        up.run()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
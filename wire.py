@@ -0,0 +1,184 @@
+# wire.py
+# Formatos compactos para /api/chart e /api/data (negociados por Accept ou ?format=).
+#   - json:     lista de objetos (formato original, padrão)
+#   - columnar: JSON colunar; timestamps em ms com delta inteiro, textos por dicionário
+#   - binary:   séries numéricas em arrays tipados (Int32 deltas + Float32), lidas no JS
+#               direto em Int32Array/Float32Array (só /api/chart). Séries com um intervalo
+#               maior que o Int32 comporta (~24,8 dias) vão como 'TPS2', com os tempos
+#               absolutos em Float64
+# O servidor codifica as séries a partir das tuplas do banco (series_*); chart_* aceitam a lista
+# de dicts do formato json. Em /api/chart a série sai em fluxo, um bloco por lote do banco
+# (series_*_stream): pedaços colunares em "chunks" e quadros binários concatenados.
+# O decodificador correspondente fica em static/js/wire.js.
+
+import itertools
+import json
+import struct
+from datetime import datetime, timezone
+
+JSON_MIME = "application/json"
+COLUMNAR_MIME = "application/vnd.temppi.columnar+json"
+BINARY_MIME = "application/vnd.temppi.series"
+
+FORMAT_MIMES = {"json": JSON_MIME, "columnar": COLUMNAR_MIME, "binary": BINARY_MIME}
+
+VALUE_FIELDS = ("temperature", "pressure", "velocity")
+BINARY_MAGIC = b"TPS1"
+BINARY_MAGIC_WIDE = b"TPS2"
+INT32_MIN, INT32_MAX = -2 ** 31, 2 ** 31 - 1
+
+
+def timestamp_ms(text):
+    """Texto do banco (UTC, 'T' ou espaço, com ou sem fração) -> epoch em ms"""
+    # fromisoformat aceita fração de 3 ou 6 dígitos; ms basta
+    dt = datetime.fromisoformat(text.replace("T", " ")[:23])
+    return int(round(dt.replace(tzinfo=timezone.utc).timestamp() * 1000))
+
+
+def _deltas(values):
+    out = []
+    prev = values[0] if values else 0
+    for v in values:
+        out.append(v - prev)
+        prev = v
+    return out
+
+
+def _dictionary(values):
+    """Codificação por dicionário: ([valores únicos], [índices])"""
+    index = {}
+    idx = [index.setdefault(v, len(index)) for v in values]
+    return {"dict": list(index), "idx": idx}
+
+
+# ============= /api/chart =============
+def series_columnar(rows):
+    """Tuplas (timestamp, temperature, pressure, velocity) -> dict colunar (colunas vazias omitidas)"""
+    ts = [timestamp_ms(r[0]) for r in rows]
+    columns = {}
+    for i, field in enumerate(VALUE_FIELDS, start=1):
+        col = [r[i] for r in rows]
+        if any(v is not None for v in col):
+            columns[field] = col
+    return {
+        "format": "columnar",
+        "n": len(rows),
+        "t0": ts[0] if ts else 0,
+        "t": _deltas(ts),
+        "columns": columns,
+    }
+
+
+def series_binary(rows):
+    """
+    Tuplas (timestamp, temperature, pressure, velocity) -> binário. Layout (little-endian):
+      'TPS1' | uint32 n | float64 t0_ms | uint32 ncols | por coluna: uint8 len + nome utf-8
+      | padding até 4 bytes | int32[n] deltas de t (ms) | por coluna: float32[n] (NaN = nulo)
+    Se algum delta não cabe em int32 (buraco de mais de ~24,8 dias), o magic é 'TPS2', o
+    padding vai até 8 bytes e os tempos vão absolutos em float64[n] (ms) no lugar dos deltas.
+    O quadro termina com padding até 8 bytes: quadros concatenados continuam alinhados.
+    """
+    col = series_columnar(rows)
+    n = col["n"]
+    names = list(col["columns"])
+    deltas = col["t"]
+    wide = bool(deltas) and (min(deltas) < INT32_MIN or max(deltas) > INT32_MAX)
+    magic = BINARY_MAGIC_WIDE if wide else BINARY_MAGIC
+    header = bytearray(magic + struct.pack("<Id I", n, float(col["t0"]), len(names)))
+    for name in names:
+        encoded = name.encode()
+        header += struct.pack("<B", len(encoded)) + encoded
+    align = 8 if wide else 4
+    header += b"\0" * (-len(header) % align)
+    if wide:
+        times = struct.pack(f"<{n}d", *(col["t0"] + t for t in itertools.accumulate(deltas)))
+    else:
+        times = struct.pack(f"<{n}i", *deltas)
+    parts = [bytes(header), times]
+    nan = float("nan")
+    for name in names:
+        parts.append(struct.pack(f"<{n}f", *(nan if v is None else v for v in col["columns"][name])))
+    size = sum(len(p) for p in parts)
+    parts.append(b"\0" * (-size % 8))
+    return b"".join(parts)
+
+
+def series_binary_stream(batches):
+    """
+    Lotes de tuplas -> quadros de series_binary, um por lote (a resposta é a concatenação).
+    Cada quadro traz o próprio n, t0 e colunas; série vazia = um quadro com n = 0.
+    """
+    sent = False
+    for batch in batches:
+        if batch:
+            sent = True
+            yield series_binary(batch)
+    if not sent:
+        yield series_binary([])
+
+
+def series_columnar_stream(batches):
+    """
+    Lotes de tuplas -> pedaços de {"format": "columnar", "chunks": [...], "n": total}, com
+    um bloco {n, t0, t, columns} de series_columnar por lote (colunas vazias omitidas no bloco)
+    """
+    yield '{"format":"columnar","chunks":['
+    n, sep = 0, ""
+    for batch in batches:
+        if not batch:
+            continue
+        chunk = series_columnar(batch)
+        del chunk["format"]
+        yield sep + json.dumps(chunk, separators=(",", ":"))
+        sep = ","
+        n += len(batch)
+    yield f'],"n":{n}}}'
+
+
+def _series_rows(rows):
+    return [(r["timestamp"], r["temperature"], r["pressure"], r["velocity"]) for r in rows]
+
+
+def chart_columnar(rows):
+    """Linhas {timestamp, temperature, pressure, velocity} -> dict colunar"""
+    return series_columnar(_series_rows(rows))
+
+
+def chart_binary(rows):
+    """Linhas {timestamp, temperature, pressure, velocity} -> binário (ver series_binary)"""
+    return series_binary(_series_rows(rows))
+
+
+# ============= /api/data =============
+def data_columnar(rows):
+    """
+    Linhas completas de sensor_readings -> dict colunar.
+    Só um de temperature/pressure/velocity é preenchido por linha: vai em 'value' com o
+    índice do campo em 'field' (-1 = nenhum).
+    """
+    ids = [r["id"] for r in rows]
+    ts = [timestamp_ms(r["timestamp"]) for r in rows]
+    field, value = [], []
+    for r in rows:
+        for i, name in enumerate(VALUE_FIELDS):
+            if r[name] is not None:
+                field.append(i)
+                value.append(r[name])
+                break
+        else:
+            field.append(-1)
+            value.append(None)
+    out = {
+        "format": "columnar",
+        "n": len(rows),
+        "fields": list(VALUE_FIELDS),
+        "id0": ids[0] if ids else 0,
+        "id": _deltas(ids),
+        "t0": ts[0] if ts else 0,
+        "t": _deltas(ts),
+        "field": field,
+        "value": value,
+    }
+    for name in ("sensor_name", "sensor_type", "pins", "mode", "rig_id", "quality", "channel_id"):
+        out[name] = _dictionary([r.get(name) for r in rows])
+    return out